@@ -0,0 +1,106 @@
+"""
+Throughput and memory of streaming AIS log ingestion.
+
+Usage:
+    python benchmarks/ais_ingest.py
+    python benchmarks/ais_ingest.py --sentences 1000000 --vessels 20000
+    python benchmarks/ais_ingest.py --log recording.nmea --output ais.json
+
+Writes a synthetic NMEA log (tag block times, types 1/2/3/18, one
+report per vessel every --interval seconds) unless --log is given,
+then ingests it into an empty World with ais.ingest_file. Reports
+sentences per second, and the peak traced memory of a second run,
+which should stay flat as the log grows.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from traffic import make_own
+
+from ais import encode_position_report, ingest_file, nmea_sentences
+from world import World
+
+
+def write_log(path: str, sentences: int, vessels: int, interval: float, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    fleet = [
+        (244_000_000 + i, 52.0 + rng.uniform(-0.5, 0.5), 4.0 + rng.uniform(-0.5, 0.5))
+        for i in range(vessels)
+    ]
+    start = 1_600_000_000
+    with open(path, "wb") as f:
+        for i in range(sentences):
+            mmsi, lat, lon = fleet[i % vessels]
+            payload = encode_position_report(
+                mmsi, lat, lon, rng.uniform(0.0, 25.0), rng.uniform(0.0, 359.9),
+                message_type=rng.choice((1, 2, 3, 18)),
+            )
+            timestamp = start + (i // vessels) * interval
+            f.write(b"\r\n".join(nmea_sentences(payload, time=timestamp)) + b"\r\n")
+
+
+def ingest(path: str) -> Dict[str, Any]:
+    world = World(make_own(), [])
+    started = time.perf_counter()
+    stats = ingest_file(world, path)
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": seconds,
+        "sentences_per_sec": stats.sentences / seconds,
+        "targets": len(world.targets),
+        "stats": vars(stats),
+    }
+
+
+def peak_memory(path: str) -> int:
+    tracemalloc.start()
+    try:
+        ingest_file(World(make_own(), []), path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--log", help="Ingest this NMEA file instead of a synthetic one")
+    parser.add_argument("--sentences", type=int, default=500_000)
+    parser.add_argument("--vessels", type=int, default=5_000)
+    parser.add_argument("--interval", type=float, default=10.0,
+                        help="Seconds between reports of one vessel")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    path = args.log
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".nmea")
+        os.close(fd)
+        write_log(path, args.sentences, args.vessels, args.interval)
+    try:
+        result = {
+            "python": sys.version.split()[0],
+            "log_bytes": os.path.getsize(path),
+            **ingest(path),
+            "peak_traced_bytes": peak_memory(path),
+        }
+    finally:
+        if args.log is None:
+            os.remove(path)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
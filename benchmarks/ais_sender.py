@@ -0,0 +1,216 @@
+"""
+Local AIS receiver stand-in: sends NMEA sentences over UDP.
+
+Usage:
+    python benchmarks/ais_sender.py --port 10110 --rate 5000 --duration 30
+    python benchmarks/ais_sender.py --log recording.nmea --port 10110
+    python benchmarks/ais_sender.py --local --rate 5000 --output feed.json
+
+Sends synthetic type 1/2/3/18 reports for --vessels vessels at --rate
+messages per second, one message per datagram; a --split fraction of
+them is sent as two sentences in separate datagrams, so the receiver
+has to reassemble them. With --log, the lines of a recorded NMEA file
+are replayed instead, one per datagram.
+
+With --local, the receiving side runs in this process on its own
+thread and event loop: an AisFeed applied to a World at --tick-rate,
+as server.py does. The JSON report then adds what it received,
+dropped and applied, the time per apply and the receiver's event-loop
+lag, which is what websocket clients would wait on.
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from traffic import make_own
+
+from ais import encode_position_report, nmea_sentences
+from ais_feed import AIS_PORT, AisFeed, listen
+from world import World
+
+
+HOST = "127.0.0.1"
+SEND_INTERVAL_S = 0.01  # Messages are paced in bursts this far apart
+LAG_PROBE_INTERVAL_S = 0.01
+
+
+def synthetic(vessels: int, split: float, seed: int = 42) -> Iterator[List[bytes]]:
+    """
+    Endless messages, each as the list of datagrams that carry it.
+    """
+    rng = random.Random(seed)
+    fleet = [
+        (244_000_000 + i, 52.0 + rng.uniform(-0.5, 0.5), 4.0 + rng.uniform(-0.5, 0.5))
+        for i in range(vessels)
+    ]
+    seq_id = 0
+    while True:
+        for mmsi, lat, lon in fleet:
+            payload = encode_position_report(
+                mmsi, lat, lon, rng.uniform(0.0, 25.0), rng.uniform(0.0, 359.9),
+                message_type=rng.choice((1, 2, 3, 18)),
+            )
+            if rng.random() < split:
+                seq_id = (seq_id + 1) % 10
+                # Half the payload per sentence
+                yield nmea_sentences(
+                    payload, seq_id=seq_id, max_chars=(len(payload) + 1) // 2
+                )
+            else:
+                yield [b"".join(nmea_sentences(payload))]
+
+
+def replay(path: str) -> Iterator[List[bytes]]:
+    while True:
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield [line]
+
+
+def send(host: str, port: int, messages: Iterator[List[bytes]],
+         rate: float, duration: float) -> Dict[str, Any]:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sent = datagrams = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= duration:
+                break
+            due = min(int(elapsed * rate) + 1, int(duration * rate))
+            while sent < due:
+                for datagram in next(messages):
+                    sock.sendto(datagram + b"\r\n", (host, port))
+                    datagrams += 1
+                sent += 1
+            time.sleep(SEND_INTERVAL_S)
+    finally:
+        sock.close()
+    seconds = time.perf_counter() - started
+    return {
+        "messages_sent": sent,
+        "datagrams_sent": datagrams,
+        "seconds": seconds,
+        "messages_per_sec": sent / seconds,
+    }
+
+
+class LocalReceiver:
+    """
+    AisFeed and tick loop on a thread of their own, bound to loopback.
+    """
+
+    def __init__(self, tick_rate_hz: float):
+        self.tick_rate_hz = tick_rate_hz
+        self.feed = AisFeed()
+        self.world = World(make_own(), [])
+        self.port = 0
+        self.apply_seconds: List[float] = []
+        self.lag: List[float] = []
+        self._ready = threading.Event()
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()))
+
+    def __enter__(self) -> "LocalReceiver":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        transport = await listen(self.feed, HOST, 0)
+        self.port = transport.get_extra_info("sockname")[1]
+        ticks = asyncio.create_task(self._tick())
+        probe = asyncio.create_task(self._probe())
+        self._ready.set()
+        try:
+            await self._stop.wait()
+            await asyncio.sleep(2.0 / self.tick_rate_hz)  # Let the last datagrams in
+            self._apply()
+        finally:
+            ticks.cancel()
+            probe.cancel()
+            transport.close()
+
+    def _apply(self) -> None:
+        started = time.perf_counter()
+        if self.feed.apply(self.world) != (0, 0):
+            self.apply_seconds.append(time.perf_counter() - started)
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(1.0 / self.tick_rate_hz)
+            self._apply()
+
+    async def _probe(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_INTERVAL_S)
+            self.lag.append(time.perf_counter() - started - LAG_PROBE_INTERVAL_S)
+
+    def report(self) -> Dict[str, Any]:
+        lag = sorted(self.lag) or [0.0]
+        applies = self.apply_seconds or [0.0]
+        return {
+            "feed": vars(self.feed.stats),
+            "targets": len(self.world.targets),
+            "apply_ms_median": 1000 * statistics.median(applies),
+            "apply_ms_max": 1000 * max(applies),
+            "loop_lag_ms_p50": 1000 * lag[len(lag) // 2],
+            "loop_lag_ms_p99": 1000 * lag[int(len(lag) * 0.99)],
+            "loop_lag_ms_max": 1000 * lag[-1],
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=AIS_PORT)
+    parser.add_argument("--rate", type=float, default=5_000.0,
+                        help="Messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--vessels", type=int, default=5_000)
+    parser.add_argument("--split", type=float, default=0.1,
+                        help="Fraction of messages sent as two fragments")
+    parser.add_argument("--log", help="Replay this NMEA file instead")
+    parser.add_argument("--local", action="store_true",
+                        help="Receive in this process and report what arrived")
+    parser.add_argument("--tick-rate", type=float, default=10.0,
+                        help="Applies per second with --local")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    messages = replay(args.log) if args.log else synthetic(args.vessels, args.split)
+    result: Dict[str, Any] = {"python": sys.version.split()[0]}
+    if args.local:
+        with LocalReceiver(args.tick_rate) as receiver:
+            result.update(send(HOST, receiver.port, messages, args.rate, args.duration))
+        result.update(receiver.report())
+    else:
+        result.update(send(args.host, args.port, messages, args.rate, args.duration))
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+End-to-end websocket load generator for server.py.
+
+Usage:
+    python benchmarks/loadgen.py --sessions 100 --rate 5 --duration 10
+    python benchmarks/loadgen.py --sessions 500 --mix step=6,add_target=1,update_target_heading=2,update_target_speed=1
+    python benchmarks/loadgen.py --sessions 50 --subscribe 1.0 --running
+
+The server runs in-process on its own thread and event loop, bound to
+loopback. Simulated browser sessions run on the main loop. Each one
+sends commands at --rate per second drawn from --mix and waits for the
+resulting snapshot. The JSON report gives command-to-snapshot latency
+percentiles, frames delivered per second, server event-loop lag and
+server CPU usage.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import traffic  # noqa: F401  (puts src/ on sys.path)
+
+import websockets
+import server
+
+
+HOST = "127.0.0.1"
+DEFAULT_MIX = "step=6,add_target=1,update_target_heading=2,update_target_speed=1"
+LAG_PROBE_INTERVAL_S = 0.01
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1.0)
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Server side (own thread and loop)
+
+class ServerThread(threading.Thread):
+    """
+    Runs server.handler and server.ticker on a private event loop and
+    records the loop's scheduling lag.
+    """
+
+    def __init__(self, port: int, tick_rate_hz: float):
+        super().__init__(daemon=True)
+        self.port = port
+        self.tick_rate_hz = tick_rate_hz
+        self.loop_lag_s: List[float] = []
+        self.ready = threading.Event()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown: Optional[asyncio.Future] = None
+
+    def run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self._serve())
+
+    async def _serve(self) -> None:
+        self._shutdown = asyncio.get_running_loop().create_future()
+        async with websockets.serve(server.handler, HOST, self.port):
+            ticker = asyncio.ensure_future(server.ticker(self.tick_rate_hz))
+            probe = asyncio.ensure_future(self._probe_lag())
+            self.ready.set()
+            await self._shutdown
+            ticker.cancel()
+            probe.cancel()
+
+    async def _probe_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL_S)
+            self.loop_lag_s.append(loop.time() - start - LAG_PROBE_INTERVAL_S)
+
+    def cpu_time(self) -> float:
+        """
+        CPU seconds used by this thread (process CPU where unsupported).
+        """
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(self.ident))
+        except (AttributeError, OSError):
+            return time.process_time()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self._shutdown.set_result, None)
+        self.join()
+
+
+# Client side
+
+class Session:
+    """
+    One simulated browser session.
+    """
+
+    def __init__(self, index: int, port: int, mix: Dict[str, float],
+                 rate_hz: float, subscribe: bool, seed: int):
+        self.index = index
+        self.url = f"ws://{HOST}:{port}"
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.rate_hz = rate_hz
+        self.subscribe = subscribe
+        self.rng = random.Random(seed + index)
+        self.latencies_s: List[float] = []
+        self.frames = 0
+        self.commands = 0
+        self.errors = 0
+        self._added: List[str] = []
+
+    def next_command(self) -> Dict[str, Any]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        rng = self.rng
+        if name == "step":
+            return {"command": "step", "dt": 0.001}
+        if name == "add_target":
+            vessel_id = f"L{self.index}-{len(self._added)}"
+            self._added.append(vessel_id)
+            return {"command": "add_target", "id": vessel_id,
+                    "x": rng.uniform(-20, 20), "y": rng.uniform(-20, 20),
+                    "speed": rng.uniform(0, 20), "heading": rng.uniform(0, 360)}
+        if name == "remove_target" and self._added:
+            return {"command": "remove_target", "id": self._added.pop()}
+        vessel_id = rng.choice(self._added or ["T1", "T2", "DANGER1"])
+        if name == "update_target_speed":
+            return {"command": "update_target_speed", "id": vessel_id,
+                    "speed_knots": rng.uniform(0, 20)}
+        return {"command": "update_target_heading", "id": vessel_id,
+                "heading_deg": rng.uniform(0, 360)}
+
+    async def run(self, duration_s: float) -> None:
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                if self.subscribe:
+                    await ws.send(json.dumps({"command": "subscribe"}))
+                    await ws.recv()
+
+                loop = asyncio.get_running_loop()
+                end = loop.time() + duration_s
+                interval = 1.0 / self.rate_hz
+                # Spread sessions over the first interval
+                await asyncio.sleep(self.rng.uniform(0, interval))
+
+                while loop.time() < end:
+                    started = loop.time()
+                    await ws.send(json.dumps(self.next_command()))
+                    self.commands += 1
+                    await ws.recv()
+                    self.frames += 1
+                    self.latencies_s.append(loop.time() - started)
+
+                    await self._drain(ws, max(0.0, started + interval - loop.time()))
+        except (OSError, websockets.exceptions.WebSocketException):
+            self.errors += 1
+
+    async def _drain(self, ws, wait_s: float) -> None:
+        """
+        Count broadcast frames arriving until the next command is due.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_s
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(ws.recv(), remaining)
+                self.frames += 1
+            except asyncio.TimeoutError:
+                return
+
+
+async def run_sessions(args: argparse.Namespace, port: int) -> List[Session]:
+    mix = parse_mix(args.mix)
+    subscribed = int(round(args.sessions * args.subscribe))
+    sessions = [
+        Session(i, port, mix, args.rate, i < subscribed, args.seed)
+        for i in range(args.sessions)
+    ]
+
+    if args.running:
+        async with websockets.connect(f"ws://{HOST}:{port}") as ws:
+            await ws.send(json.dumps({"command": "start"}))
+            await ws.recv()
+
+    await asyncio.gather(*(s.run(args.duration) for s in sessions))
+    return sessions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Commands per second per session")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help="Comma-separated command=weight pairs")
+    parser.add_argument("--subscribe", type=float, default=0.0,
+                        help="Fraction of sessions subscribed to tick broadcasts")
+    parser.add_argument("--running", action="store_true",
+                        help="Start the server clock before the run")
+    parser.add_argument("--tick-rate", type=float, default=server.TICK_RATE_HZ)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)  # server logs every command
+
+    server_thread = ServerThread(args.port, args.tick_rate)
+    server_thread.start()
+    server_thread.ready.wait()
+
+    cpu_start = server_thread.cpu_time()
+    wall_start = time.perf_counter()
+    sessions = asyncio.run(run_sessions(args, args.port))
+    wall = time.perf_counter() - wall_start
+    cpu = server_thread.cpu_time() - cpu_start
+    server_thread.stop()
+
+    latencies = [l for s in sessions for l in s.latencies_s]
+    lag = server_thread.loop_lag_s
+    ms = 1000.0
+
+    def ms_or_none(value):
+        return None if value is None else value * ms
+
+    report = {
+        "sessions": args.sessions,
+        "subscribed": sum(s.subscribe for s in sessions),
+        "rate_per_session": args.rate,
+        "mix": parse_mix(args.mix),
+        "duration_s": wall,
+        "commands": sum(s.commands for s in sessions),
+        "errors": sum(s.errors for s in sessions),
+        "targets_at_end": len(server.world.targets),
+        "latency_ms": {
+            "p50": ms_or_none(percentile(latencies, 0.50)),
+            "p99": ms_or_none(percentile(latencies, 0.99)),
+            "p999": ms_or_none(percentile(latencies, 0.999)),
+            "max": ms_or_none(max(latencies, default=None)),
+        },
+        "frames_per_sec": sum(s.frames for s in sessions) / wall,
+        "event_loop_lag_ms": {
+            "p50": ms_or_none(percentile(lag, 0.50)),
+            "p99": ms_or_none(percentile(lag, 0.99)),
+            "max": ms_or_none(max(lag, default=None)),
+        },
+        "server_cpu_percent": 100.0 * cpu / wall,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Per-object memory and per-step allocation report for the core types.
+
+Usage:
+    python benchmarks/memory.py
+    python benchmarks/memory.py --count 100000 --output memory.json
+
+Reports traced bytes per Position, Alert and standalone Vessel, the
+cost of a World with --count targets, and the bytes and blocks
+allocated while stepping --count standalone vessels once.
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from traffic import make_own, make_targets
+
+from alert import Alert
+from position import Position
+from risk import RiskLevel
+from world import World
+
+
+def traced(build: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Bytes still allocated after build(), keeping its result alive.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = build()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    del result
+    return {"bytes": size, "blocks": blocks}
+
+
+def per_object(count: int, build: Callable[[int], Any]) -> Dict[str, Any]:
+    result = traced(lambda: [build(i) for i in range(count)])
+    result["bytes_per_object"] = result["bytes"] / count
+    return result
+
+
+def step_allocations(count: int) -> Dict[str, Any]:
+    """
+    Peak bytes allocated while stepping count standalone vessels once.
+    """
+    vessels = make_targets(count)
+    for vessel in vessels:
+        vessel.step(0.001)  # Warm-up
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for vessel in vessels:
+            vessel.step(0.001)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak, "peak_bytes_per_vessel": peak / count}
+
+
+def report(count: int) -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "count": count,
+        "position": per_object(count, lambda i: Position(float(i), 0.5)),
+        "alert": per_object(
+            count, lambda i: Alert(f"T{i}", RiskLevel.SAFE, float(i), 0.5)
+        ),
+        "vessel": traced(lambda: make_targets(count)),
+        "world": traced(lambda: World(make_own(), make_targets(count))),
+        "vessel_step": step_allocations(count),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    result = report(args.count)
+    for name in ("vessel", "world"):
+        result[name]["bytes_per_object"] = result[name]["bytes"] / args.count
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Hot-path benchmarks for kinematics, risk, alerts and snapshots.
+
+Usage:
+    python benchmarks/run.py
+    python benchmarks/run.py --sizes 10 1000 --output results.json
+    python benchmarks/run.py --baseline baseline.json --threshold 0.2
+
+Every case is timed at each fleet size and reported as JSON with
+ops/sec (one op = one pass over the whole fleet), per-target cost and
+peak traced memory. With --baseline, cases slower than the baseline by
+more than the threshold are listed and the exit code is 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from traffic import make_own, make_targets, make_world
+
+from alert import generate_alerts, sort_alerts
+from alert_cache import CachedAlertEvaluator
+from cpa import cpa_distance, tcpa
+from risk import classify_risk
+
+
+DEFAULT_SIZES = [10, 1_000, 10_000, 100_000]
+MIN_TIME_S = 0.2  # Keep repeating a case until it ran at least this long
+MAX_REPEATS = 1000
+
+
+# Benchmark cases: each builds its state, then returns the timed callable
+
+def case_vessel_step(n: int) -> Callable[[], Any]:
+    vessels = make_targets(n)
+
+    def run():
+        for vessel in vessels:
+            vessel.step(0.001)
+    return run
+
+
+def case_world_step(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+    return lambda: world.step(0.001)
+
+
+def case_world_tick(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+
+    def run():
+        world.step(0.001)
+        world.evaluate()
+    return run
+
+
+def case_world_tick_cached(n: int) -> Callable[[], Any]:
+    world = make_world(n, evaluator=CachedAlertEvaluator())
+
+    def run():
+        world.step(0.001)
+        world.evaluate()
+    return run
+
+
+def case_cpa_tcpa(n: int) -> Callable[[], Any]:
+    own, targets = make_own(), make_targets(n)
+
+    def run():
+        for target in targets:
+            cpa_distance(own, target)
+            tcpa(own, target)
+    return run
+
+
+def case_classify_risk(n: int) -> Callable[[], Any]:
+    own, targets = make_own(), make_targets(n)
+
+    def run():
+        for target in targets:
+            classify_risk(own, target)
+    return run
+
+
+def case_generate_alerts(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+    return lambda: generate_alerts(world.own, world.targets, include_safe=False)
+
+
+def case_sort_alerts(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+    alerts = generate_alerts(world.own, world.targets, include_safe=True)
+    return lambda: sort_alerts(alerts)
+
+
+def case_sort_alerts_top10(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+    alerts = generate_alerts(world.own, world.targets, include_safe=True)
+    return lambda: sort_alerts(alerts, top_k=10)
+
+
+def case_world_snapshot(n: int) -> Callable[[], Any]:
+    world = make_world(n)
+    return world.snapshot
+
+
+def case_snapshot_json(n: int) -> Callable[[], Any]:
+    snapshot = make_world(n).snapshot()
+    return lambda: json.dumps(snapshot)
+
+
+CASES: Dict[str, Callable[[int], Callable[[], Any]]] = {
+    "vessel_step": case_vessel_step,
+    "world_step": case_world_step,
+    "world_tick": case_world_tick,
+    "world_tick_cached": case_world_tick_cached,
+    "cpa_tcpa": case_cpa_tcpa,
+    "classify_risk": case_classify_risk,
+    "generate_alerts": case_generate_alerts,
+    "sort_alerts": case_sort_alerts,
+    "sort_alerts_top10": case_sort_alerts_top10,
+    "world_snapshot": case_world_snapshot,
+    "snapshot_json": case_snapshot_json,
+}
+
+
+# Measurement
+
+def time_case(run: Callable[[], Any]) -> Dict[str, float]:
+    run()  # Warm-up
+    repeats = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    best = float("inf")
+    while repeats < MAX_REPEATS and (repeats == 0 or elapsed < MIN_TIME_S):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+        repeats += 1
+        elapsed = time.perf_counter() - start
+    return {"best_s": best, "mean_s": elapsed / repeats, "repeats": repeats}
+
+
+def peak_memory(factory: Callable[[int], Callable[[], Any]], n: int) -> int:
+    """
+    Peak traced allocation (bytes) of building the case and running it once.
+    """
+    tracemalloc.start()
+    try:
+        factory(n)()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(sizes: List[int], cases: List[str]) -> Dict[str, Any]:
+    results = []
+    for name in cases:
+        factory = CASES[name]
+        for n in sizes:
+            timing = time_case(factory(n))
+            result = {
+                "case": name,
+                "n": n,
+                "ops_per_sec": 1.0 / timing["mean_s"],
+                "mean_s": timing["mean_s"],
+                "best_s": timing["best_s"],
+                "per_target_ns": timing["mean_s"] / n * 1e9,
+                "repeats": timing["repeats"],
+                "peak_memory_bytes": peak_memory(factory, n),
+            }
+            results.append(result)
+            print(
+                f"{name:16s} n={n:<7d} {result['ops_per_sec']:12.2f} ops/s "
+                f"{result['per_target_ns']:10.1f} ns/target "
+                f"{result['peak_memory_bytes'] / 1e6:8.1f} MB",
+                file=sys.stderr,
+            )
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+# Baseline comparison
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare mean times against a saved report.
+
+    Returns:
+        Entries slower than baseline by more than threshold (0.2 = 20%)
+    """
+    previous = {(r["case"], r["n"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["case"], result["n"]))
+        if old is None:
+            continue
+        ratio = result["mean_s"] / old["mean_s"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1.0 + threshold:
+            regressions.append({
+                "case": result["case"],
+                "n": result["n"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Saved report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before flagging (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.cases)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(
+                f"REGRESSION {r['case']} n={r['n']}: {r['ratio']:.2f}x baseline",
+                file=sys.stderr,
+            )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Scaling of sharded alert generation from 1 to N processes.
+
+Usage:
+    python benchmarks/sharding.py
+    python benchmarks/sharding.py --count 500000 --processes 8 --output sharding.json
+
+Times ShardedAlertGenerator.generate over a fleet of --count targets
+with 1, 2, ... --processes worker processes (one process: evaluated
+in this process, no pool) and reports seconds per call, targets per
+second and speedup over one process. The single-core vectorized path,
+sort_alerts(generate_alerts(...)), is timed as the reference.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from traffic import make_world
+
+from alert import generate_alerts, sort_alerts
+from sharded_alerts import ShardedAlertGenerator
+
+
+def seconds_per_call(run: Callable[[], Any], repeats: int) -> float:
+    run()  # Warm-up: starts the pool and attaches the shared block
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def report(count: int, processes: int, repeats: int) -> Dict[str, Any]:
+    world = make_world(count)
+    own, targets = world.own, world.targets
+
+    reference = seconds_per_call(
+        lambda: sort_alerts(generate_alerts(own, targets)), repeats
+    )
+    scaling = []
+    for p in range(1, processes + 1):
+        # One shard per process, however small
+        with ShardedAlertGenerator(processes=p, min_shard_rows=1) as generator:
+            seconds = seconds_per_call(lambda: generator.generate(own, targets), repeats)
+            shards = generator.shards
+        scaling.append({
+            "processes": p,
+            "shards": shards,
+            "seconds": seconds,
+            "targets_per_sec": count / seconds,
+        })
+    for row in scaling:
+        row["speedup"] = scaling[0]["seconds"] / row["seconds"]
+
+    return {
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "count": count,
+        "single_core_seconds": reference,
+        "scaling": scaling,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    text = json.dumps(report(args.count, args.processes, args.repeats), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
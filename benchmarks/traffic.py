@@ -0,0 +1,41 @@
+"""
+Deterministic synthetic traffic for benchmarks.
+"""
+import os
+import random
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from position import Position  # noqa: E402
+from vessel import Vessel  # noqa: E402
+from world import World  # noqa: E402
+
+
+def make_own() -> Vessel:
+    return Vessel("OWN", Position(0.0, 0.0), 12.0, 30.0)
+
+
+def make_targets(n: int, seed: int = 42) -> List[Vessel]:
+    """
+    Build n targets spread over an area that grows with n, so the
+    density of nearby (risky) traffic stays realistic.
+
+    The same (n, seed) always gives the same fleet.
+    """
+    rng = random.Random(seed)
+    extent = max(10.0, (n ** 0.5) * 2.0)  # nm half-width
+    return [
+        Vessel(
+            vessel_id=f"T{i}",
+            position=Position(rng.uniform(-extent, extent), rng.uniform(-extent, extent)),
+            speed_knots=rng.uniform(0.0, 25.0),
+            heading_deg=rng.uniform(0.0, 360.0),
+        )
+        for i in range(n)
+    ]
+
+
+def make_world(n: int, seed: int = 42, **options) -> World:
+    return World(make_own(), make_targets(n, seed), **options)
@@ -10,5 +10,6 @@ setup(
     python_requires=">=3.9",
     install_requires=[
         "websockets>=12.0",
+        "numpy>=1.22",
     ],
 )
@@ -0,0 +1,448 @@
+import math
+import mmap
+import re
+from dataclasses import dataclass
+from functools import reduce
+from operator import xor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from world import World
+
+
+# Six-bit ASCII armoring: payload character -> 6-bit value
+SIXBIT = bytes(
+    c - 48 if 48 <= c < 88 else c - 56 if 96 <= c < 120 else 0
+    for c in range(256)
+)
+ARMOR = bytes(v + 48 if v < 40 else v + 56 for v in range(64))
+
+# First payload character of message types 1, 2, 3 (Class A) and 18 (Class B)
+POSITION_TYPES = frozenset([b"1", b"2", b"3", b"B"])
+REPORT_CHARS = 28  # Both report layouts are 168 bits
+
+# Type 18 fields sit 4 bits earlier than types 1-3; offsets are
+# relative to speed over ground (bit 50 in types 1-3, 46 in type 18)
+_ALIGNED_BITS = 118
+_SOG = (0, 10)
+_LON = (11, 28)
+_LAT = (39, 27)
+_COG = (66, 12)
+_HDG = (78, 9)
+
+SLICE_SECONDS = 60.0  # Span of one time slice (with tag block times)
+MAX_SLICE_REPORTS = 10_000  # Reports per slice at most (bounds memory)
+
+
+@dataclass
+class IngestStats:
+    """
+    Counters for one ingestion run.
+    """
+    sentences: int = 0  # Lines read
+    invalid: int = 0  # Malformed lines or checksum mismatches
+    messages: int = 0  # Complete VDM messages
+    reports: int = 0  # Position reports with a valid position
+    slices: int = 0  # Bulk updates applied to the world
+    added: int = 0  # Targets created
+    updated: int = 0  # Target rows updated
+
+
+@dataclass(frozen=True)
+class PositionReports:
+    """
+    Decoded position reports, one array entry per report.
+
+    NaN speed or course means not available; time is NaN when the
+    sentence had no tag block time.
+    """
+    mmsi: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    speed_knots: np.ndarray
+    course_deg: np.ndarray  # Course over ground, else true heading
+    time: np.ndarray  # Unix seconds
+
+    def __len__(self) -> int:
+        return len(self.mmsi)
+
+
+# Framing
+
+def nmea_checksum(body: bytes) -> int:
+    """
+    XOR of the bytes between the leading '!' or '$' and the '*'.
+    """
+    return reduce(xor, body, 0)
+
+
+READ_CHUNK = 1 << 20  # Bytes of the mapped file split into lines at a time
+
+
+def read_lines(path: str) -> Iterator[bytes]:
+    """
+    Lines of a (possibly very large) file through a memory map.
+
+    The map is split a chunk at a time; pages are read on demand by
+    the OS, so memory does not grow with the file size.
+    """
+    with open(path, "rb") as f:
+        if not f.seek(0, 2):
+            return  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            rest = b""
+            for start in range(0, size, READ_CHUNK):
+                data = rest + mapped[start:start + READ_CHUNK]
+                if start + READ_CHUNK < size:
+                    # Bytes after the last newline continue in the next chunk
+                    end = data.rfind(b"\n") + 1
+                    data, rest = data[:end], data[end:]
+                else:
+                    rest = b""
+                for line in data.splitlines():
+                    if line:
+                        yield line
+
+
+class Reassembler:
+    """
+    Joins multi-sentence AIS messages.
+
+    Fragments are keyed by sequential message id and channel; a
+    fragment out of order discards the partial message. At most
+    max_pending partial messages are kept (oldest dropped first).
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self.max_pending = max_pending
+        self.dropped = 0  # Partial messages discarded
+        self._pending: Dict[Tuple[bytes, bytes], Tuple[int, List[bytes]]] = {}
+
+    def add(
+        self, count: int, number: int, seq_id: bytes, channel: bytes, payload: bytes
+    ) -> Optional[bytes]:
+        """
+        Add one fragment.
+
+        Returns:
+            The whole payload once its last fragment arrived, else None
+        """
+        if count == 1:
+            return payload
+
+        key = (seq_id, channel)
+        pending = self._pending.pop(key, None)
+        if number == 1:
+            if pending is not None:
+                self.dropped += 1
+            pending = (count, [payload])
+        elif pending is None or pending[0] != count or len(pending[1]) != number - 1:
+            if pending is not None:
+                self.dropped += 1
+            return None
+        else:
+            pending[1].append(payload)
+
+        if len(pending[1]) == count:
+            return b"".join(pending[1])
+
+        if len(self._pending) >= self.max_pending:
+            del self._pending[next(iter(self._pending))]
+            self.dropped += 1
+        self._pending[key] = pending
+        return None
+
+
+# Optional tag block (with its c: unix time), then !--VDM or !--VDO:
+# talker + type, fragment count, number, sequence id, channel,
+# payload, fill bits and checksum
+_SENTENCE = re.compile(
+    rb"(?:\\(?:[^\\]*?c:(\d+))?[^\\]*\\)?"
+    rb"[!$](\w\wVD([MO]),(\d),(\d),(\d?),(\w?),([^,*]*),\d)\*([0-9A-Fa-f]{2})"
+)
+
+
+def parse_sentence(
+    line: bytes, reassembler: Reassembler
+) -> Tuple[Optional[bytes], float]:
+    """
+    Check and split one AIS NMEA line (optionally with a tag block).
+
+    Returns:
+        (payload, time): payload is None for a fragment still waiting
+        for the rest of its message, or an own ship (VDO) sentence;
+        time is the tag block's unix time, NaN without one
+
+    Raises:
+        ValueError: Not a VDM/VDO sentence, or checksum mismatch
+    """
+    match = _SENTENCE.fullmatch(line)  # Trailing bytes (e.g. a glued line) are invalid
+    if match is None:
+        raise ValueError("not an AIS sentence")
+    time, body, kind, count, number, seq_id, channel, payload, checksum = match.groups()
+    if reduce(xor, body, 0) != int(checksum, 16):
+        raise ValueError("checksum mismatch")
+
+    time = math.nan if time is None else float(time)
+    if kind != b"M":
+        return None, time
+    if count == b"1":
+        return payload, time
+    return reassembler.add(int(count), int(number), seq_id, channel, payload), time
+
+
+def iter_messages(
+    lines: Iterable[bytes],
+    stats: Optional[IngestStats] = None,
+    reassembler: Optional[Reassembler] = None,
+) -> Iterator[Tuple[bytes, float]]:
+    """
+    Complete VDM payloads, as (payload, time), from NMEA lines.
+
+    Invalid lines are counted in stats and skipped.
+    """
+    stats = stats if stats is not None else IngestStats()
+    reassembler = reassembler if reassembler is not None else Reassembler()
+    for line in lines:
+        stats.sentences += 1
+        try:
+            payload, time = parse_sentence(line, reassembler)
+        except ValueError:
+            stats.invalid += 1
+            continue
+        if payload is not None:
+            stats.messages += 1
+            yield payload, time
+
+
+# Payload decoding
+
+def is_position_report(payload: bytes) -> bool:
+    """
+    True for a type 1/2/3/18 payload long enough to decode.
+    """
+    return payload[:1] in POSITION_TYPES and len(payload) >= REPORT_CHARS
+
+
+def decode_position_reports(
+    payloads: List[bytes], times: Optional[List[float]] = None
+) -> PositionReports:
+    """
+    Decode type 1/2/3/18 payloads in one vectorized pass.
+
+    Reports without a valid position are left out.
+
+    Args:
+        payloads: Armored payloads of position reports, at least
+            REPORT_CHARS characters each
+        times: Unix time per payload (NaN if unknown), or None
+    """
+    n = len(payloads)
+    armored = b"".join([p[:REPORT_CHARS] for p in payloads])
+    values = np.frombuffer(armored.translate(SIXBIT), dtype=np.uint8)
+    bits = np.unpackbits(values.reshape(n, REPORT_CHARS, 1), axis=2)[:, :, 2:]
+    bits = bits.reshape(n, 6 * REPORT_CHARS)
+
+    mmsi = _unsigned(bits, 8, 30)
+    class_b = values.reshape(n, REPORT_CHARS)[:, 0] == 18
+    aligned = np.where(
+        class_b[:, None], bits[:, 46:46 + _ALIGNED_BITS], bits[:, 50:50 + _ALIGNED_BITS]
+    )
+    sog = _unsigned(aligned, *_SOG)
+    lon = _signed(aligned, *_LON) / 600_000.0
+    lat = _signed(aligned, *_LAT) / 600_000.0
+    cog = _unsigned(aligned, *_COG)
+    hdg = _unsigned(aligned, *_HDG)
+
+    speed = np.where(sog == 1023, np.nan, sog / 10.0)
+    course = np.where(cog < 3600, cog / 10.0, np.where(hdg < 360, hdg, np.nan))
+    time = np.full(n, np.nan) if times is None else np.asarray(times, dtype=np.float64)
+
+    valid = (np.abs(lat) <= 90.0) & (np.abs(lon) <= 180.0)
+    return PositionReports(
+        mmsi=mmsi[valid],
+        lat=lat[valid],
+        lon=lon[valid],
+        speed_knots=speed[valid],
+        course_deg=course[valid],
+        time=time[valid],
+    )
+
+
+def _unsigned(bits: np.ndarray, start: int, width: int) -> np.ndarray:
+    weights = np.left_shift(1, np.arange(width - 1, -1, -1, dtype=np.int64))
+    return bits[:, start:start + width] @ weights
+
+
+def _signed(bits: np.ndarray, start: int, width: int) -> np.ndarray:
+    value = _unsigned(bits, start, width)
+    return np.where(value >> (width - 1), value - (1 << width), value)
+
+
+def position_slices(
+    messages: Iterable[Tuple[bytes, float]],
+    slice_seconds: float = SLICE_SECONDS,
+    max_reports: int = MAX_SLICE_REPORTS,
+) -> Iterator[PositionReports]:
+    """
+    Group position reports into time slices and decode each slice.
+
+    A slice ends when a report is slice_seconds past the slice's first
+    time, or after max_reports reports (always, for untimed logs).
+    Other message types are skipped.
+    """
+    payloads: List[bytes] = []
+    times: List[float] = []
+    start = math.nan
+    for payload, time in messages:
+        if payload[:1] not in POSITION_TYPES or len(payload) < REPORT_CHARS:
+            continue  # is_position_report, inlined: this loop is per sentence
+        if payloads and (len(payloads) >= max_reports or time - start >= slice_seconds):
+            yield decode_position_reports(payloads, times)
+            payloads, times = [], []
+        if not payloads:
+            start = time
+        payloads.append(payload)
+        times.append(time)
+    if payloads:
+        yield decode_position_reports(payloads, times)
+
+
+# World updates
+
+class LocalProjection:
+    """
+    Equirectangular projection to nautical miles around an origin.
+
+    x grows east and y north, as in the simulation; accurate over the
+    tens of miles a situational picture covers.
+    """
+
+    def __init__(self, lat0: float, lon0: float):
+        self.lat0 = lat0
+        self.lon0 = lon0
+        self._x_scale = 60.0 * math.cos(math.radians(lat0))
+
+    def to_xy(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Longitude difference wrapped into [-180, 180)
+        dlon = (lon - self.lon0 + 180.0) % 360.0 - 180.0
+        return dlon * self._x_scale, (lat - self.lat0) * 60.0
+
+
+def apply_reports(
+    world: World, reports: PositionReports, projection: LocalProjection
+) -> Tuple[int, int]:
+    """
+    Upsert one slice of reports into world, targets keyed by MMSI.
+
+    Returns:
+        (added, updated), as World.upsert_targets
+    """
+    xs, ys = projection.to_xy(reports.lat, reports.lon)
+    return world.upsert_targets(
+        list(map(str, reports.mmsi.tolist())),
+        xs,
+        ys,
+        reports.speed_knots,
+        reports.course_deg,
+    )
+
+
+def ingest_file(
+    world: World,
+    path: str,
+    projection: Optional[LocalProjection] = None,
+    slice_seconds: float = SLICE_SECONDS,
+    max_reports: int = MAX_SLICE_REPORTS,
+) -> IngestStats:
+    """
+    Stream a recorded NMEA log into world, one bulk update per slice.
+
+    Args:
+        world: World to update
+        path: NMEA log, optionally with tag block (c:) times
+        projection: Lat/lon to world coordinates (default: centered on
+            the first report)
+        slice_seconds: Time span of one bulk update
+        max_reports: Reports per bulk update at most
+
+    Returns:
+        Counters for the run
+    """
+    stats = IngestStats()
+    messages = iter_messages(read_lines(path), stats)
+    for reports in position_slices(messages, slice_seconds, max_reports):
+        if not len(reports):
+            continue
+        if projection is None:
+            projection = LocalProjection(float(reports.lat[0]), float(reports.lon[0]))
+        added, updated = apply_reports(world, reports, projection)
+        stats.reports += len(reports)
+        stats.slices += 1
+        stats.added += added
+        stats.updated += updated
+    return stats
+
+
+# Encoding (test data and replay)
+
+def encode_position_report(
+    mmsi: int,
+    lat: float,
+    lon: float,
+    speed_knots: Optional[float],
+    course_deg: Optional[float],
+    heading_deg: Optional[int] = None,
+    message_type: int = 1,
+) -> bytes:
+    """
+    Armored payload of a type 1/2/3 or 18 position report.
+
+    None marks a field as not available.
+    """
+    sog = 1023 if speed_knots is None else min(int(round(speed_knots * 10)), 1022)
+    cog = 3600 if course_deg is None else int(round(course_deg * 10)) % 3600
+    hdg = 511 if heading_deg is None else heading_deg
+    lon_raw = int(round(lon * 600_000)) & ((1 << 28) - 1)
+    lat_raw = int(round(lat * 600_000)) & ((1 << 27) - 1)
+
+    if message_type == 18:
+        fields = [(18, 6), (0, 2), (mmsi, 30), (0, 8), (sog, 10), (0, 1),
+                  (lon_raw, 28), (lat_raw, 27), (cog, 12), (hdg, 9), (60, 6),
+                  (0, 29)]
+    else:
+        fields = [(message_type, 6), (0, 2), (mmsi, 30), (0, 4), (128, 8),
+                  (sog, 10), (0, 1), (lon_raw, 28), (lat_raw, 27), (cog, 12),
+                  (hdg, 9), (60, 6), (0, 25)]
+
+    value = 0
+    for field, width in fields:
+        value = (value << width) | field
+    return bytes(
+        ARMOR[(value >> shift) & 63] for shift in range(162, -1, -6)
+    )
+
+
+def nmea_sentences(
+    payload: bytes,
+    seq_id: int = 0,
+    channel: bytes = b"A",
+    max_chars: int = 60,
+    time: Optional[float] = None,
+) -> List[bytes]:
+    """
+    !AIVDM sentences carrying payload (fragmented above max_chars).
+
+    With time set, the first sentence gets a tag block with it.
+    """
+    parts = [payload[i:i + max_chars] for i in range(0, len(payload), max_chars)]
+    seq = str(seq_id % 10).encode() if len(parts) > 1 else b""
+    sentences = []
+    for number, part in enumerate(parts, 1):
+        body = b"AIVDM,%d,%d,%s,%s,%s,0" % (len(parts), number, seq, channel, part)
+        sentence = b"!%s*%02X" % (body, nmea_checksum(body))
+        if time is not None and number == 1:
+            tag = b"c:%d" % int(time)
+            sentence = b"\\%s*%02X\\%s" % (tag, nmea_checksum(tag), sentence)
+        sentences.append(sentence)
+    return sentences
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import socket
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple
+from ais import (
+    IngestStats,
+    LocalProjection,
+    Reassembler,
+    apply_reports,
+    decode_position_reports,
+    is_position_report,
+    parse_sentence,
+)
+from metrics import METRICS
+from world import World
+
+
+logger = logging.getLogger(__name__)
+
+AIS_PORT = 10110  # Customary port for NMEA over UDP
+MAX_QUEUE = 50_000  # Buffered reports at most; newer ones are dropped
+RECV_BUFFER = 4 << 20  # Socket receive buffer: bursts wait here between reads
+
+
+@dataclass
+class FeedStats(IngestStats):
+    """
+    Counters for a live feed (cumulative).
+    """
+    datagrams: int = 0  # UDP packets received
+    dropped: int = 0  # Reports dropped because the queue was full
+    fragments_dropped: int = 0  # Partial multi-sentence messages discarded
+
+
+class AisFeed(asyncio.DatagramProtocol):
+    """
+    UDP listener for AIS NMEA sentences, applied to a world once per tick.
+
+    Each datagram may carry several sentences; multi-sentence messages
+    are reassembled across datagrams. Position reports (types 1, 2, 3
+    and 18) are only checked and queued on arrival. apply(), called
+    once per simulation tick, decodes the whole queue in one vectorized
+    pass and upserts it into the world in one bulk update, so the cost
+    per packet stays small and websocket clients are not starved.
+
+    The queue holds at most max_queue reports; reports arriving while
+    it is full are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        projection: Optional[LocalProjection] = None,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self.projection = projection  # Default: centered on the first report
+        self.max_queue = max_queue
+        self.stats = FeedStats()
+        self.reassembler = Reassembler()
+        self._payloads: List[bytes] = []
+        self._reported = FeedStats()  # Counters already passed to METRICS
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._payloads)
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        stats = self.stats
+        stats.datagrams += 1
+        for line in data.splitlines():
+            if not line:
+                continue
+            stats.sentences += 1
+            try:
+                payload, _ = parse_sentence(line, self.reassembler)
+            except ValueError:
+                stats.invalid += 1
+                continue
+            if payload is None:
+                continue
+            stats.messages += 1
+            if not is_position_report(payload):
+                continue
+            if len(self._payloads) >= self.max_queue:
+                stats.dropped += 1
+                continue
+            self._payloads.append(payload)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning(f"AIS feed socket error: {exc}")
+
+    def apply(self, world: World) -> Tuple[int, int]:
+        """
+        Upsert every queued report into world in one bulk update.
+
+        Returns:
+            (added, updated), as World.upsert_targets
+        """
+        payloads, self._payloads = self._payloads, []
+        # Depth just before the tick, the peak since the last one
+        METRICS.set_gauge("ais.queue_depth", len(payloads))
+        added = updated = 0
+        if payloads:
+            with METRICS.span("ais.apply"):
+                reports = decode_position_reports(payloads)
+                if len(reports):
+                    if self.projection is None:
+                        self.projection = LocalProjection(
+                            float(reports.lat[0]), float(reports.lon[0])
+                        )
+                    added, updated = apply_reports(world, reports, self.projection)
+            stats = self.stats
+            stats.reports += len(reports)
+            stats.slices += 1
+            stats.added += added
+            stats.updated += updated
+
+        self.stats.fragments_dropped = self.reassembler.dropped
+        self._count_metrics()
+        return added, updated
+
+    def _count_metrics(self) -> None:
+        # Counters since the last tick, as ais.<field>
+        if not METRICS.enabled:
+            return
+        for field in fields(FeedStats):
+            value = getattr(self.stats, field.name)
+            delta = value - getattr(self._reported, field.name)
+            if delta:
+                METRICS.count(f"ais.{field.name}", delta)
+                setattr(self._reported, field.name, value)
+
+
+async def listen(
+    feed: AisFeed, host: str = "localhost", port: int = AIS_PORT
+) -> asyncio.DatagramTransport:
+    """
+    Bind feed to a UDP address on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: feed, local_addr=(host, port)
+    )
+    # The kernel caps this at net.core.rmem_max
+    transport.get_extra_info("socket").setsockopt(
+        socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER
+    )
+    logger.info(f"Listening for AIS NMEA on udp://{host}:{port}")
+    return transport
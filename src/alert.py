@@ -1,12 +1,15 @@
+import heapq
+import math
 from dataclasses import dataclass
-from functools import cmp_to_key
-from typing import Iterable, List
-from risk import RiskLevel, classify_risk
-from cpa import cpa_distance, tcpa
+from typing import Iterable, List, Optional
+import numpy as np
+from risk import RISK_LEVELS, RiskLevel, classify_risk_batch, evaluate_risk
+from cpa import cpa_tcpa_batch
 from vessel import Vessel
+from vessel_table import VesselTable
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Alert:
     """
     Represents a collision alert for a target vessel.
@@ -28,11 +31,12 @@ def generate_alert(own: Vessel, target: Vessel) -> Alert:
     Returns:
         Alert
     """
+    cpa_nm, tcpa_hours, risk_level = evaluate_risk(own, target)
     return Alert(
         target_id=target.vessel_id,
-        risk_level=classify_risk(own, target),
-        cpa_nm=cpa_distance(own, target),
-        tcpa_hours=tcpa(own, target)
+        risk_level=risk_level,
+        cpa_nm=cpa_nm,
+        tcpa_hours=tcpa_hours
     )
 
 def generate_alerts(
@@ -43,6 +47,9 @@ def generate_alerts(
     """
     Generate collision alerts for multiple target vessels.
 
+    A VesselTable is evaluated with the batched CPA/TCPA kernel;
+    any other iterable is evaluated one target at a time.
+
     Args:
         own: Own vessel
         targets: Iterable of target vessels
@@ -51,6 +58,17 @@ def generate_alerts(
     Returns:
         List of Alert objects
     """
+    if isinstance(targets, VesselTable):
+        return generate_alerts_batch(
+            own,
+            targets.ids,
+            targets.x,
+            targets.y,
+            targets.vx,
+            targets.vy,
+            include_safe=include_safe,
+        )
+
     alerts: List[Alert] = []
 
     for target in targets:
@@ -61,6 +79,88 @@ def generate_alerts(
 
     return alerts
 
+def generate_alerts_batch(
+    own: Vessel,
+    ids: np.ndarray,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    vxs: np.ndarray,
+    vys: np.ndarray,
+    include_safe: bool = False,
+) -> List[Alert]:
+    """
+    Generate collision alerts from target columns in one NumPy pass.
+
+    Args:
+        own: Own vessel
+        ids: Target ids
+        xs, ys: Target positions
+        vxs, vys: Target velocity components
+        include_safe: Whether to include SAFE alerts
+
+    Returns:
+        List of Alert objects, in target order
+    """
+    cpa, t = cpa_tcpa_batch(own, xs, ys, vxs, vys)
+    return alerts_from_columns(ids, cpa, t, include_safe=include_safe)
+
+def alerts_from_columns(
+    ids: np.ndarray,
+    cpa: np.ndarray,
+    t: np.ndarray,
+    include_safe: bool = False,
+    codes: Optional[np.ndarray] = None,
+) -> List[Alert]:
+    """
+    Classify precomputed CPA/TCPA columns and build their alerts.
+
+    Args:
+        ids: Target ids
+        cpa: CPA distances in nautical miles
+        t: TCPA values in hours (NaN for no relative motion)
+        include_safe: Whether to include SAFE alerts
+        codes: Risk codes, if already known (classified here otherwise)
+
+    Returns:
+        List of Alert objects, in target order
+    """
+    if codes is None:
+        codes = classify_risk_batch(cpa, t)
+
+    rows = np.arange(len(codes)) if include_safe else np.flatnonzero(codes)
+
+    return [
+        Alert(
+            target_id=target_id,
+            risk_level=RISK_LEVELS[code],
+            cpa_nm=cpa_nm,
+            tcpa_hours=None if math.isnan(tcpa_hours) else tcpa_hours,
+        )
+        for target_id, code, cpa_nm, tcpa_hours in zip(
+            ids[rows].tolist(),
+            codes[rows].tolist(),
+            cpa[rows].tolist(),
+            t[rows].tolist(),
+        )
+    ]
+
+# Sort priority per risk level: lower sorts first
+RISK_PRIORITY = {
+    RiskLevel.DANGER: 0,
+    RiskLevel.WARNING: 1,
+    RiskLevel.SAFE: 2,
+}
+
+
+def alert_sort_key(alert: Alert) -> tuple:
+    """
+    Sort key for sort_alerts: (risk priority, CPA missing, CPA).
+    """
+    cpa_nm = alert.cpa_nm
+    if cpa_nm is None:
+        return RISK_PRIORITY[alert.risk_level], True, 0.0
+    return RISK_PRIORITY[alert.risk_level], False, cpa_nm
+
 def alert_text(alert: Alert) -> str:
     if alert.cpa_nm is None:
         return f"No collision risk – {alert.risk_level.value}"
@@ -76,39 +176,26 @@ def alert_text(alert: Alert) -> str:
          f"CPA {alert.cpa_nm:.1f} nm "
         f"in {tcpa_minutes} min – {alert.risk_level.value}"
     )
-def sort_alerts(alerts: List[Alert]) -> List[Alert]:
+def sort_alerts(alerts: List[Alert], top_k: Optional[int] = None) -> List[Alert]:
     """
-    Sort alerts using a traditional comparator:
+    Sort alerts by priority:
     1. Risk level (DANGER > WARNING > SAFE)
-    2. CPA distance (smaller is higher priority)
-    """
+    2. CPA distance (smaller is higher priority, None last)
 
-    risk_priority = {
-        RiskLevel.DANGER: 0,
-        RiskLevel.WARNING: 1,
-        RiskLevel.SAFE: 2,
-    }
-
-    def compare(a: Alert, b: Alert) -> int:
-        # 1. Compare risk level
-        rp_diff = (
-            risk_priority[a.risk_level]
-            - risk_priority[b.risk_level]
-        )
-        if rp_diff != 0:
-            return rp_diff
-
-        # 2. Compare CPA distance
-        if a.cpa_nm is None and b.cpa_nm is None:
-            return 0
-        if a.cpa_nm is None:
-            return 1
-        if b.cpa_nm is None:
-            return -1
+    Alerts that compare equal keep their input order.
 
-        # Traditional comparison idiom
-        return (a.cpa_nm > b.cpa_nm) - (a.cpa_nm < b.cpa_nm)
+    Args:
+        alerts: Alerts to sort
+        top_k: If given, return only the top_k highest-priority alerts
+            (heap selection instead of a full sort)
 
-    return sorted(alerts, key=cmp_to_key(compare))
+    Returns:
+        Sorted list of Alert objects
+    """
+    if top_k is not None:
+        if top_k <= 0:
+            return []
+        if top_k < len(alerts):
+            return heapq.nsmallest(top_k, alerts, key=alert_sort_key)
 
-    
\ No newline at end of file
+    return sorted(alerts, key=alert_sort_key)
@@ -0,0 +1,118 @@
+import math
+from typing import List, Optional
+import numpy as np
+from alert import Alert, alerts_from_columns
+from cpa import cpa_tcpa_batch
+from risk_schedule import RiskScheduler
+from vessel import Vessel
+from vessel_table import VesselTable
+
+
+class CachedAlertEvaluator:
+    """
+    World evaluator that keeps CPA results between ticks.
+
+    Under straight-line motion the CPA distance of a pair never
+    changes and the time of closest approach is a fixed instant, so
+    TCPA only counts down. For every target row the cache stores the
+    CPA distance and the absolute time of CPA (on the table's clock,
+    VesselTable.time_hours), tagged with the row's kinematic version.
+
+    Each call recomputes only rows whose version changed (course,
+    speed or position update, new or moved rows). Everything is
+    recomputed when own ship's version changes, or when own ship is
+    not where its last course puts it (stepped apart from the table).
+
+    Risk levels come from a RiskScheduler, so between course changes
+    a row is only re-classified when its TCPA crosses a threshold. The
+    scheduler only runs forward: if the clock went back (a negative
+    step), every row is re-classified.
+    """
+
+    def __init__(self):
+        self.recomputed = 0  # Target rows recomputed in the last call
+        self.scheduler = RiskScheduler()
+        self._own_version: Optional[int] = None
+        self._own_x = 0.0
+        self._own_y = 0.0
+        self._time = 0.0
+        self._versions = np.empty(0, dtype=np.int64)
+        self._cpa = np.empty(0, dtype=np.float64)
+        self._cpa_time = np.empty(0, dtype=np.float64)  # NaN: no relative motion
+
+    def __call__(self, own: Vessel, targets: VesselTable) -> List[Alert]:
+        now = targets.time_hours
+        n = len(targets)
+        versions = targets.versions
+
+        known = min(len(self._versions), n)
+        if len(self._versions) != n:
+            self._resize(n, keep=known)
+
+        full = self._own_moved(own, now)
+        rewound = now < self._time
+        if full:
+            stale = np.arange(n)
+        else:
+            stale = np.concatenate([
+                np.flatnonzero(versions[:known] != self._versions[:known]),
+                np.arange(known, n),
+            ])
+
+        if len(stale):
+            cpa, t = cpa_tcpa_batch(
+                own,
+                targets.x[stale],
+                targets.y[stale],
+                targets.vx[stale],
+                targets.vy[stale],
+            )
+            self._cpa[stale] = cpa
+            self._cpa_time[stale] = t + now
+            self._versions[stale] = versions[stale]
+        self.recomputed = len(stale)
+
+        position = own.position
+        self._own_version = own.kinematic_version
+        self._own_x, self._own_y = position.x, position.y
+        self._time = now
+
+        columns = (self._cpa, self._cpa_time, self._versions, now)
+        if full or rewound:
+            self.scheduler.reset(*columns)
+        else:
+            self.scheduler.update(stale, *columns)
+            self.scheduler.advance(*columns)
+
+        return alerts_from_columns(
+            targets.ids,
+            self._cpa,
+            self._cpa_time - now,
+            include_safe=True,
+            codes=self.scheduler.codes,
+        )
+
+    def _own_moved(self, own: Vessel, now: float) -> bool:
+        """
+        True if own ship left the course the cache was computed for.
+        """
+        if own.kinematic_version != self._own_version:
+            return True
+        vx, vy = own.velocity_vector()
+        elapsed = now - self._time
+        position = own.position
+        return not (
+            math.isclose(position.x, self._own_x + vx * elapsed,
+                         rel_tol=1e-9, abs_tol=1e-9)
+            and math.isclose(position.y, self._own_y + vy * elapsed,
+                             rel_tol=1e-9, abs_tol=1e-9)
+        )
+
+    def _resize(self, n: int, keep: int) -> None:
+        versions = np.zeros(n, dtype=np.int64)  # 0 is never a live version
+        cpa = np.empty(n, dtype=np.float64)
+        cpa_time = np.empty(n, dtype=np.float64)
+        versions[:keep] = self._versions[:keep]
+        cpa[:keep] = self._cpa[:keep]
+        cpa_time[:keep] = self._cpa_time[:keep]
+        self._versions, self._cpa, self._cpa_time = versions, cpa, cpa_time
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import websockets.exceptions
+from delta import DeltaEncoder, keyframe_message
+from metrics import METRICS
+
+
+logger = logging.getLogger(__name__)
+
+JSON_SLICE = 500  # List items per json.dumps call in dumps()
+
+
+def dumps(message: Dict[str, Any]) -> str:
+    """
+    Same text as json.dumps(message), with long lists encoded a slice
+    at a time.
+
+    json.dumps holds the GIL for the whole call; 100k targets take over
+    a second. Encoded in slices, a frame built on the snapshot worker
+    lets the event loop run in between.
+    """
+    items = []
+    for name, value in message.items():
+        if isinstance(value, dict):
+            text = dumps(value)
+        elif isinstance(value, list) and len(value) > JSON_SLICE:
+            text = "[" + ", ".join(
+                json.dumps(value[i:i + JSON_SLICE])[1:-1]
+                for i in range(0, len(value), JSON_SLICE)
+            ) + "]"
+        else:
+            text = json.dumps(value)
+        items.append(f"{json.dumps(name)}: {text}")
+    return "{" + ", ".join(items) + "}"
+
+
+class Frame:
+    """
+    One published snapshot.
+
+    Each wire format (full snapshot, delta stream message, keyframe)
+    is serialized at most once and the same payload object is handed
+    to every subscriber that needs it.
+    """
+
+    def __init__(
+        self,
+        seq: int,
+        snapshot: Dict[str, Any],
+        message: Optional[Dict[str, Any]] = None,
+    ):
+        self.seq = seq
+        self.snapshot = snapshot
+        self.message = message  # Delta stream message, if encoded
+        self._full: Optional[str] = None
+        self._stream: Optional[str] = None
+        self._keyframe: Optional[str] = None
+
+    @property
+    def is_keyframe(self) -> bool:
+        return self.message is not None and self.message["type"] == "keyframe"
+
+    def full_payload(self) -> str:
+        if self._full is None:
+            self._full = dumps(self.snapshot)
+            METRICS.set_gauge("snapshot_bytes", len(self._full))
+        return self._full
+
+    def stream_payload(self) -> str:
+        if self._stream is None:
+            self._stream = dumps(self.message)
+        return self._stream
+
+    def serialize(self, full: bool, stream: bool) -> None:
+        """
+        Serialize the full snapshot and/or the stream message now.
+
+        Lets the JSON encoding run where the frame is built (e.g. on the
+        snapshot worker) instead of in the subscribers' send loops.
+        """
+        if full:
+            self.full_payload()
+        if stream and self.message is not None:
+            self.stream_payload()
+
+    def keyframe_payload(self) -> str:
+        if self.is_keyframe:
+            return self.stream_payload()
+        if self._keyframe is None:
+            self._keyframe = dumps(keyframe_message(self.snapshot, self.seq))
+        return self._keyframe
+
+
+class Subscriber:
+    """
+    A connection receiving broadcast frames.
+
+    The subscriber holds only the latest undelivered frame: publishing
+    while a send is still in progress replaces the pending frame and
+    counts the stale one as dropped. Delta subscribers that missed a
+    frame are resynchronized with a keyframe.
+    """
+
+    def __init__(self, websocket, delta: bool = False):
+        self.websocket = websocket
+        self.delta = delta
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_sent = 0
+        self._pending: Optional[Frame] = None
+        self._last_seq: Optional[int] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def set_delta(self, delta: bool) -> None:
+        self.delta = delta
+        self._last_seq = None
+
+    def request_keyframe(self) -> None:
+        self._last_seq = None
+
+    def offer(self, frame: Frame) -> None:
+        if self._pending is not None:
+            self.frames_dropped += 1
+        self._pending = frame
+        self._wakeup.set()
+
+    def payload_for(self, frame: Frame) -> str:
+        if not self.delta or frame.message is None:
+            return frame.full_payload()
+
+        if frame.is_keyframe or self._last_seq == frame.seq - 1:
+            payload = frame.stream_payload()
+        else:
+            payload = frame.keyframe_payload()
+        self._last_seq = frame.seq
+        return payload
+
+    async def run(self) -> None:
+        """
+        Deliver frames until the connection closes.
+        """
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                frame, self._pending = self._pending, None
+                if frame is None:
+                    continue
+
+                with METRICS.span("broadcast.encode"):
+                    payload = self.payload_for(frame)
+                started = METRICS.start()
+                await self.websocket.send(payload)
+                METRICS.stop("broadcast.send", started)
+                self.frames_sent += 1
+                self.bytes_sent += len(payload)
+                METRICS.count("bytes_sent", len(payload))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delta": self.delta,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class Broadcaster:
+    """
+    Fans published snapshots out to all subscribers.
+
+    publish() never waits on a connection: it encodes the frame once
+    (encode) and drops it into every subscriber's single-slot mailbox
+    (offer), so a slow browser only loses stale frames instead of
+    stalling the loop.
+    """
+
+    def __init__(self, keyframe_interval: int = 50):
+        self.keyframe_interval = keyframe_interval
+        self.subscribers: List[Subscriber] = []
+        self._encoder: Optional[DeltaEncoder] = None
+        self._seq = 0
+
+    def subscribe(self, websocket, delta: bool = False) -> Subscriber:
+        subscriber = Subscriber(websocket, delta)
+        subscriber._task = asyncio.ensure_future(subscriber.run())
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        if subscriber._task is not None:
+            subscriber._task.cancel()
+
+    def formats(self) -> Tuple[bool, bool]:
+        """
+        (full, delta): whether any subscriber takes full snapshots, and
+        whether any follows the delta stream.
+        """
+        delta = any(s.delta for s in self.subscribers)
+        full = not all(s.delta for s in self.subscribers)
+        return full, delta
+
+    def publish(self, snapshot: Dict[str, Any]) -> Frame:
+        """
+        Publish a snapshot to every subscriber without blocking.
+        """
+        frame = self.encode(snapshot, *self.formats())
+        self.offer(frame)
+        return frame
+
+    def encode(self, snapshot: Dict[str, Any], full: bool, delta: bool) -> Frame:
+        """
+        Build the next frame and serialize the payloads it will need.
+
+        Does not touch the subscribers, so it may run on a worker
+        thread (take formats() on the event loop first). Calls must not
+        overlap; frames are offered in the order they were encoded.
+        """
+        message = None
+        if delta:
+            if self._encoder is None:
+                self._encoder = DeltaEncoder(self.keyframe_interval)
+            with METRICS.span("broadcast.delta"):
+                message = self._encoder.encode(snapshot)
+            self._seq = self._encoder.seq
+        else:
+            # Nobody follows the delta stream; restart it on demand
+            self._encoder = None
+            self._seq += 1
+
+        frame = Frame(self._seq, snapshot, message)
+        with METRICS.span("broadcast.serialize"):
+            frame.serialize(full, delta)
+        return frame
+
+    def offer(self, frame: Frame) -> None:
+        """
+        Hand an encoded frame to every subscriber.
+        """
+        for subscriber in self.subscribers:
+            subscriber.offer(frame)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [s.stats() for s in self.subscribers]
@@ -0,0 +1,224 @@
+import json
+import math
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class CommandError(ValueError):
+    """
+    A message that cannot be applied. Sent back to the client as an
+    error reply; the connection stays open.
+    """
+
+    def __init__(self, message: str, command: Optional[str] = None,
+                 field: Optional[str] = None):
+        super().__init__(message)
+        self.command = command
+        self.field = field
+
+    def reply(self) -> Dict[str, Any]:
+        reply = {"type": "error", "command": self.command, "error": str(self)}
+        if self.field is not None:
+            reply["field"] = self.field
+        return reply
+
+
+_REQUIRED = object()
+
+# Field kinds: accepted exact types (bool is not a number)
+NUMBER = (int, float)
+INTEGER = (int,)
+STRING = (str,)
+BOOLEAN = (bool,)
+ARRAY = (list,)
+
+
+class Field:
+    """
+    One message field: kind, default (required if omitted) and limits.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: Tuple[type, ...],
+        default: Any = _REQUIRED,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+        exclusive_minimum: bool = False,
+        choices: Optional[Tuple[Any, ...]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exclusive_minimum = exclusive_minimum
+        self.choices = choices
+
+
+def number(name: str, default: Any = _REQUIRED, **limits) -> Field:
+    return Field(name, NUMBER, default, **limits)
+
+
+def integer(name: str, default: Any = _REQUIRED, **limits) -> Field:
+    return Field(name, INTEGER, default, **limits)
+
+
+def string(name: str, default: Any = _REQUIRED, **limits) -> Field:
+    return Field(name, STRING, default, **limits)
+
+
+def boolean(name: str, default: Any = _REQUIRED) -> Field:
+    return Field(name, BOOLEAN, default)
+
+
+def array(name: str, default: Any = _REQUIRED) -> Field:
+    return Field(name, ARRAY, default)
+
+
+class Schema:
+    """
+    Field checks compiled into flat tuples once, at registration.
+
+    validate() walks the tuples with exact type membership tests and
+    precomputed limits; nothing is looked up per message.
+    """
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+        self._checks = tuple(
+            (
+                f.name,
+                frozenset(f.kind),
+                f.default is _REQUIRED,
+                f.default,
+                f.kind in (NUMBER, INTEGER),
+                -math.inf if f.minimum is None else f.minimum,
+                math.inf if f.maximum is None else f.maximum,
+                f.exclusive_minimum,
+                None if f.choices is None else frozenset(f.choices),
+            )
+            for f in fields
+        )
+
+    def validate(self, data: Dict[str, Any], command: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Check data and return the declared fields, defaults filled in.
+
+        Raises:
+            CommandError: Missing field, wrong type or value out of range
+        """
+        args = {}
+        for (name, kinds, required, default, numeric,
+             low, high, exclusive, choices) in self._checks:
+            value = data.get(name, _REQUIRED)
+            if value is _REQUIRED:
+                if required:
+                    raise CommandError(f"missing field {name!r}", command, name)
+                args[name] = default
+                continue
+
+            if type(value) not in kinds:
+                raise CommandError(f"{name!r} has the wrong type", command, name)
+            if numeric:
+                if not math.isfinite(value):
+                    raise CommandError(f"{name!r} must be finite", command, name)
+                if value < low or (exclusive and value == low) or value > high:
+                    raise CommandError(f"{name!r} is out of range", command, name)
+            if choices is not None and value not in choices:
+                raise CommandError(
+                    f"{name!r} must be one of {sorted(choices)}", command, name
+                )
+            args[name] = value
+        return args
+
+
+# Handler: (client, validated args) -> awaitable
+CommandHandler = Callable[[Any, Dict[str, Any]], Awaitable[None]]
+
+
+class Command:
+    """
+    A registered command.
+
+    snapshot tells the caller whether the command needs a snapshot
+    reply; batchable commands may appear inside a batch.
+    """
+
+    __slots__ = ("name", "schema", "handler", "snapshot", "batchable")
+
+    def __init__(self, name: str, schema: Schema, handler: CommandHandler,
+                 snapshot: bool, batchable: bool):
+        self.name = name
+        self.schema = schema
+        self.handler = handler
+        self.snapshot = snapshot
+        self.batchable = batchable
+
+
+class CommandTable:
+    """
+    Command name -> Command dispatch table.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Command] = {}
+
+    def register(
+        self,
+        name: str,
+        *fields: Field,
+        snapshot: bool = True,
+        batchable: bool = False,
+    ) -> Callable[[CommandHandler], CommandHandler]:
+        """
+        Decorator registering a handler under name with its fields.
+        """
+        def decorate(handler: CommandHandler) -> CommandHandler:
+            if name in self._commands:
+                raise ValueError(f"Command {name!r} is already registered")
+            self._commands[name] = Command(
+                name, Schema(*fields), handler, snapshot, batchable
+            )
+            return handler
+        return decorate
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._commands
+
+    def get(self, name: str) -> Optional[Command]:
+        return self._commands.get(name)
+
+    def parse(self, data: Any, batch: bool = False) -> Tuple[Command, Dict[str, Any]]:
+        """
+        Look up and validate one decoded message.
+
+        Args:
+            data: Decoded JSON message
+            batch: Only accept batchable commands
+
+        Returns:
+            (command, args)
+
+        Raises:
+            CommandError: Not an object, unknown command or invalid fields
+        """
+        if type(data) is not dict:
+            raise CommandError("message must be a JSON object")
+        name = data.get("command")
+        command = self._commands.get(name) if type(name) is str else None
+        if command is None:
+            raise CommandError(f"unknown command {name!r}")
+        if batch and not command.batchable:
+            raise CommandError(f"{name!r} is not allowed in a batch", name)
+        return command, command.schema.validate(data, name)
+
+    def parse_message(self, message: Any) -> Tuple[Command, Dict[str, Any]]:
+        """
+        Decode a websocket text message and parse it.
+        """
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            raise CommandError("message is not valid JSON") from None
+        return self.parse(data)
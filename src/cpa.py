@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from motion import relative_position, relative_velocity
 from vessel import Vessel
 
@@ -26,29 +27,94 @@ def tcpa(own: Vessel, target: Vessel) -> float | None:
     return t
 
 
-#To calculate the CPA
-def cpa_distance(own: Vessel, target: Vessel) -> float | None:
+def cpa_tcpa(own: Vessel, target: Vessel) -> tuple[float, float | None]:
     """
-    Compute distance at Closest Point of Approach (CPA).
+    Compute CPA distance and TCPA together.
+
+    Relative position and velocity are computed once and shared by
+    both results.
 
     Args:
         own: Own vessel
         target: Target vessel
 
     Returns:
-        CPA distance in nautical miles
+        (cpa, tcpa): CPA distance in nautical miles and TCPA in hours
+        (None if relative velocity is zero)
     """
     dx, dy = relative_position(own, target)
     dvx, dvy = relative_velocity(own, target)
 
-    t = tcpa(own, target)
+    v_squared = dvx * dvx + dvy * dvy
 
     # No relative motion → distance never changes
-    if t is None:
-        return math.hypot(dx, dy)
+    if v_squared == 0.0:
+        return math.hypot(dx, dy), None
+
+    t = - (dx * dvx + dy * dvy) / v_squared
 
     # Relative position at CPA
     cx = dx + dvx * t
     cy = dy + dvy * t
 
-    return math.hypot(cx, cy)
+    return math.hypot(cx, cy), t
+
+
+#To calculate the CPA
+def cpa_distance(own: Vessel, target: Vessel) -> float | None:
+    """
+    Compute distance at Closest Point of Approach (CPA).
+
+    Args:
+        own: Own vessel
+        target: Target vessel
+
+    Returns:
+        CPA distance in nautical miles
+    """
+    return cpa_tcpa(own, target)[0]
+
+def cpa_tcpa_batch(
+    own: Vessel,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    vxs: np.ndarray,
+    vys: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute CPA distance and TCPA for many targets in one pass.
+
+    Uses the same arithmetic as cpa_distance and tcpa, applied to
+    whole arrays of target positions and velocities.
+
+    Args:
+        own: Own vessel
+        xs, ys: Target positions
+        vxs, vys: Target velocity components (nm per hour)
+
+    Returns:
+        (cpa, tcpa): Arrays of CPA distances in nautical miles and
+        TCPA in hours. TCPA is NaN where the relative velocity is zero;
+        CPA is then the current distance.
+    """
+    own_vx, own_vy = own.velocity_vector()
+    own_pos = own.position
+
+    dx = np.asarray(xs, dtype=np.float64) - own_pos.x
+    dy = np.asarray(ys, dtype=np.float64) - own_pos.y
+    dvx = np.asarray(vxs, dtype=np.float64) - own_vx
+    dvy = np.asarray(vys, dtype=np.float64) - own_vy
+
+    v_squared = dvx * dvx + dvy * dvy
+    moving = v_squared != 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = - (dx * dvx + dy * dvy) / v_squared
+    t[~moving] = np.nan
+
+    # No relative motion → distance never changes
+    t_cpa = np.where(moving, t, 0.0)
+    cx = dx + dvx * t_cpa
+    cy = dy + dvy * t_cpa
+
+    return np.hypot(cx, cy), t
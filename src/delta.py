@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional
+
+
+def target_keys(targets: List[Dict[str, Any]]) -> List[str]:
+    """
+    Build stable keys for snapshot targets.
+
+    Target ids may repeat, so each key combines the occurrence number
+    with the id ("0:T1", "1:T1", ...). The part before the first colon
+    is always an integer, which keeps keys unambiguous.
+    """
+    seen: Dict[str, int] = {}
+    keys = []
+    for target in targets:
+        vessel_id = target["id"]
+        n = seen.get(vessel_id, 0)
+        seen[vessel_id] = n + 1
+        keys.append(f"{n}:{vessel_id}")
+    return keys
+
+
+def keyframe_message(snapshot: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    """
+    Build a keyframe message: the full snapshot with keyed targets.
+    """
+    targets = snapshot["targets"]
+    return {
+        "type": "keyframe",
+        "seq": seq,
+        "own": snapshot["own"],
+        "targets": [
+            dict(t, key=key) for key, t in zip(target_keys(targets), targets)
+        ],
+        "alerts": snapshot["alerts"],
+    }
+
+
+class DeltaEncoder:
+    """
+    Encodes successive world snapshots as keyframes and deltas.
+
+    A keyframe carries the full snapshot, with a "key" added to every
+    target. A delta carries only what changed since the previous frame:
+    changed own fields, changed target fields, and added and removed
+    targets. Nested fields are diffed too, so a move east sends only
+    {"position": {"x": ...}}.
+
+    Alerts are sent as risk transitions only: a target's "alert" is
+    included when its risk level changed, and deltas carry no alert
+    list. CPA and TCPA drift every tick while vessels move, so the
+    client derives them (and the alert text and list) from the own and
+    target kinematics it already has. A keyframe is sent first, every
+    keyframe_interval frames, and after request_keyframe().
+    """
+
+    def __init__(self, keyframe_interval: int = 50):
+        if keyframe_interval < 1:
+            raise ValueError("Keyframe interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self._since_keyframe = 0
+        self._own: Optional[Dict[str, Any]] = None
+        self._targets: Dict[str, Dict[str, Any]] = {}
+
+    def request_keyframe(self) -> None:
+        """
+        Force the next frame to be a keyframe (client resync).
+        """
+        self._own = None
+
+    def encode(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode a snapshot relative to the previously encoded one.
+
+        Args:
+            snapshot: Result of World.snapshot()
+
+        Returns:
+            Keyframe or delta message
+        """
+        self.seq += 1
+        targets = snapshot["targets"]
+        keyed = dict(zip(target_keys(targets), targets))
+
+        if self._own is None or self._since_keyframe >= self.keyframe_interval:
+            self._since_keyframe = 1
+            message = keyframe_message(snapshot, self.seq)
+        else:
+            message = self._delta(snapshot, keyed)
+
+        self._own = snapshot["own"]
+        self._targets = keyed
+        return message
+
+    def _delta(
+        self, snapshot: Dict[str, Any], keyed: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        self._since_keyframe += 1
+        message: Dict[str, Any] = {"type": "delta", "seq": self.seq}
+
+        own = _changed_fields(self._own, snapshot["own"])
+        if own:
+            message["own"] = own
+
+        previous = self._targets
+        added = [dict(t, key=key) for key, t in keyed.items() if key not in previous]
+        removed = [key for key in previous if key not in keyed]
+        changed = []
+        for key, target in keyed.items():
+            old = previous.get(key)
+            if old is None:
+                continue
+            fields = _changed_fields(old, target)
+            alert = target.get("alert")
+            if alert is not None and alert["risk"] == old["alert"]["risk"]:
+                fields.pop("alert", None)  # Same risk: the client derives the rest
+            if fields:
+                fields["key"] = key
+                changed.append(fields)
+
+        if added or removed or changed:
+            message["targets"] = {
+                "added": added,
+                "removed": removed,
+                "changed": changed,
+            }
+
+        return message
+
+
+def _changed_fields(
+    old: Dict[str, Any], new: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Fields of new that differ from old; nested dicts hold only their changes.
+    """
+    changed = {}
+    for name, value in new.items():
+        previous = old.get(name)
+        if previous == value:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            value = _changed_fields(previous, value)
+        changed[name] = value
+    return changed
@@ -0,0 +1,134 @@
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Dict
+
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS_S = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """
+    Duration histogram: cumulative bucket counts plus a rolling window
+    of recent samples for percentiles.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.bucket_counts = [0] * (len(BUCKETS_S) + 1)  # Last = overflow
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.bucket_counts[bisect_left(BUCKETS_S, value)] += 1
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals and rolling-window percentiles, in milliseconds.
+        """
+        recent = sorted(self.recent)
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "sum_ms": self.total * 1000.0,
+        }
+        for name, q in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99)):
+            summary[name] = (
+                recent[int(q * (len(recent) - 1))] * 1000.0 if recent else None
+            )
+        summary["max_ms"] = recent[-1] * 1000.0 if recent else None
+        return summary
+
+
+class _Span:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """
+    Registry of timing histograms, counters and gauges for the hot path.
+
+    Disabled by default: span() then returns a shared no-op context
+    manager and count() returns immediately, so instrumented code pays
+    little more than a method call. Set SAS_METRICS=1 or call
+    enable() to turn it on.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def span(self, name: str):
+        """
+        Context manager timing the enclosed block into histogram name.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.histogram(name))
+
+    def start(self) -> float:
+        """
+        Start a manual timing; pass the result to stop().
+        """
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, name: str, started: float) -> None:
+        if self.enabled and started:
+            self.histogram(name).observe(time.perf_counter() - started)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value: float) -> None:
+        if self.enabled:
+            self.gauges[name] = value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "histograms": {
+                name: h.summary() for name, h in sorted(self.histograms.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "gauges": dict(sorted(self.gauges.items())),
+        }
+
+
+METRICS = Metrics(enabled=os.environ.get("SAS_METRICS", "") not in ("", "0"))
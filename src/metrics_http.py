@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import math
+from typing import Callable, Dict, List, Optional
+from metrics import BUCKETS_S, METRICS, Histogram, Metrics
+
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "sas"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LAG_PROBE_INTERVAL_S = 0.1
+
+# Metric name prefixes rendered as one labelled family: prefix -> label
+LABELLED_FAMILIES = {
+    "command": "command",
+    "alerts": "risk",
+}
+
+# Gauges computed at scrape time: name -> value
+GaugeCollector = Callable[[], Dict[str, float]]
+
+
+def _family(name: str):
+    """
+    Split "command.step" into ("command", 'command="step"').
+    Unlabelled names map to themselves with dots turned into underscores.
+    """
+    head, _, tail = name.partition(".")
+    label = LABELLED_FAMILIES.get(head)
+    if label is not None and tail:
+        return head, f'{label}="{tail}"'
+    return name.replace(".", "_"), ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _with_label(labels: str, extra: str) -> str:
+    combined = ",".join(part for part in (labels, extra) if part)
+    return "{" + combined + "}" if combined else ""
+
+
+def _render_histogram(
+    lines: List[str], family: str, labels: str, histogram: Histogram
+) -> None:
+    cumulative = 0
+    bounds = list(BUCKETS_S) + [math.inf]
+    for bound, count in zip(bounds, histogram.bucket_counts):
+        cumulative += count
+        le = f'le="{_number(bound)}"'
+        lines.append(f"{family}_bucket{_with_label(labels, le)} {cumulative}")
+    lines.append(f"{family}_sum{_with_label(labels, '')} {_number(histogram.total)}")
+    lines.append(f"{family}_count{_with_label(labels, '')} {histogram.count}")
+
+
+def render(metrics: Metrics, gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Render histograms, counters and gauges in the Prometheus text format.
+
+    Histograms are durations in seconds (family "<name>_seconds");
+    counters get a "_total" suffix.
+    """
+    sections: Dict[str, List[str]] = {}
+
+    def section(family: str, kind: str) -> List[str]:
+        if family not in sections:
+            sections[family] = [f"# TYPE {family} {kind}"]
+        return sections[family]
+
+    for name, histogram in sorted(metrics.histograms.items()):
+        base, labels = _family(name)
+        family = f"{PREFIX}_{base}_seconds"
+        _render_histogram(section(family, "histogram"), family, labels, histogram)
+
+    for name, value in sorted(metrics.counters.items()):
+        base, labels = _family(name)
+        family = f"{PREFIX}_{base}_total"
+        section(family, "counter").append(
+            f"{family}{_with_label(labels, '')} {value}"
+        )
+
+    all_gauges = dict(metrics.gauges)
+    all_gauges.update(gauges or {})
+    for name, value in sorted(all_gauges.items()):
+        base, labels = _family(name)
+        family = f"{PREFIX}_{base}"
+        section(family, "gauge").append(
+            f"{family}{_with_label(labels, '')} {_number(value)}"
+        )
+
+    return "".join(
+        line + "\n" for lines in sections.values() for line in lines
+    )
+
+
+async def monitor_loop_lag(
+    metrics: Metrics = METRICS, interval: float = LAG_PROBE_INTERVAL_S
+) -> None:
+    """
+    Record how late the event loop wakes a sleeping task
+    (histogram "event_loop.lag").
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        metrics.histogram("event_loop.lag").observe(lag)
+
+
+class MetricsServer:
+    """
+    Minimal HTTP listener serving GET /metrics on the running loop.
+
+    Starting it enables metric collection. collect is called on every
+    scrape for gauges that are cheaper to read than to track, such as
+    the number of connected clients.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9100,
+        metrics: Metrics = METRICS,
+        collect: Optional[GaugeCollector] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.collect = collect
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.metrics.enable()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port
+        )
+        self._lag_task = asyncio.ensure_future(monitor_loop_lag(self.metrics))
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Metrics available on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                status, body = "405 Method Not Allowed", "GET only\n"
+            elif parts[1].split("?")[0] != "/metrics":
+                status, body = "404 Not Found", "Try /metrics\n"
+            else:
+                gauges = self.collect() if self.collect is not None else None
+                status, body = "200 OK", render(self.metrics, gauges)
+
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
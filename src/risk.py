@@ -1,6 +1,7 @@
 from enum import Enum
+import numpy as np
 from vessel import Vessel
-from cpa import cpa_distance, tcpa
+from cpa import cpa_tcpa
 
 
 class RiskLevel(Enum):
@@ -14,6 +15,27 @@ WARNING_CPA_NM = 1.5
 DANGER_TCPA_HOURS = 0.5   # 30 minutes
 WARNING_TCPA_HOURS = 1.0  # 60 minutes
 
+# Risk codes used by the batch classifier: RISK_LEVELS[code] → RiskLevel
+RISK_LEVELS = (RiskLevel.SAFE, RiskLevel.WARNING, RiskLevel.DANGER)
+
+
+def evaluate_risk(
+    own: Vessel, target: Vessel
+) -> tuple[float | None, float | None, RiskLevel]:
+    """
+    Compute CPA, TCPA and risk level for a target in a single pass.
+
+    Args:
+        own: Own vessel
+        target: Target vessel
+
+    Returns:
+        (cpa, tcpa, risk): CPA in nautical miles, TCPA in hours
+        (None if there is no relative motion) and RiskLevel
+    """
+    cpa, t = cpa_tcpa(own, target)
+    return cpa, t, risk_from_cpa_tcpa(cpa, t)
+
 
 def classify_risk(own: Vessel, target: Vessel) -> RiskLevel:
     """
@@ -32,9 +54,20 @@ def classify_risk(own: Vessel, target: Vessel) -> RiskLevel:
     Returns:
         RiskLevel
     """
-    cpa = cpa_distance(own, target)
-    t = tcpa(own, target)
+    return evaluate_risk(own, target)[2]
+
 
+def risk_from_cpa_tcpa(cpa: float | None, t: float | None) -> RiskLevel:
+    """
+    Classify collision risk from precomputed CPA distance and TCPA.
+
+    Args:
+        cpa: CPA distance in nautical miles
+        t: TCPA in hours, or None if there is no relative motion
+
+    Returns:
+        RiskLevel
+    """
     # No CPA or closest approach already passed
     if cpa is None or (t is not None and t < 0):
         return RiskLevel.SAFE
@@ -55,4 +88,29 @@ def classify_risk(own: Vessel, target: Vessel) -> RiskLevel:
     if cpa <= WARNING_CPA_NM and t <= WARNING_TCPA_HOURS:
         return RiskLevel.WARNING
 
-    return RiskLevel.SAFE
\ No newline at end of file
+    return RiskLevel.SAFE
+
+def classify_risk_batch(cpa: np.ndarray, tcpa: np.ndarray) -> np.ndarray:
+    """
+    Classify collision risk for arrays of CPA/TCPA values.
+
+    Applies the same thresholds as classify_risk. A NaN TCPA means
+    no relative motion, so the (constant) current distance decides.
+
+    Args:
+        cpa: CPA distances in nautical miles
+        tcpa: TCPA values in hours (NaN for no relative motion)
+
+    Returns:
+        Array of risk codes, indexes into RISK_LEVELS
+    """
+    # No relative motion: the closest approach is now
+    t = np.where(np.isnan(tcpa), 0.0, tcpa)
+    upcoming = t >= 0
+
+    danger = upcoming & (cpa <= DANGER_CPA_NM) & (t <= DANGER_TCPA_HOURS)
+    warning = upcoming & (cpa <= WARNING_CPA_NM) & (t <= WARNING_TCPA_HOURS)
+
+    codes = warning.astype(np.int8)
+    codes[danger] = 2
+    return codes
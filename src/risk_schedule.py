@@ -0,0 +1,163 @@
+import heapq
+from typing import List, Tuple
+import numpy as np
+from risk import (
+    DANGER_CPA_NM,
+    DANGER_TCPA_HOURS,
+    WARNING_CPA_NM,
+    WARNING_TCPA_HOURS,
+    classify_risk_batch,
+)
+
+
+# Transitions are handled this early (hours), so rounding in
+# "time of CPA - threshold" can never make one late
+EARLY_HOURS = 1e-9
+
+
+def next_risk_transition(
+    cpa: np.ndarray, cpa_time: np.ndarray, now: float
+) -> np.ndarray:
+    """
+    Earliest time at or after now at which each risk level can change.
+
+    Under constant motion CPA is fixed and TCPA = cpa_time - now, so
+    the risk level can only change when TCPA reaches
+    WARNING_TCPA_HOURS or DANGER_TCPA_HOURS, or turns negative, and
+    only for targets whose CPA is within the matching distance limit.
+
+    Args:
+        cpa: CPA distances in nautical miles
+        cpa_time: Absolute times of CPA in hours (NaN: no relative motion)
+        now: Current time in hours
+
+    Returns:
+        Array of transition times, inf where the level never changes
+    """
+    candidates = (
+        (cpa_time - WARNING_TCPA_HOURS, cpa <= WARNING_CPA_NM),
+        (cpa_time - DANGER_TCPA_HOURS, cpa <= DANGER_CPA_NM),
+        (cpa_time, cpa <= WARNING_CPA_NM),  # Level drops just after CPA
+    )
+
+    result = np.full(len(cpa), np.inf)
+    for times, applies in candidates:
+        # NaN times compare False and are never selected
+        upcoming = applies & (times >= now)
+        np.minimum(result, np.where(upcoming, times, np.inf), out=result)
+    return result
+
+
+class RiskScheduler:
+    """
+    Risk codes for a column of targets, re-classified only when due.
+
+    Each row's next transition time (next_risk_transition) is kept in
+    a min-heap tagged with the row's kinematic version. advance()
+    pops the due entries and re-classifies only those rows; entries of
+    rows that changed version in the meantime are discarded lazily.
+    """
+
+    def __init__(self):
+        self.codes = np.empty(0, dtype=np.int8)  # Indexes into RISK_LEVELS
+        self.reclassified = 0  # Rows classified in the last reset/update/advance
+        self._heap: List[Tuple[float, int, int]] = []  # (due, row, version)
+
+    def reset(
+        self,
+        cpa: np.ndarray,
+        cpa_time: np.ndarray,
+        versions: np.ndarray,
+        now: float,
+    ) -> None:
+        """
+        Classify every row and rebuild the queue.
+        """
+        self.codes = classify_risk_batch(cpa, cpa_time - now)
+        self.reclassified = len(cpa)
+
+        due = next_risk_transition(cpa, cpa_time, now) - EARLY_HOURS
+        rows = np.flatnonzero(np.isfinite(due))
+        self._heap = list(zip(
+            due[rows].tolist(), rows.tolist(), versions[rows].tolist()
+        ))
+        heapq.heapify(self._heap)
+
+    def update(
+        self,
+        rows: np.ndarray,
+        cpa: np.ndarray,
+        cpa_time: np.ndarray,
+        versions: np.ndarray,
+        now: float,
+    ) -> None:
+        """
+        Classify and schedule rows whose CPA was just recomputed.
+
+        The arrays cover the whole (possibly resized) table.
+        """
+        n = len(cpa)
+        if len(self.codes) != n:
+            codes = np.zeros(n, dtype=np.int8)
+            keep = min(n, len(self.codes))
+            codes[:keep] = self.codes[:keep]
+            self.codes = codes
+
+        self.reclassified = len(rows)
+        if not len(rows):
+            return
+        self._schedule(rows, cpa, cpa_time, versions, now)
+
+        if len(self._heap) > 2 * n + 1024:
+            self.reset(cpa, cpa_time, versions, now)  # Drop stale entries
+
+    def advance(
+        self,
+        cpa: np.ndarray,
+        cpa_time: np.ndarray,
+        versions: np.ndarray,
+        now: float,
+    ) -> List[int]:
+        """
+        Re-classify the rows whose transition is due at time now.
+
+        Returns:
+            Rows whose risk code changed
+        """
+        heap = self._heap
+        n = len(cpa)
+        due: List[int] = []
+        while heap and heap[0][0] <= now:
+            _, row, version = heapq.heappop(heap)
+            if row < n and versions[row] == version:
+                due.append(row)
+
+        self.reclassified = len(due)
+        if not due:
+            return []
+
+        rows = np.array(due, dtype=np.int64)
+        before = self.codes[rows].copy()
+        self._schedule(rows, cpa, cpa_time, versions, now)
+        return rows[self.codes[rows] != before].tolist()
+
+    def _schedule(
+        self,
+        rows: np.ndarray,
+        cpa: np.ndarray,
+        cpa_time: np.ndarray,
+        versions: np.ndarray,
+        now: float,
+    ) -> None:
+        row_cpa = cpa[rows]
+        row_time = cpa_time[rows]
+        self.codes[rows] = classify_risk_batch(row_cpa, row_time - now)
+
+        due = next_risk_transition(row_cpa, row_time, now) - EARLY_HOURS
+        finite = np.isfinite(due)
+        for entry in zip(
+            due[finite].tolist(),
+            rows[finite].tolist(),
+            versions[rows[finite]].tolist(),
+        ):
+            heapq.heappush(self._heap, entry)
@@ -1,12 +1,24 @@
+import argparse
 import asyncio
 import json
 import websockets
 import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from world import World
+from alert_cache import CachedAlertEvaluator
 from simulation import Simulation
 from vessel import Vessel
 from position import Position
+from delta import DeltaEncoder
+from broadcast import Broadcaster, Frame
+from metrics import METRICS
+from metrics_http import MetricsServer
+from snapshot_worker import SnapshotWorker
+from ais_feed import AIS_PORT, AisFeed, listen
+from commands import (
+    Command, CommandError, CommandTable, array, boolean, integer, number, string,
+)
 
 
 # Logging setup
@@ -33,109 +45,524 @@ targets = [
     Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),  # Approaching head-on, CPA < 0.5nm
 ]
 
-world = World(own, targets)
+world = World(own, targets, evaluator=CachedAlertEvaluator())
 simulation = Simulation(world)
 
 
+# Server-side simulation clock
+
+TICK_RATE_HZ = 10.0  # Simulation ticks (and broadcasts) per second
+
+broadcaster = Broadcaster()
+world_changed = True  # A command or AIS report changed the world since the last broadcast
+clients: Set["Client"] = set()  # Open connections
+snapshot_worker: Optional[SnapshotWorker] = None  # Set: snapshots built off the loop
+ais_feed: Optional[AisFeed] = None  # Set: live AIS reports applied every tick
+
+
+class Client:
+    """
+    Per-connection state: snapshot encoding and subscription.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.encoder = None  # Full snapshots until the client asks for deltas
+        self.subscriber = None  # Set while subscribed to broadcasts
+
+    def encode(self, snapshot) -> str:
+        if self.encoder is not None:
+            snapshot = self.encoder.encode(snapshot)
+        return json.dumps(snapshot)
+
+
+async def ticker(rate_hz: float = TICK_RATE_HZ) -> None:
+    """
+    Advance the simulation at a fixed rate and broadcast each tick.
+
+    Every tick covers 1 / rate_hz seconds of real time, scaled by the
+    simulation's speed multiplier. AIS reports received since the last
+    tick are applied in one bulk update. Snapshots go out while the
+    simulation is running, or once after a command or AIS report
+    changed the world.
+
+    A tick that raises is logged and skipped; the clock keeps going. A
+    tick that overruns its slot is not made up with back-to-back
+    ticks: the schedule restarts from the current time.
+    """
+    global world_changed
+    interval = 1.0 / rate_hz
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+
+    while True:
+        next_tick += interval
+        started = METRICS.start()
+        try:
+            simulation.step(interval / 3600.0)
+            if ais_feed is not None and any(ais_feed.apply(world)):
+                world_changed = True
+
+            if broadcaster.subscribers and (simulation.running or world_changed):
+                world_changed = False
+                await publish_snapshot()
+        except Exception:
+            # One bad tick must not stop the clock (and with it the server)
+            logger.error("Tick failed", exc_info=True)
+        METRICS.stop("ticker.tick", started)
+
+        next_tick = max(next_tick, loop.time())
+        await asyncio.sleep(next_tick - loop.time())
+
+
+# Command table
+
+COMMANDS = CommandTable()
+
+
+# Simulation control
+
+@COMMANDS.register("start", batchable=True)
+async def start_command(client: Client, args: Dict[str, Any]) -> None:
+    simulation.start()
+
+
+@COMMANDS.register("pause", batchable=True)
+async def pause_command(client: Client, args: Dict[str, Any]) -> None:
+    simulation.pause()
+
+
+@COMMANDS.register("step", number("dt", 0.1, minimum=0.0), batchable=True)
+async def step_command(client: Client, args: Dict[str, Any]) -> None:
+    # Manual step on top of the server clock, also when paused
+    simulation.manual_step(args["dt"])
+
+
+@COMMANDS.register(
+    "speed", number("value", minimum=0.0, exclusive_minimum=True), batchable=True
+)
+async def speed_command(client: Client, args: Dict[str, Any]) -> None:
+    simulation.set_speed(args["value"])
+
+
+@COMMANDS.register("reset", batchable=True)
+async def reset_command(client: Client, args: Dict[str, Any]) -> None:
+    global world, simulation
+    # Reset to initial state
+    own = Vessel(
+        vessel_id="OWN",
+        position=Position(0.0, 0.0),
+        speed_knots=10.0,
+        heading_deg=0.0,
+    )
+    targets = [
+        Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+        Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
+        Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
+    ]
+    world = World(own, targets, evaluator=CachedAlertEvaluator())
+    simulation = Simulation(world)
+    logger.info("Simulation reset to initial state")
+
+
+# Target management
+
+@COMMANDS.register(
+    "add_target",
+    string("id"),
+    number("x"),
+    number("y"),
+    number("speed", minimum=0.0),
+    number("heading"),
+    batchable=True,
+)
+async def add_target_command(client: Client, args: Dict[str, Any]) -> None:
+    world.add_target(target_from_args(args))
+
+
+def target_from_args(args: Dict[str, Any]) -> Vessel:
+    return Vessel(
+        vessel_id=args["id"],
+        position=Position(args["x"], args["y"]),
+        speed_knots=args["speed"],
+        heading_deg=args["heading"],
+    )
+
+
+@COMMANDS.register("remove_target", string("id"), batchable=True)
+async def remove_target_command(client: Client, args: Dict[str, Any]) -> None:
+    world.remove_target(args["id"])
+
+
+# Own vessel course control
+
+@COMMANDS.register("update_own_heading", number("heading_deg"), batchable=True)
+async def update_own_heading_command(client: Client, args: Dict[str, Any]) -> None:
+    heading = args["heading_deg"]
+    logger.info(f"Updating own vessel heading to {heading}")
+    world.update_own_heading(heading)
+
+
+@COMMANDS.register(
+    "update_own_speed", number("speed_knots", minimum=0.0), batchable=True
+)
+async def update_own_speed_command(client: Client, args: Dict[str, Any]) -> None:
+    speed = args["speed_knots"]
+    logger.info(f"Updating own vessel speed to {speed}")
+    world.update_own_speed(speed)
+
+
+# Target vessel course control
+
+@COMMANDS.register(
+    "update_target_heading", string("id"), number("heading_deg"), batchable=True
+)
+async def update_target_heading_command(client: Client, args: Dict[str, Any]) -> None:
+    vessel_id = args["id"]
+    updated = world.update_target_heading(vessel_id, args["heading_deg"])
+    logger.info(f"Updated heading for {updated} target(s) with id={vessel_id}")
+
+
+@COMMANDS.register(
+    "update_target_speed",
+    string("id"),
+    number("speed_knots", minimum=0.0),
+    batchable=True,
+)
+async def update_target_speed_command(client: Client, args: Dict[str, Any]) -> None:
+    vessel_id = args["id"]
+    updated = world.update_target_speed(vessel_id, args["speed_knots"])
+    logger.info(f"Updated speed for {updated} target(s) with id={vessel_id}")
+
+
+# Batches
+
+@COMMANDS.register("batch", array("commands"))
+async def batch_command(client: Client, args: Dict[str, Any]) -> None:
+    """
+    Several world commands, applied together, one snapshot.
+
+    Every command is validated before any is applied, so an invalid
+    batch changes nothing.
+    """
+    commands = []
+    for i, data in enumerate(args["commands"]):
+        try:
+            commands.append(COMMANDS.parse(data, batch=True))
+        except CommandError as e:
+            raise CommandError(f"commands[{i}]: {e}", "batch", e.field) from None
+
+    await apply_batch(client, commands)
+    logger.info(f"Applied batch of {len(commands)} command(s)")
+
+
+def coalesce_steps(
+    commands: List[Tuple[Command, Dict[str, Any]]]
+) -> List[Tuple[Command, Dict[str, Any], int]]:
+    """
+    Merge every run of consecutive steps into one step of their summed dt.
+
+    Returns:
+        (command, args, count) in order; count is the number of
+        commands the entry stands for (1 except for merged steps)
+    """
+    merged: List[Tuple[Command, Dict[str, Any], int]] = []
+    for command, args in commands:
+        if command.name == "step" and merged and merged[-1][0] is command:
+            _, previous, count = merged[-1]
+            merged[-1] = (command, {**previous, "dt": previous["dt"] + args["dt"]}, count + 1)
+        else:
+            merged.append((command, args, 1))
+    return merged
+
+
+async def apply_batch(
+    client: Client, commands: List[Tuple[Command, Dict[str, Any]]]
+) -> None:
+    """
+    Apply validated commands in order.
+
+    Runs of steps are merged into one step of their summed dt
+    (coalesce_steps). Runs of add_target and of target course updates
+    go through the bulk World methods, so the table and its indexes are
+    touched once per run instead of once per command.
+    """
+    merged = coalesce_steps(commands)
+    i = 0
+    while i < len(merged):
+        command = merged[i][0]
+        j = i + 1
+        while j < len(merged) and merged[j][0] is command:
+            j += 1
+        run = [args for _, args, _ in merged[i:j]]
+
+        if command.name == "add_target":
+            world.add_targets([target_from_args(args) for args in run])
+        elif command.name == "update_target_heading":
+            world.update_targets(
+                [args["id"] for args in run],
+                headings_deg=[args["heading_deg"] for args in run],
+            )
+        elif command.name == "update_target_speed":
+            world.update_targets(
+                [args["id"] for args in run],
+                speeds_knots=[args["speed_knots"] for args in run],
+            )
+        else:
+            for args in run:
+                await command.handler(client, args)
+        i = j
+
+
+# Snapshot encoding negotiation
+
+@COMMANDS.register(
+    "set_encoding",
+    string("encoding", "full", choices=("full", "delta")),
+    integer("keyframe_interval", 50, minimum=1),
+)
+async def set_encoding_command(client: Client, args: Dict[str, Any]) -> None:
+    encoding = args["encoding"]
+    if encoding == "delta":
+        client.encoder = DeltaEncoder(args["keyframe_interval"])
+    else:
+        client.encoder = None
+    if client.subscriber is not None:
+        client.subscriber.set_delta(client.encoder is not None)
+    logger.info(f"Snapshot encoding set to {encoding}")
+
+
+@COMMANDS.register("keyframe")
+async def keyframe_command(client: Client, args: Dict[str, Any]) -> None:
+    if client.encoder is not None:
+        client.encoder.request_keyframe()
+    if client.subscriber is not None:
+        client.subscriber.request_keyframe()
+
+
+# Tick broadcast subscription
+
+@COMMANDS.register("subscribe")
+async def subscribe_command(client: Client, args: Dict[str, Any]) -> None:
+    if client.subscriber is None:
+        client.subscriber = broadcaster.subscribe(
+            client.websocket, delta=client.encoder is not None
+        )
+
+
+@COMMANDS.register("unsubscribe")
+async def unsubscribe_command(client: Client, args: Dict[str, Any]) -> None:
+    if client.subscriber is not None:
+        broadcaster.unsubscribe(client.subscriber)
+        client.subscriber = None
+
+
+# Diagnostics (reply without a snapshot)
+
+@COMMANDS.register("broadcast_stats", snapshot=False)
+async def broadcast_stats_command(client: Client, args: Dict[str, Any]) -> None:
+    # Per-subscriber delivery counters
+    await client.websocket.send(json.dumps({
+        "type": "broadcast_stats",
+        "subscribers": broadcaster.stats(),
+    }))
+
+
+@COMMANDS.register(
+    "stats", boolean("enable", None), boolean("reset", False), snapshot=False
+)
+async def stats_command(client: Client, args: Dict[str, Any]) -> None:
+    # Hot-path timings and counters
+    if args["enable"] is not None:
+        METRICS.enable(args["enable"])
+    if args["reset"]:
+        METRICS.reset()
+    await client.websocket.send(json.dumps({
+        "type": "stats",
+        **METRICS.stats(),
+    }))
+
+
 # WebSocket handler
 
+async def publish_snapshot() -> None:
+    """
+    Broadcast the current world to the subscribers.
+
+    With a snapshot worker, the snapshot, its delta message and their
+    JSON payloads are all built on the worker; the event loop only
+    hands the finished frame to the subscribers.
+    """
+    if snapshot_worker is None:
+        broadcaster.publish(world.snapshot())
+        return
+    full, delta = broadcaster.formats()
+    frame = await snapshot_worker.run(world, encode_frame, full, delta)
+    broadcaster.offer(frame)
+
+
+def encode_frame(frozen: World, full: bool, delta: bool) -> Frame:
+    return broadcaster.encode(frozen.snapshot(), full, delta)
+
+
+def encode_snapshot(frozen: World, client: Client) -> str:
+    snapshot = frozen.snapshot()
+    with METRICS.span("handler.encode"):
+        return client.encode(snapshot)
+
+
+async def send_snapshot(client: Client) -> None:
+    """
+    Reply with the current world (subscribers get it through the broadcast).
+    """
+    global world_changed
+    world_changed = True
+    if client.subscriber is not None:
+        world_changed = False
+        await publish_snapshot()
+        return
+
+    if snapshot_worker is None:
+        payload = encode_snapshot(world, client)
+    else:
+        # Commands from other connections run while this one is built
+        payload = await snapshot_worker.run(world, encode_snapshot, client)
+    if client.encoder is None:
+        METRICS.set_gauge("snapshot_bytes", len(payload))
+    sending = METRICS.start()
+    await client.websocket.send(payload)
+    METRICS.stop("handler.send", sending)
+    METRICS.count("bytes_sent", len(payload))
+
+
+INBOX_SIZE = 256  # Unread messages per connection before reading pauses
+
+
+async def read_messages(websocket, inbox: asyncio.Queue) -> None:
+    """
+    Move incoming messages into inbox, then None once the connection ends.
+
+    inbox is bounded: while it is full, reading pauses and the
+    websocket's flow control pushes back on the client.
+    """
+    try:
+        async for message in websocket:
+            await inbox.put(message)
+    finally:
+        await inbox.put(None)
+
+
+async def drain(inbox: asyncio.Queue) -> List[Any]:
+    """
+    Wait for one message, then take every message already queued.
+    """
+    messages = [await inbox.get()]
+    while not inbox.empty():
+        messages.append(inbox.get_nowait())
+    return messages
+
+
+async def handle_messages(client: Client, messages: List[Any]) -> None:
+    """
+    Apply a burst of messages in order, with one snapshot per run.
+
+    Commands that reply with a snapshot are collected and applied
+    together (apply_commands), so a client that sends faster than the
+    server can answer gets one snapshot for everything it queued.
+    Pending commands are applied before any reply of their own (an
+    error or a stats reply) so replies stay in order.
+    """
+    pending: List[Tuple[Command, Dict[str, Any]]] = []
+    for message in messages:
+        try:
+            command, args = COMMANDS.parse_message(message)
+        except CommandError as e:
+            await apply_commands(client, pending)
+            pending = []
+            logger.warning(f"Rejected command: {e}")
+            await client.websocket.send(json.dumps(e.reply()))
+            continue
+
+        logger.info(f"Received command: {command.name}")
+        if command.snapshot:
+            pending.append((command, args))
+            continue
+        await apply_commands(client, pending)
+        pending = []
+        await apply_commands(client, [(command, args)])
+    await apply_commands(client, pending)
+
+
+async def apply_commands(
+    client: Client, commands: List[Tuple[Command, Dict[str, Any]]]
+) -> None:
+    """
+    Apply parsed commands in order, then send one snapshot.
+
+    Consecutive steps are merged into a single manual step of their
+    summed dt (coalesce_steps). A command that fails gets an error
+    reply; the rest are still applied.
+    """
+    snapshot = 0  # Applied commands covered by the snapshot
+    steps = 0  # Steps merged into an earlier one
+    for command, args, count in coalesce_steps(commands):
+        started = METRICS.start()
+        try:
+            await command.handler(client, args)
+
+        except CommandError as e:
+            logger.warning(f"Rejected command: {e}")
+            await client.websocket.send(json.dumps(e.reply()))
+
+        except ValueError as e:
+            # Rejected by the model (e.g. a constraint not in the schema)
+            logger.warning(f"Command {command.name} failed: {e}")
+            await client.websocket.send(json.dumps(
+                CommandError(str(e), command.name).reply()
+            ))
+
+        except websockets.exceptions.ConnectionClosed:
+            raise
+
+        except Exception:
+            # A bug in one command should not end the connection
+            logger.error(f"Command {command.name} failed", exc_info=True)
+            await client.websocket.send(json.dumps(
+                CommandError("internal error", command.name).reply()
+            ))
+
+        else:
+            METRICS.stop(f"command.{command.name}", started)
+            if command.snapshot:
+                snapshot += count
+                steps += count - 1
+
+    if not snapshot:
+        return
+    await send_snapshot(client)
+    METRICS.set_gauge("commands_per_snapshot", snapshot)
+    if snapshot > 1:
+        METRICS.count("commands_coalesced", snapshot - 1)
+        METRICS.count("steps_coalesced", steps)
+        logger.info(f"Coalesced {snapshot} commands into one snapshot")
+
+
 async def handler(websocket):
-    global world, simulation  # Declare at top for reset command
     logger.info("New WebSocket connection established")
+    client = Client(websocket)
+    clients.add(client)
+    inbox: asyncio.Queue = asyncio.Queue(INBOX_SIZE)
+    reader = asyncio.create_task(read_messages(websocket, inbox))
     try:
-        async for message in websocket:
-            data = json.loads(message)
-            cmd = data.get("command")
-            logger.info(f"Received command: {cmd}")
-
-            
-            # Simulation control
-            
-            if cmd == "start":
-                simulation.start()
-
-            elif cmd == "pause":
-                simulation.pause()
-
-            elif cmd == "step":
-                dt = data.get("dt", 0.1)
-                simulation.step(dt)
-
-            elif cmd == "speed":
-                simulation.set_speed(data["value"])
-
-            elif cmd == "reset":
-                # Reset to initial state
-                own = Vessel(
-                    vessel_id="OWN",
-                    position=Position(0.0, 0.0),
-                    speed_knots=10.0,
-                    heading_deg=0.0,
-                )
-                targets = [
-                    Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
-                    Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
-                    Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
-                ]
-                world = World(own, targets)
-                simulation = Simulation(world)
-                logger.info("Simulation reset to initial state")
-
-            
-            # Target management
-           
-            elif cmd == "add_target":
-                t = Vessel(
-                    vessel_id=data["id"],
-                    position=Position(data["x"], data["y"]),
-                    speed_knots=data["speed"],
-                    heading_deg=data["heading"],
-                )
-                world.add_target(t)
-
-            elif cmd == "remove_target":
-                world.remove_target(data["id"])
-
-            
-            # Own vessel course control 
-            
-            elif cmd == "update_own_heading":
-                heading = data["heading_deg"]
-                logger.info(f"Updating own vessel heading to {heading}")
-                world.update_own_heading(heading)
-
-            elif cmd == "update_own_speed":
-                speed = data["speed_knots"]
-                logger.info(f"Updating own vessel speed to {speed}")
-                world.update_own_speed(speed)
-
-            
-            # Target vessel course control 
-            
-            elif cmd == "update_target_heading":
-                vessel_id = data["id"]
-                heading = data["heading_deg"]
-                updated = world.update_target_heading(vessel_id, heading)
-                logger.info(
-                    f"Updated heading for {updated} target(s) with id={vessel_id}"
-                )
-
-            elif cmd == "update_target_speed":
-                vessel_id = data["id"]
-                speed = data["speed_knots"]
-                updated = world.update_target_speed(vessel_id, speed)
-                logger.info(
-                    f"Updated speed for {updated} target(s) with id={vessel_id}"
-                )
-
-            else:
-                logger.warning(f"Unknown command received: {cmd}")
-
-            
-            # Always send snapshot
-            
-            snapshot = world.snapshot()
-            await websocket.send(json.dumps(snapshot))
+        while True:
+            messages = await drain(inbox)
+            closed = messages[-1] is None
+            if closed:
+                messages.pop()
+            await handle_messages(client, messages)
+            if closed:
+                await reader  # Re-raise the error that ended reading, if any
+                break
 
     except websockets.exceptions.ConnectionClosed:
         logger.info("WebSocket connection closed")
@@ -143,17 +570,91 @@ async def handler(websocket):
     except Exception as e:
         logger.error("Error in WebSocket handler", exc_info=True)
 
+    finally:
+        reader.cancel()
+        clients.discard(client)
+        if client.subscriber is not None:
+            logger.info(
+                f"Subscriber stats on close: {client.subscriber.stats()}"
+            )
+            broadcaster.unsubscribe(client.subscriber)
+
+
+
+# Metrics endpoint
+
+def collect_gauges() -> Dict[str, float]:
+    """
+    Gauges read at scrape time for the metrics endpoint.
+    """
+    return {
+        "connected_clients": len(clients),
+        "subscribers": len(broadcaster.subscribers),
+        "targets": len(world.targets),
+    }
 
 
 # Server loop
 
-async def main():
+async def main(
+    tick_rate_hz: float = TICK_RATE_HZ,
+    metrics_port: Optional[int] = None,
+    offload_snapshots: bool = False,
+    ais_port: Optional[int] = None,
+    ais_host: str = "localhost",
+):
+    global snapshot_worker, ais_feed
+    if offload_snapshots:
+        snapshot_worker = SnapshotWorker()
+        logger.info("Building snapshots on a worker thread")
+
+    ais_transport = None
+    if ais_port is not None:
+        ais_feed = AisFeed()
+        ais_transport = await listen(ais_feed, ais_host, ais_port)
+
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = MetricsServer("localhost", metrics_port, collect=collect_gauges)
+        await metrics_server.start()
+
     logger.info("Starting WebSocket server on ws://localhost:8765")
-    async with websockets.serve(handler, "localhost", 8765):
-        logger.info("WebSocket server is running")
-        logger.info("Open the index.html file directly in your browser to connect")
-        await asyncio.Future()  # run forever
+    try:
+        async with websockets.serve(handler, "localhost", 8765):
+            logger.info("WebSocket server is running")
+            logger.info(f"Simulation clock running at {tick_rate_hz} Hz")
+            logger.info("Open the index.html file directly in your browser to connect")
+            await ticker(tick_rate_hz)  # run forever
+    finally:
+        if ais_transport is not None:
+            ais_transport.close()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        if snapshot_worker is not None:
+            snapshot_worker.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Situational awareness server")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE_HZ,
+                        help=f"Simulation ticks (and broadcasts) per second "
+                             f"(default {TICK_RATE_HZ:g})")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve text-format metrics on this HTTP port")
+    parser.add_argument("--offload-snapshots", action="store_true",
+                        help="Evaluate and encode snapshots on a worker thread")
+    parser.add_argument("--ais-port", type=int, nargs="?", const=AIS_PORT,
+                        help=f"Receive AIS NMEA over UDP on this port "
+                             f"(default {AIS_PORT})")
+    parser.add_argument("--ais-host", default="localhost",
+                        help="Address to receive AIS on (default localhost)")
+    args = parser.parse_args()
+    if args.tick_rate <= 0:
+        parser.error("--tick-rate must be positive")
+    asyncio.run(main(
+        tick_rate_hz=args.tick_rate,
+        metrics_port=args.metrics_port,
+        offload_snapshots=args.offload_snapshots,
+        ais_port=args.ais_port,
+        ais_host=args.ais_host,
+    ))
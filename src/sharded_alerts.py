@@ -0,0 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from alert import Alert, alerts_from_columns, sort_alerts
+from cpa import cpa_tcpa_batch
+from risk import classify_risk_batch
+from vessel import Vessel
+from vessel_table import VesselTable
+
+
+MIN_SHARD_ROWS = 20_000  # Smaller shards cost more in IPC than they save
+
+# Shared columns, one row each: x, y, vx, vy
+COLUMNS = 4
+
+# Shared blocks attached in this (worker) process, by name
+_attached: Dict[str, Tuple[SharedMemory, np.ndarray]] = {}
+
+
+def _shared_columns(name: str, capacity: int) -> np.ndarray:
+    entry = _attached.get(name)
+    if entry is None:
+        while _attached:  # The parent replaced the block
+            _, (shm, columns) = _attached.popitem()
+            del columns
+            shm.close()
+        # Workers share the parent's resource tracker, which unlinks
+        # the block if the parent dies without close()
+        shm = SharedMemory(name=name)
+        columns = np.ndarray((COLUMNS, capacity), dtype=np.float64, buffer=shm.buf)
+        entry = _attached[name] = (shm, columns)
+    return entry[1]
+
+
+def evaluate_shard(
+    name: str, capacity: int, start: int, stop: int, own: Vessel
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    CPA/TCPA and risk for rows start:stop of the shared columns.
+
+    Runs in a worker process.
+
+    Returns:
+        (rows, codes, cpa, tcpa) of the non-SAFE rows only
+    """
+    x, y, vx, vy = _shared_columns(name, capacity)[:, start:stop]
+    cpa, t = cpa_tcpa_batch(own, x, y, vx, vy)
+    codes = classify_risk_batch(cpa, t)
+    rows = np.flatnonzero(codes)
+    return rows + start, codes[rows], cpa[rows], t[rows]
+
+
+class ShardedAlertGenerator:
+    """
+    Non-SAFE alerts for very large fleets, computed on a process pool.
+
+    The target table's position and velocity columns are copied into
+    one shared memory block per call; each worker evaluates a
+    contiguous shard in place (CPA/TCPA and risk) and sends back only
+    the rows that are not SAFE. The results are merged in target order
+    and ordered by sort_alerts, so the output equals
+    sort_alerts(generate_alerts(own, targets)).
+
+    Fleets too small to fill two shards of MIN_SHARD_ROWS are
+    evaluated in this process.
+
+    Use as a context manager, or call close(), to stop the workers and
+    free the shared block.
+    """
+
+    def __init__(self, processes: Optional[int] = None,
+                 min_shard_rows: int = MIN_SHARD_ROWS):
+        self.processes = processes or os.cpu_count() or 1
+        self.min_shard_rows = min_shard_rows
+        self.shards = 0  # Shards used in the last call
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._shm: Optional[SharedMemory] = None
+        self._columns = np.empty((COLUMNS, 0), dtype=np.float64)
+
+    def __enter__(self) -> "ShardedAlertGenerator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def generate(
+        self, own: Vessel, targets: VesselTable, top_k: Optional[int] = None
+    ) -> List[Alert]:
+        """
+        Sorted non-SAFE alerts for every target.
+
+        Args:
+            own: Own vessel
+            targets: Target table
+            top_k: If given, return only the top_k highest-priority alerts
+
+        Returns:
+            Alerts in sort_alerts order
+        """
+        n = len(targets)
+        shards = min(self.processes, n // self.min_shard_rows)
+        self.shards = max(shards, 1)
+        if shards < 2:
+            cpa, t = cpa_tcpa_batch(own, targets.x, targets.y, targets.vx, targets.vy)
+            alerts = alerts_from_columns(targets.ids, cpa, t)
+            return sort_alerts(alerts, top_k)
+
+        self._share(targets)
+        bounds = np.linspace(0, n, shards + 1).astype(int).tolist()
+        executor = self._pool()
+        futures = [
+            executor.submit(
+                evaluate_shard, self._shm.name, self._columns.shape[1],
+                start, stop, own,
+            )
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        # Shards are contiguous, so concatenating keeps target order
+        rows, codes, cpa, t = (
+            np.concatenate(column)
+            for column in zip(*(future.result() for future in futures))
+        )
+        alerts = alerts_from_columns(targets.ids[rows], cpa, t, codes=codes)
+        return sort_alerts(alerts, top_k)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shm is not None:
+            self._columns = np.empty((COLUMNS, 0), dtype=np.float64)
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def _share(self, targets: VesselTable) -> None:
+        """
+        Copy the position and velocity columns into the shared block.
+        """
+        n = len(targets)
+        if self._columns.shape[1] < n:
+            capacity = max(n, 2 * self._columns.shape[1])
+            if self._shm is not None:
+                self._columns = np.empty((COLUMNS, 0), dtype=np.float64)
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = SharedMemory(
+                create=True, size=COLUMNS * capacity * np.dtype(np.float64).itemsize
+            )
+            self._columns = np.ndarray(
+                (COLUMNS, capacity), dtype=np.float64, buffer=self._shm.buf
+            )
+
+        for row, column in enumerate((targets.x, targets.y, targets.vx, targets.vy)):
+            self._columns[row, :n] = column
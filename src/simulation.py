@@ -1,4 +1,5 @@
 from world import World
+from metrics import METRICS
 
 
 class Simulation:
@@ -51,4 +52,14 @@ class Simulation:
             return
 
         effective_dt = dt_hours * self.speed_multiplier
-        self.world.step(effective_dt)
\ No newline at end of file
+        with METRICS.span("simulation.step"):
+            self.world.step(effective_dt)
+
+    def manual_step(self, dt_hours: float) -> None:
+        """
+        Advance simulation by exactly dt_hours, even when paused.
+
+        Used for explicit operator steps on top of the server clock.
+        """
+        with METRICS.span("simulation.step"):
+            self.world.step(dt_hours)
@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+from alert_cache import CachedAlertEvaluator
+from world import World
+from metrics import METRICS
+
+
+T = TypeVar("T")
+
+
+class SnapshotWorker:
+    """
+    Builds snapshots off the event loop, from frozen copies of a world.
+
+    run() copies the world on the event loop (World.copy, bulk column
+    copies), then evaluates and encodes the copy on a worker thread
+    while the loop keeps serving connections. Commands that arrive in
+    the meantime change the live world and show up in the next
+    snapshot; the one being built reflects the world when it was
+    frozen.
+
+    A single worker thread keeps snapshots in order and lets every
+    copy share one CachedAlertEvaluator, which follows the copies by
+    kinematic version.
+    """
+
+    def __init__(self):
+        self.evaluator = CachedAlertEvaluator()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="snapshot"
+        )
+
+    async def run(self, world: World, build: Callable[..., T], *args: Any) -> T:
+        """
+        Freeze world and call build(frozen_world, *args) on the worker.
+        """
+        with METRICS.span("worker.freeze"):
+            frozen = world.copy(self.evaluator)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, build, frozen, *args)
+
+    async def snapshot(self, world: World) -> Dict[str, Any]:
+        return await self.run(world, World.snapshot)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,146 @@
+import math
+from typing import Dict, List, Set, Tuple
+import numpy as np
+from alert import Alert, generate_alerts_batch
+from risk import RiskLevel, WARNING_CPA_NM, WARNING_TCPA_HOURS
+from vessel import Vessel
+from vessel_table import VesselTable
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the positions of a VesselTable.
+
+    Each row is filed under the cell containing its position. update()
+    recomputes cells in one vectorized pass and only re-files the rows
+    whose cell changed; it rebuilds from scratch only when rows were
+    removed from the table (row indices shift).
+    """
+
+    def __init__(self, table: VesselTable, cell_size_nm: float = 5.0):
+        if cell_size_nm <= 0:
+            raise ValueError("Cell size must be positive")
+        self.table = table
+        self.cell_size_nm = cell_size_nm
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._cx = np.empty(0, dtype=np.int64)
+        self._cy = np.empty(0, dtype=np.int64)
+        self._layout_version = -1
+        self.update()
+
+    def _cell_coords(self) -> Tuple[np.ndarray, np.ndarray]:
+        cx = np.floor(self.table.x / self.cell_size_nm).astype(np.int64)
+        cy = np.floor(self.table.y / self.cell_size_nm).astype(np.int64)
+        return cx, cy
+
+    def update(self) -> None:
+        """
+        Re-file rows whose position moved them into another cell.
+        """
+        cx, cy = self._cell_coords()
+
+        if self._layout_version != self.table.layout_version:
+            self._cells = {}
+            for row, key in enumerate(zip(cx.tolist(), cy.tolist())):
+                self._cells.setdefault(key, set()).add(row)
+            self._layout_version = self.table.layout_version
+        else:
+            known = len(self._cx)
+            moved = np.flatnonzero(
+                (cx[:known] != self._cx) | (cy[:known] != self._cy)
+            )
+            for row in moved.tolist():
+                old = (int(self._cx[row]), int(self._cy[row]))
+                bucket = self._cells[old]
+                bucket.discard(row)
+                if not bucket:
+                    del self._cells[old]
+            for row in moved.tolist() + list(range(known, len(cx))):
+                key = (int(cx[row]), int(cy[row]))
+                self._cells.setdefault(key, set()).add(row)
+
+        self._cx = cx
+        self._cy = cy
+
+    def query(self, x: float, y: float, radius_nm: float) -> np.ndarray:
+        """
+        Rows in cells overlapping the square of half-width radius_nm
+        around (x, y). A superset of the rows within radius_nm.
+
+        Returns:
+            Sorted array of row indices
+        """
+        size = self.cell_size_nm
+        x0, x1 = math.floor((x - radius_nm) / size), math.floor((x + radius_nm) / size)
+        y0, y1 = math.floor((y - radius_nm) / size), math.floor((y + radius_nm) / size)
+
+        rows: List[int] = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= len(self._cells):
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    rows.extend(self._cells.get((cx, cy), ()))
+        else:
+            for (cx, cy), bucket in self._cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    rows.extend(bucket)
+
+        return np.sort(np.array(rows, dtype=np.int64))
+
+
+def reach_radius(own: Vessel, targets: VesselTable) -> float:
+    """
+    Distance beyond which no target can become a WARNING or DANGER.
+
+    Closing speed is at most own speed plus the fastest target, so a
+    target farther than WARNING_CPA_NM plus the distance both can cover
+    in WARNING_TCPA_HOURS cannot enter the warning envelope in time.
+    """
+    max_speed = float(targets.speed.max()) if len(targets) else 0.0
+    return WARNING_CPA_NM + (own.speed_knots + max_speed) * WARNING_TCPA_HOURS
+
+
+class BroadPhaseEvaluator:
+    """
+    World evaluator that runs CPA/TCPA only on reachable targets.
+
+    Targets outside reach_radius are reported SAFE without CPA/TCPA
+    (both None); the rest go through the batched kernel.
+    """
+
+    def __init__(self, grid: SpatialGrid):
+        self.grid = grid
+        self.candidates = 0  # Targets fully evaluated in the last call
+        self._safe: Dict[str, Alert] = {}  # Reused SAFE alerts by target id
+
+    def __call__(self, own: Vessel, targets: VesselTable) -> List[Alert]:
+        self.grid.update()
+        position = own.position
+        # Small margin so rounding never hides a boundary target
+        radius = reach_radius(own, targets) + 1e-9
+        rows = self.grid.query(position.x, position.y, radius)
+        self.candidates = len(rows)
+
+        alerts = [self._safe_alert(target_id) for target_id in targets.ids.tolist()]
+        evaluated = generate_alerts_batch(
+            own,
+            targets.ids[rows],
+            targets.x[rows],
+            targets.y[rows],
+            targets.vx[rows],
+            targets.vy[rows],
+            include_safe=True,
+        )
+        for row, alert in zip(rows.tolist(), evaluated):
+            alerts[row] = alert
+
+        if len(self._safe) > 2 * len(targets) + 1024:
+            self._safe = {}  # Forget ids of departed targets
+        return alerts
+
+    def _safe_alert(self, target_id: str) -> Alert:
+        alert = self._safe.get(target_id)
+        if alert is None:
+            alert = self._safe[target_id] = Alert(
+                target_id, RiskLevel.SAFE, None, None
+            )
+        return alert
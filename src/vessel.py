@@ -1,17 +1,187 @@
+import itertools
 import math
-from dataclasses import dataclass
+import numpy as np
 from position import Position
 
 
-@dataclass
+# Source of kinematic versions, unique across all vessels and table rows
+_kinematic_versions = itertools.count(1)
+
+
+def next_kinematic_version() -> int:
+    return next(_kinematic_versions)
+
+
+def next_kinematic_versions(n: int) -> np.ndarray:
+    """
+    n new kinematic versions at once (for bulk row updates).
+    """
+    return np.fromiter(
+        itertools.islice(_kinematic_versions, n), dtype=np.int64, count=n
+    )
+
+
+def velocity_components(speed_knots: float, heading_deg: float) -> tuple[float, float]:
+    """
+    Convert speed and heading into a velocity vector.
+
+    Args:
+        speed_knots: Speed in knots
+        heading_deg: Heading in degrees (0° = North, 90° = East)
+
+    Returns:
+        (vx, vy): Velocity components in nautical miles per hour
+    """
+    heading_rad = math.radians(heading_deg)
+
+    # Maritime convention:
+    # 0° = North (+Y), 90° = East (+X)
+    vx = speed_knots * math.sin(heading_rad)
+    vy = speed_knots * math.cos(heading_rad)
+
+    return vx, vy
+
+
 class Vessel:
     """
     Represents a vessel with position, speed, and heading.
+
+    A vessel normally keeps its own state. Once it is added to a
+    VesselTable (as World does for its targets) the vessel becomes a
+    view onto its table row: reads and writes go straight to the
+    table columns, so the table can step the whole fleet at once.
+
+    kinematic_version changes whenever the vessel's motion stops being
+    a continuation of its previous straight-line course: a new speed,
+    heading or position. Stepping along the current course keeps it.
+
+    Motion is stored as a kinematic anchor (position at an anchor time
+    plus the course velocity); step() evaluates the position from the
+    anchor instead of accumulating increments, and course or position
+    changes re-anchor.
+
+    Instances use __slots__ and keep coordinates as plain floats:
+    position returns an immutable Position built on access, while
+    step() only updates the floats in place.
     """
-    vessel_id: str
-    position : Position
-    speed_knots: float
-    heading_deg: float  # 0° = North, 90° = East
+
+    __slots__ = (
+        "_table", "_row", "_vessel_id", "_x", "_y",
+        "_speed_knots", "_heading_deg", "_kinematic_version",
+        "_time_hours", "_anchor_x", "_anchor_y", "_anchor_time",
+    )
+
+    def __init__(
+        self,
+        vessel_id: str,
+        position: Position,
+        speed_knots: float,
+        heading_deg: float,  # 0° = North, 90° = East
+    ):
+        self._table = None
+        self._row = -1
+        self._vessel_id = vessel_id
+        self._x = position.x
+        self._y = position.y
+        self._speed_knots = speed_knots
+        self._heading_deg = heading_deg
+        self._kinematic_version = next_kinematic_version()
+        self._time_hours = 0.0  # Time stepped so far
+        self._anchor_x = position.x
+        self._anchor_y = position.y
+        self._anchor_time = 0.0
+
+    def _reanchor(self) -> None:
+        self._anchor_x = self._x
+        self._anchor_y = self._y
+        self._anchor_time = self._time_hours
+        self._kinematic_version = next_kinematic_version()
+
+    @property
+    def vessel_id(self) -> str:
+        return self._vessel_id
+
+    @vessel_id.setter
+    def vessel_id(self, value: str) -> None:
+        if self._table is not None:
+            self._table.rename(self._row, value)
+        self._vessel_id = value
+
+    # Kinematic state (own fields or table row)
+
+    @property
+    def kinematic_version(self) -> int:
+        table = self._table
+        if table is None:
+            return self._kinematic_version
+        return int(table._version[self._row])
+
+    @property
+    def position(self) -> Position:
+        table = self._table
+        if table is None:
+            return Position(self._x, self._y)
+        row = self._row
+        return Position(float(table._x[row]), float(table._y[row]))
+
+    @position.setter
+    def position(self, value: Position) -> None:
+        table = self._table
+        if table is None:
+            self._x = value.x
+            self._y = value.y
+            self._reanchor()
+        else:
+            table.set_position(self._row, value.x, value.y)
+
+    @property
+    def speed_knots(self) -> float:
+        table = self._table
+        if table is None:
+            return self._speed_knots
+        return float(table._speed[self._row])
+
+    @speed_knots.setter
+    def speed_knots(self, value: float) -> None:
+        table = self._table
+        if table is None:
+            self._speed_knots = value
+            self._reanchor()
+        else:
+            table.set_course(self._row, value, self.heading_deg)
+
+    @property
+    def heading_deg(self) -> float:
+        table = self._table
+        if table is None:
+            return self._heading_deg
+        return float(table._heading[self._row])
+
+    @heading_deg.setter
+    def heading_deg(self, value: float) -> None:
+        table = self._table
+        if table is None:
+            self._heading_deg = value
+            self._reanchor()
+        else:
+            table.set_course(self._row, self.speed_knots, value)
+
+    def __repr__(self) -> str:
+        return (
+            f"Vessel(vessel_id={self.vessel_id!r}, position={self.position!r}, "
+            f"speed_knots={self.speed_knots!r}, heading_deg={self.heading_deg!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.vessel_id, self.position, self.speed_knots, self.heading_deg
+        ) == (
+            other.vessel_id, other.position, other.speed_knots, other.heading_deg
+        )
+
+    __hash__ = None
 
     def velocity_vector(self) -> tuple[float, float]:
         """
@@ -20,14 +190,35 @@ class Vessel:
         Returns:
             (vx, vy): Velocity components
         """
-        heading_rad = math.radians(self.heading_deg)
+        table = self._table
+        if table is None:
+            return velocity_components(self._speed_knots, self._heading_deg)
 
-        # Maritime convention:
-        # 0° = North (+Y), 90° = East (+X)
-        vx = self.speed_knots * math.sin(heading_rad)
-        vy = self.speed_knots * math.cos(heading_rad)
+        # Table rows cache the same components, computed on course change
+        row = self._row
+        return float(table._vx[row]), float(table._vy[row])
 
-        return vx, vy
+    def predict(self, dt_hours: float) -> Position:
+        """
+        Position dt_hours from now on the current course.
+
+        Args:
+            dt_hours: Time ahead in hours (negative for the past)
+
+        Returns:
+            Predicted position
+        """
+        table = self._table
+        if table is not None:
+            x, y = table.predict_row(self._row, dt_hours)
+            return Position(x, y)
+
+        return Position(*self._predict_xy(dt_hours))
+
+    def _predict_xy(self, dt_hours: float) -> tuple[float, float]:
+        vx, vy = velocity_components(self._speed_knots, self._heading_deg)
+        elapsed = self._time_hours + dt_hours - self._anchor_time
+        return self._anchor_x + vx * elapsed, self._anchor_y + vy * elapsed
 
     def step(self, dt_hours: float) -> None:
          """
@@ -36,12 +227,15 @@ class Vessel:
         Args:
             dt_hours: Time step in hours
         """
-         vx, vy = self.velocity_vector()
-         self.position = Position(
-            x=self.position.x + vx * dt_hours,
-            y=self.position.y + vy * dt_hours
-        )
-        
+         if self._table is None:
+             # Evaluated from the anchor in place: no drift, no new Position,
+             # kinematic version unchanged
+             self._x, self._y = self._predict_xy(dt_hours)
+             self._time_hours += dt_hours
+         else:
+             # A single row moving apart from the table clock counts as a jump
+             self.position = self.predict(dt_hours)
+
         #To change thde direction of the vessel
     def change_heading(self, new_heading_deg: float) -> None:
         """
@@ -66,6 +260,3 @@ class Vessel:
             raise ValueError("Speed must be non-negative")
 
         self.speed_knots = new_speed_knots
-        
-
-
@@ -0,0 +1,480 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+from vessel import (
+    Vessel, next_kinematic_version, next_kinematic_versions, velocity_components,
+)
+
+
+class VesselTable:
+    """
+    Structure-of-arrays storage for a fleet of vessels.
+
+    Every vessel occupies one row of contiguous NumPy columns
+    (x, y, speed, heading, vx, vy) plus an id column. The velocity
+    columns are cached when a course changes, so stepping the fleet
+    is a single vectorized update with no trigonometry.
+
+    Vessels added to the table are bound to their row and act as
+    views, so the table also behaves like a read-only sequence of
+    Vessel objects.
+
+    An id index (id -> rows, ids may repeat) makes lookups by id
+    constant time, and removal fills the hole with the last row, so
+    removing a vessel does not shift the rest of the table.
+
+    Each row carries a kinematic version (see Vessel.kinematic_version),
+    renewed when the row is added, repositioned or changes course but
+    not by step(). time_hours is the total time the table was stepped.
+
+    Rows also keep a kinematic anchor (x0, y0 at time t0). Positions
+    are evaluated in closed form from the anchors, so step() has no
+    accumulated drift and stepping one hour costs the same as one tick.
+    """
+
+    def __init__(self, vessels: Iterable[Vessel] = (), capacity: int = 16):
+        self._size = 0
+        self.layout_version = 0  # Bumped whenever existing rows move
+        self.time_hours = 0.0
+        # None in a copy until first used; see _vessel_list and _id_index
+        self._vessels: Optional[List[Vessel]] = []
+        self._index: Optional[Dict[str, List[int]]] = {}
+        self._allocate(max(capacity, 1))
+
+        for vessel in vessels:
+            self.append(vessel)
+
+    def _allocate(self, capacity: int) -> None:
+        old_size = self._size
+        columns = {}
+        for name in ("_x", "_y", "_speed", "_heading", "_vx", "_vy", "_x0", "_y0", "_t0"):
+            column = np.zeros(capacity, dtype=np.float64)
+            if old_size:
+                column[:old_size] = getattr(self, name)[:old_size]
+            columns[name] = column
+
+        ids = np.empty(capacity, dtype=object)
+        version = np.zeros(capacity, dtype=np.int64)
+        if old_size:
+            ids[:old_size] = self._ids[:old_size]
+            version[:old_size] = self._version[:old_size]
+
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self._ids = ids
+        self._version = version
+        self._capacity = capacity
+
+
+    # Column views (active rows only)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x[:self._size]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y[:self._size]
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self._speed[:self._size]
+
+    @property
+    def heading(self) -> np.ndarray:
+        return self._heading[:self._size]
+
+    @property
+    def vx(self) -> np.ndarray:
+        return self._vx[:self._size]
+
+    @property
+    def vy(self) -> np.ndarray:
+        return self._vy[:self._size]
+
+    @property
+    def versions(self) -> np.ndarray:
+        return self._version[:self._size]
+
+
+    # Sequence of vessels
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Vessel]:
+        return iter(self._vessel_list())
+
+    def __getitem__(self, index):
+        return self._vessel_list()[index]
+
+    def __repr__(self) -> str:
+        return f"VesselTable({self._vessel_list()!r})"
+
+
+    # Copies
+
+    def copy(self) -> "VesselTable":
+        """
+        Independent table with the same rows, clock and versions.
+
+        Only the columns are copied (in bulk). The copy builds its id
+        index and Vessel views on first use, so a copy that is only
+        evaluated never pays for them.
+        """
+        n = self._size
+        capacity = max(n, 1)
+        table = VesselTable.__new__(VesselTable)
+        table._size = n
+        table._capacity = capacity
+        table.layout_version = self.layout_version
+        table.time_hours = self.time_hours
+        table._vessels = None
+        table._index = None
+        for name in (
+            "_ids", "_x", "_y", "_speed", "_heading", "_vx", "_vy",
+            "_x0", "_y0", "_t0", "_version",
+        ):
+            setattr(table, name, getattr(self, name)[:capacity].copy())
+        return table
+
+    def at(self, time_hours: float) -> "VesselTable":
+        """
+        Independent table at time_hours, every row moved along its
+        course and re-anchored there with a new kinematic version.
+
+        Like copy(), only the columns are written (in bulk).
+        """
+        n = self._size
+        xs, ys = self.predict(time_hours - self.time_hours)
+        table = self.copy()
+        table.time_hours = time_hours
+        for column in (table._x, table._x0):
+            column[:n] = xs
+        for column in (table._y, table._y0):
+            column[:n] = ys
+        table._t0[:n] = time_hours
+        table._version[:n] = next_kinematic_versions(n)
+        return table
+
+    def _vessel_list(self) -> List[Vessel]:
+        """
+        Vessel per row; built on first use in a copy.
+        """
+        if self._vessels is None:
+            view = Vessel.__new__
+            vessels = []
+            for row, vessel_id in enumerate(self.ids.tolist()):
+                vessel = view(Vessel)
+                vessel._table = self
+                vessel._row = row
+                vessel._vessel_id = vessel_id
+                vessels.append(vessel)
+            self._vessels = vessels
+        return self._vessels
+
+    def _id_index(self) -> Dict[str, List[int]]:
+        """
+        Rows by vessel id; built on first use in a copy.
+        """
+        if self._index is None:
+            index: Dict[str, List[int]] = {}
+            for row, vessel_id in enumerate(self.ids.tolist()):
+                index.setdefault(vessel_id, []).append(row)
+            self._index = index
+        return self._index
+
+
+    # Row management
+
+    def append(self, vessel: Vessel) -> int:
+        """
+        Bind a vessel to a new row at the end of the table.
+
+        Returns:
+            Row index of the vessel
+        """
+        if vessel._table is not None:
+            raise ValueError(
+                f"Vessel {vessel.vessel_id!r} already belongs to a table"
+            )
+
+        if self._size == self._capacity:
+            self._allocate(self._capacity * 2)
+
+        row = self._size
+        position = vessel.position
+        self._ids[row] = vessel.vessel_id
+        self._x[row] = position.x
+        self._y[row] = position.y
+        self._write_course(row, vessel.speed_knots, vessel.heading_deg)  # Anchors too
+
+        self._size += 1
+        self._vessel_list().append(vessel)
+        self._id_index().setdefault(vessel.vessel_id, []).append(row)
+        vessel._table = self
+        vessel._row = row
+        return row
+
+    def extend(self, vessels: Iterable[Vessel]) -> range:
+        """
+        Bind many vessels to new rows at once.
+
+        The table grows at most once and the columns are filled in
+        bulk. No vessel is added if any of them is already bound.
+
+        Returns:
+            Row indices of the new vessels
+        """
+        vessels = list(vessels)
+        for vessel in vessels:
+            if vessel._table is not None:
+                raise ValueError(
+                    f"Vessel {vessel.vessel_id!r} already belongs to a table"
+                )
+
+        start = self._size
+        end = start + len(vessels)
+        capacity = self._capacity
+        while capacity < end:
+            capacity *= 2
+        if capacity != self._capacity:
+            self._allocate(capacity)
+
+        rows = slice(start, end)
+        positions = [vessel.position for vessel in vessels]
+        self._ids[rows] = [vessel.vessel_id for vessel in vessels]
+        self._x[rows] = [p.x for p in positions]
+        self._y[rows] = [p.y for p in positions]
+        self._write_courses(
+            np.arange(start, end),
+            np.array([vessel.speed_knots for vessel in vessels], dtype=np.float64),
+            np.array([vessel.heading_deg for vessel in vessels], dtype=np.float64),
+        )
+
+        self._size = end
+        self._vessel_list().extend(vessels)
+        index = self._id_index()
+        for row, vessel in enumerate(vessels, start):
+            index.setdefault(vessel.vessel_id, []).append(row)
+            vessel._table = self
+            vessel._row = row
+        return range(start, end)
+
+    def rows_for(self, vessel_id: str) -> List[int]:
+        """
+        Row indices of all vessels with the given id.
+        """
+        return list(self._id_index().get(vessel_id, ()))
+
+    def rows_for_ids(self, vessel_ids: Iterable[str]) -> List[Optional[List[int]]]:
+        """
+        Rows of each id, None for unknown ids (do not modify the lists).
+        """
+        get = self._id_index().get
+        return [get(vessel_id) for vessel_id in vessel_ids]
+
+    def find(self, vessel_id: str) -> List[Vessel]:
+        vessels = self._vessel_list()
+        return [vessels[row] for row in self._id_index().get(vessel_id, ())]
+
+    def remove(self, vessel_id: str) -> int:
+        """
+        Remove every vessel with the given id.
+
+        Removed vessels are unbound and keep their last state.
+
+        Returns:
+            Number of vessels removed
+        """
+        rows = self._id_index().pop(vessel_id, None)
+        if not rows:
+            return 0
+
+        # Highest rows first, so the last row is never still pending removal
+        vessels = self._vessel_list()
+        for row in sorted(rows, reverse=True):
+            self._unbind(vessels[row])
+            self._swap_remove(row)
+
+        self.layout_version += 1
+        return len(rows)
+
+    def _swap_remove(self, row: int) -> None:
+        vessels = self._vessel_list()
+        last = self._size - 1
+        if row != last:
+            for name in (
+                "_ids", "_x", "_y", "_speed", "_heading", "_vx", "_vy",
+                "_x0", "_y0", "_t0", "_version",
+            ):
+                column = getattr(self, name)
+                column[row] = column[last]
+
+            moved = vessels[last]
+            vessels[row] = moved
+            moved._row = row
+            rows = self._id_index()[moved.vessel_id]
+            rows[rows.index(last)] = row
+
+        vessels.pop()
+        self._ids[last] = None
+        self._size = last
+
+    def rename(self, row: int, vessel_id: str) -> None:
+        """
+        Change the id of a row, keeping the id index in sync.
+        """
+        index = self._id_index()
+        old_rows = index[self._ids[row]]
+        old_rows.remove(row)
+        if not old_rows:
+            del index[self._ids[row]]
+        self._ids[row] = vessel_id
+        index.setdefault(vessel_id, []).append(row)
+
+    def _unbind(self, vessel: Vessel) -> None:
+        row = vessel._row
+        vessel._x = float(self._x[row])
+        vessel._y = float(self._y[row])
+        vessel._speed_knots = float(self._speed[row])
+        vessel._heading_deg = float(self._heading[row])
+        vessel._kinematic_version = int(self._version[row])
+        vessel._time_hours = self.time_hours
+        vessel._anchor_x = vessel._x
+        vessel._anchor_y = vessel._y
+        vessel._anchor_time = self.time_hours
+        vessel._table = None
+        vessel._row = -1
+
+
+    # Row updates (used by bound vessels)
+
+    def set_position(self, row: int, x: float, y: float) -> None:
+        self._x[row] = x
+        self._y[row] = y
+        self._anchor_row(row)
+
+    def set_course(self, row: int, speed_knots: float, heading_deg: float) -> None:
+        self._write_course(row, speed_knots, heading_deg)
+
+    def _write_course(self, row: int, speed_knots: float, heading_deg: float) -> None:
+        vx, vy = velocity_components(speed_knots, heading_deg)
+        self._speed[row] = speed_knots
+        self._heading[row] = heading_deg
+        self._vx[row] = vx
+        self._vy[row] = vy
+        self._anchor_row(row)
+
+    def set_courses(
+        self,
+        rows: Sequence[int],
+        speeds: Optional[Sequence[float]] = None,
+        headings: Optional[Sequence[float]] = None,
+    ) -> None:
+        """
+        Update the course of many rows in one vectorized pass.
+
+        Args:
+            rows: Row indices (each at most once)
+            speeds: New speeds in knots, or None to keep them
+            headings: New headings in degrees, or None to keep them
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self._write_courses(
+            rows,
+            self._speed[rows] if speeds is None else np.asarray(speeds, dtype=np.float64),
+            self._heading[rows] if headings is None else np.asarray(headings, dtype=np.float64),
+        )
+
+    def set_states(
+        self,
+        rows: Sequence[int],
+        xs: Sequence[float],
+        ys: Sequence[float],
+        speeds: Sequence[float],
+        headings: Sequence[float],
+    ) -> None:
+        """
+        Reposition many rows and set their course in one vectorized pass.
+
+        Args:
+            rows: Row indices (each at most once)
+            xs, ys: New positions
+            speeds: New speeds in knots
+            headings: New headings in degrees
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self._x[rows] = xs
+        self._y[rows] = ys
+        self._write_courses(
+            rows,
+            np.asarray(speeds, dtype=np.float64),
+            np.asarray(headings, dtype=np.float64),
+        )
+
+    def _write_courses(
+        self, rows: np.ndarray, speeds: np.ndarray, headings: np.ndarray
+    ) -> None:
+        # Same formula as velocity_components, applied to arrays
+        heading_rad = np.radians(headings)
+        self._speed[rows] = speeds
+        self._heading[rows] = headings
+        self._vx[rows] = speeds * np.sin(heading_rad)
+        self._vy[rows] = speeds * np.cos(heading_rad)
+        self._x0[rows] = self._x[rows]
+        self._y0[rows] = self._y[rows]
+        self._t0[rows] = self.time_hours
+        self._version[rows] = next_kinematic_versions(len(rows))
+
+    def _anchor_row(self, row: int) -> None:
+        self._x0[row] = self._x[row]
+        self._y0[row] = self._y[row]
+        self._t0[row] = self.time_hours
+        self._version[row] = next_kinematic_version()
+
+    def predict_row(self, row: int, dt_hours: float) -> tuple[float, float]:
+        """
+        Position of one row dt_hours from now on its current course.
+        """
+        elapsed = self.time_hours + dt_hours - self._t0[row]
+        return (
+            float(self._x0[row] + self._vx[row] * elapsed),
+            float(self._y0[row] + self._vy[row] * elapsed),
+        )
+
+
+    # Simulation
+
+    def predict(self, dt_hours: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Positions of all rows dt_hours from now, in closed form.
+
+        Returns:
+            (x, y): New arrays; the table is not modified
+        """
+        n = self._size
+        elapsed = (self.time_hours + dt_hours) - self._t0[:n]
+        return (
+            self._x0[:n] + self._vx[:n] * elapsed,
+            self._y0[:n] + self._vy[:n] * elapsed,
+        )
+
+    def step(self, dt_hours: float) -> None:
+        """
+        Advance every row by dt_hours in one vectorized pass.
+        """
+        n = self._size
+        self.time_hours += dt_hours
+        # x = x0 + vx * (time - t0), computed in place
+        for column, anchor, velocity in (
+            (self._x, self._x0, self._vx),
+            (self._y, self._y0, self._vy),
+        ):
+            out = column[:n]
+            np.subtract(self.time_hours, self._t0[:n], out=out)
+            out *= velocity[:n]
+            out += anchor[:n]
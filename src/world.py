@@ -1,38 +1,159 @@
-from typing import Any, Dict, List
+import copy
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
 from vessel import Vessel
-from alert import alert_text, generate_alert, generate_alerts, sort_alerts
+from position import Position
+from vessel_table import VesselTable
+from alert import Alert, alert_text, generate_alerts, sort_alerts
+from risk import RiskLevel
+from spatial import BroadPhaseEvaluator, SpatialGrid
+from metrics import METRICS
+
+
+# Evaluation hook: (own, targets) -> one Alert per target, in target order
+AlertEvaluator = Callable[[Vessel, VesselTable], List[Alert]]
+
+
+def evaluate_targets(own: Vessel, targets: VesselTable) -> List[Alert]:
+    """
+    Default evaluator: batched CPA/TCPA/risk over the target table.
+    """
+    return generate_alerts(own, targets, include_safe=True)
+
+
+def _unbound(vessel: Vessel, table: VesselTable) -> Vessel:
+    """
+    The vessel itself, or a copy of it if it is already a row of
+    another table (a row belongs to exactly one table). Vessels already
+    in table are passed through, so the table still rejects them.
+    """
+    if vessel._table is None or vessel._table is table:
+        return vessel
+    return Vessel(vessel.vessel_id, vessel.position, vessel.speed_knots, vessel.heading_deg)
 
 
 class World:
     """
     Simulation world containing own vessel and target vessels.
+
+    Targets are stored column-wise in a VesselTable; the Vessel objects
+    passed in stay usable as views onto their rows. Targets that are
+    already in another World are copied instead, so several worlds can
+    be built from the same vessel list.
+
+    The evaluator computes the alert for every target; replace it to
+    plug in a different (e.g. vectorized or parallel) backend.
+
+    With grid_cell_nm set, targets are indexed in a SpatialGrid and only
+    those that could reach the warning envelope get a CPA evaluation.
+    The grid's broad phase is then the evaluator, so the two options
+    cannot be combined.
     """
 
-    def __init__(self, own: Vessel, targets: List[Vessel]):
+    def __init__(
+        self,
+        own: Vessel,
+        targets: List[Vessel],
+        evaluator: Optional[AlertEvaluator] = None,
+        grid_cell_nm: Optional[float] = None,
+    ):
+        if evaluator is not None and grid_cell_nm is not None:
+            raise ValueError("Pass either an evaluator or grid_cell_nm, not both")
         self.own = own
-        self.targets = list(targets)
+        self.targets = VesselTable()
+        for target in targets:
+            self.targets.append(_unbound(target, self.targets))
+        self.evaluator = evaluator or evaluate_targets
+        self.grid: Optional[SpatialGrid] = None
+
+        if grid_cell_nm is not None:
+            self.grid = SpatialGrid(self.targets, grid_cell_nm)
+            self.evaluator = BroadPhaseEvaluator(self.grid)
 
     
     # Simulation
     
+    @property
+    def time_hours(self) -> float:
+        """
+        Simulated time, in hours since the world was created.
+        """
+        return self.targets.time_hours
+
     def step(self, dt_hours: float) -> None:
+        # Closed form from each vessel's anchor: any dt costs the same
         self.own.step(dt_hours)
-        for target in self.targets:
-            target.step(dt_hours)
+        self.targets.step(dt_hours)
+        # The broad phase re-files moved rows when it next evaluates
+
+    def at(self, time_hours: float) -> "World":
+        """
+        Independent copy of the world at time_hours, assuming every
+        vessel keeps its current course and speed. The copy uses the
+        default evaluator (with the same spatial grid setting).
+
+        Args:
+            time_hours: Absolute simulated time (see time_hours)
+
+        Returns:
+            New World; this one is not modified
+        """
+        dt_hours = time_hours - self.time_hours
+        own = self.own
+        world = World(
+            Vessel(own.vessel_id, own.predict(dt_hours), own.speed_knots, own.heading_deg),
+            [],
+        )
+        world.targets = self.targets.at(time_hours)
+        if self.grid is not None:
+            world.grid = SpatialGrid(world.targets, self.grid.cell_size_nm)
+            world.evaluator = BroadPhaseEvaluator(world.grid)
+        return world
+
+    def copy(self, evaluator: Optional[AlertEvaluator] = None) -> "World":
+        """
+        Independent copy of the world as it is now.
+
+        Unlike at(), the copy keeps the simulated time and every
+        kinematic version, so one CachedAlertEvaluator can follow a
+        series of copies. Columns are copied in bulk.
+
+        Args:
+            evaluator: Evaluator for the copy. If None, the copy gets
+                the default evaluation: a rebuilt spatial grid if this
+                world has one, else evaluate_targets. If given, it is
+                used as is and the copy has no grid.
+
+        Returns:
+            New World; later changes to either world do not affect the other
+        """
+        world = World(copy.copy(self.own), [], evaluator=evaluator)
+        world.targets = self.targets.copy()
+        if self.grid is not None and evaluator is None:
+            world.grid = SpatialGrid(world.targets, self.grid.cell_size_nm)
+            world.evaluator = BroadPhaseEvaluator(world.grid)
+        return world
 
     
     # Target management
     
     def add_target(self, target: Vessel) -> None:
-        self.targets.append(target)
+        self.targets.append(_unbound(target, self.targets))
+
+    def add_targets(self, targets: Iterable[Vessel]) -> int:
+        """
+        Add many targets at once (one table resize, bulk column writes).
+
+        Returns:
+            Number of targets added
+        """
+        return len(self.targets.extend(_unbound(t, self.targets) for t in targets))
 
     def find_targets_by_id(self, vessel_id: str) -> List[Vessel]:
-        return [t for t in self.targets if t.vessel_id == vessel_id]
+        return self.targets.find(vessel_id)
 
     def remove_target(self, vessel_id: str) -> int:
-        matches = self.find_targets_by_id(vessel_id)
-        self.targets = [t for t in self.targets if t.vessel_id != vessel_id]
-        return len(matches)
+        return self.targets.remove(vessel_id)
 
    
     # Own vessel course control
@@ -76,19 +197,156 @@ class World:
             t.change_speed(speed_knots)
         return len(targets)
 
+    def update_targets(
+        self,
+        vessel_ids: Sequence[str],
+        headings_deg: Optional[Sequence[float]] = None,
+        speeds_knots: Optional[Sequence[float]] = None,
+    ) -> int:
+        """
+        Update heading and/or speed for many targets at once.
+
+        Each id updates all targets matching it, as in
+        update_target_heading / update_target_speed; if an id repeats,
+        its last entry wins. Nothing changes if any speed is negative.
+
+        Args:
+            vessel_ids: Target ids
+            headings_deg: New heading per id (normalized), or None
+            speeds_knots: New speed per id (must be >= 0), or None
+
+        Returns:
+            Number of targets updated
+        """
+        for values in (headings_deg, speeds_knots):
+            if values is not None and len(values) != len(vessel_ids):
+                raise ValueError("Expected one value per id")
+        if speeds_knots is not None and any(s < 0 for s in speeds_knots):
+            raise ValueError("Speed must be non-negative")
+
+        last: Dict[int, int] = {}  # Row -> position in the request
+        updated = 0
+        for i, vessel_id in enumerate(vessel_ids):
+            rows = self.targets.rows_for(vessel_id)
+            updated += len(rows)
+            for row in rows:
+                last[row] = i
+
+        if last:
+            order = list(last.values())
+            self.targets.set_courses(
+                list(last),
+                speeds=None if speeds_knots is None else [speeds_knots[i] for i in order],
+                headings=None if headings_deg is None
+                else [headings_deg[i] % 360.0 for i in order],
+            )
+        return updated
+
+    def upsert_targets(
+        self,
+        vessel_ids: Sequence[str],
+        xs: Sequence[float],
+        ys: Sequence[float],
+        speeds_knots: Sequence[float],
+        headings_deg: Sequence[float],
+    ) -> Tuple[int, int]:
+        """
+        Set position and course of many targets by id, adding unknown ids.
+
+        Meant for feeds that report whole vessel states (e.g. AIS):
+        existing targets are updated in one vectorized pass and new ones
+        are added in one bulk append. Each id updates all targets
+        matching it; if an id repeats, its last entry wins. A NaN speed
+        or heading keeps the target's current value (0 for new targets).
+        Nothing changes if any speed is negative.
+
+        Returns:
+            (added, updated): Targets added and target rows updated
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        speeds = np.asarray(speeds_knots, dtype=np.float64)
+        headings = np.asarray(headings_deg, dtype=np.float64) % 360.0
+        if np.any(speeds < 0):
+            raise ValueError("Speed must be non-negative")
+
+        # Id -> position in the request, last entry wins
+        latest = dict(zip(vessel_ids, range(len(vessel_ids))))
+        matches = list(zip(latest.values(), self.targets.rows_for_ids(latest)))
+        new = [i for i, found in matches if found is None]
+        rows = [row for _, found in matches if found for row in found]
+        picks = [i for i, found in matches if found for _ in found]
+
+        if rows:
+            table = self.targets
+            picked = np.array(picks, dtype=np.int64)
+            row_index = np.array(rows, dtype=np.int64)
+            speed = speeds[picked]
+            heading = headings[picked]
+            table.set_states(
+                row_index,
+                xs[picked],
+                ys[picked],
+                np.where(np.isnan(speed), table.speed[row_index], speed),
+                np.where(np.isnan(heading), table.heading[row_index], heading),
+            )
+        if new:
+            self.add_targets(
+                Vessel(vessel_ids[i], Position(x, y), speed, heading)
+                for i, x, y, speed, heading in zip(
+                    new,
+                    xs[new].tolist(),
+                    ys[new].tolist(),
+                    np.nan_to_num(speeds[new]).tolist(),
+                    np.nan_to_num(headings[new]).tolist(),
+                )
+            )
+        return len(new), len(rows)
+
    
     # Snapshot
     
+    def evaluate(self) -> List[Alert]:
+        """
+        Evaluate every target once.
+
+        Returns:
+            One Alert per target, in target order (SAFE included)
+        """
+        return self.evaluator(self.own, self.targets)
+
     def snapshot(self) -> Dict[str, Any]:
-        alerts = sort_alerts(
-            generate_alerts(self.own, self.targets, include_safe=False)
-        )
+        with METRICS.span("snapshot.evaluate"):
+            evaluated = self.evaluate()
+        with METRICS.span("snapshot.sort_alerts"):
+            alerts = sort_alerts(
+                [a for a in evaluated if a.risk_level != RiskLevel.SAFE]
+            )
+        METRICS.count("targets_evaluated", len(evaluated))
+        METRICS.count("alerts_produced", len(alerts))
+        if METRICS.enabled:
+            danger = sum(1 for a in alerts if a.risk_level == RiskLevel.DANGER)
+            METRICS.set_gauge("alerts.DANGER", danger)
+            METRICS.set_gauge("alerts.WARNING", len(alerts) - danger)
+            METRICS.set_gauge("alerts.SAFE", len(evaluated) - len(alerts))
 
-        return {
-            "own": self._own_snapshot(),
-            "targets": [self._target_snapshot(t) for t in self.targets],
-            "alerts": [self._alert_snapshot(a) for a in alerts],
-        }
+        targets = self.targets
+        with METRICS.span("snapshot.build"):
+            return {
+                "own": self._own_snapshot(),
+                "targets": [
+                    self._target_snapshot(*row)
+                    for row in zip(
+                        targets.ids.tolist(),
+                        targets.x.tolist(),
+                        targets.y.tolist(),
+                        targets.speed.tolist(),
+                        targets.heading.tolist(),
+                        evaluated,
+                    )
+                ],
+                "alerts": [self._alert_snapshot(a) for a in alerts],
+            }
 
     
     # Snapshot helpers
@@ -101,13 +359,21 @@ class World:
             "heading_deg": self.own.heading_deg,
         }
 
-    def _target_snapshot(self, target: Vessel) -> Dict[str, Any]:
-        alert = generate_alert(self.own, target)
+    def _target_snapshot(
+        self,
+        vessel_id: str,
+        x: float,
+        y: float,
+        speed_knots: float,
+        heading_deg: float,
+        alert: Alert,
+    ) -> Dict[str, Any]:
+        # Built from the table columns, no Vessel view per row
         return {
-            "id": target.vessel_id,
-            "position": self._position_snapshot(target),
-            "speed_knots": target.speed_knots,
-            "heading_deg": target.heading_deg,
+            "id": vessel_id,
+            "position": {"x": x, "y": y},
+            "speed_knots": speed_knots,
+            "heading_deg": heading_deg,
             "alert": self._alert_detail_snapshot(alert),
         }
 
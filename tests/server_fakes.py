@@ -0,0 +1,44 @@
+import json
+import unittest
+import server
+
+
+# Module globals of server that tests replace
+SERVER_STATE = (
+    "world", "simulation", "broadcaster", "world_changed",
+    "snapshot_worker", "ais_feed",
+)
+
+
+class ScriptedWebSocket:
+    """
+    Delivers every message at once, like a client that sent a burst,
+    and records what the server sends back.
+    """
+
+    def __init__(self, messages=()):
+        self.messages = [json.dumps(m) for m in messages]
+        self.sent = []
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+
+def save_server_state(test: unittest.TestCase) -> None:
+    """
+    Restore the server globals when test ends (call from setUp).
+    """
+    saved = {name: getattr(server, name) for name in SERVER_STATE}
+
+    def restore():
+        for name, value in saved.items():
+            setattr(server, name, value)
+
+    test.addCleanup(restore)
@@ -0,0 +1,188 @@
+import math
+import os
+import tempfile
+import unittest
+import numpy as np
+import ais
+from ais import (
+    IngestStats, LocalProjection, Reassembler, decode_position_reports,
+    encode_position_report, ingest_file, iter_messages, nmea_sentences,
+    parse_sentence, position_slices, read_lines,
+)
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+# Reference sentences with published decodes
+CLASS_A = b"!AIVDM,1,1,,B,177KQJ5000G?tO`K>RA1wUbN0TKH,0*5C"
+CLASS_B = b"!AIVDM,1,1,,A,B52K>;h00Fc>jpUlNV@ikwpUoP06,0*4C"
+
+
+class TestDecode(unittest.TestCase):
+
+    def test_reference_reports(self):
+        payloads = [parse_sentence(s, Reassembler())[0] for s in (CLASS_A, CLASS_B)]
+
+        reports = decode_position_reports(payloads)
+
+        self.assertEqual(reports.mmsi.tolist(), [477553000, 338087471])
+        np.testing.assert_allclose(reports.lat, [47.582833, 40.68454], atol=1e-6)
+        np.testing.assert_allclose(reports.lon, [-122.345833, -74.072132], atol=1e-6)
+        np.testing.assert_allclose(reports.speed_knots, [0.0, 0.1])
+        np.testing.assert_allclose(reports.course_deg, [51.0, 79.6])
+
+    def test_encode_round_trip(self):
+        payloads = [
+            encode_position_report(211000001, 54.5, 10.25, 12.3, 275.4, 270, 3),
+            encode_position_report(211000002, -33.9, 151.2, None, None, 90, 18),
+            encode_position_report(211000003, 1.0, 2.0, 5.0, None, None, 2),
+            encode_position_report(211000004, 91.0, 181.0, 5.0, 10.0),  # No position
+        ]
+
+        reports = decode_position_reports(payloads)
+
+        self.assertEqual(reports.mmsi.tolist(), [211000001, 211000002, 211000003])
+        np.testing.assert_allclose(reports.lat, [54.5, -33.9, 1.0])
+        np.testing.assert_allclose(reports.lon, [10.25, 151.2, 2.0])
+        self.assertAlmostEqual(reports.speed_knots[0], 12.3)
+        self.assertTrue(math.isnan(reports.speed_knots[1]))
+        self.assertAlmostEqual(reports.course_deg[0], 275.4)
+        self.assertEqual(reports.course_deg[1], 90.0)  # True heading without COG
+        self.assertTrue(math.isnan(reports.course_deg[2]))
+
+
+class TestFraming(unittest.TestCase):
+
+    def test_tag_block_and_checksum(self):
+        line = nmea_sentences(b"13u?etPv2;0n:dDPwUM1U1Cb069D", time=1577836800)[0]
+
+        payload, time = parse_sentence(line, Reassembler())
+
+        self.assertEqual(payload, b"13u?etPv2;0n:dDPwUM1U1Cb069D")
+        self.assertEqual(time, 1577836800.0)
+        with self.assertRaises(ValueError):
+            parse_sentence(CLASS_A[:-1] + b"D", Reassembler())
+        with self.assertRaises(ValueError):
+            parse_sentence(b"$GPGGA,1,2,3*00", Reassembler())
+
+    def test_own_ship_sentences_are_skipped(self):
+        body = CLASS_A[1:-3].replace(b"VDM", b"VDO")
+        line = b"!%s*%02X" % (body, ais.nmea_checksum(body))
+
+        self.assertIsNone(parse_sentence(line, Reassembler())[0])
+
+    def test_reassembly(self):
+        payload = b"5" * 70
+        first, second = nmea_sentences(payload, seq_id=3, max_chars=40)
+        reassembler = Reassembler(max_pending=2)
+
+        self.assertIsNone(parse_sentence(first, reassembler)[0])
+        self.assertEqual(parse_sentence(second, reassembler)[0], payload)
+
+        # Out of order: the partial message is dropped
+        self.assertIsNone(parse_sentence(second, reassembler)[0])
+        self.assertEqual(reassembler.dropped, 0)
+        parse_sentence(first, reassembler)
+        parse_sentence(first, reassembler)
+        self.assertEqual(reassembler.dropped, 1)
+
+    def test_pending_messages_are_bounded(self):
+        reassembler = Reassembler(max_pending=2)
+        for seq_id in range(4):
+            first, _ = nmea_sentences(b"5" * 70, seq_id=seq_id, max_chars=40)
+            parse_sentence(first, reassembler)
+
+        self.assertEqual(reassembler.dropped, 2)
+
+    def test_invalid_lines_are_counted(self):
+        stats = IngestStats()
+        lines = [CLASS_A, b"garbage", CLASS_A[:-2] + b"00", CLASS_B, CLASS_A + CLASS_B]
+
+        messages = list(iter_messages(lines, stats))
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual((stats.sentences, stats.invalid, stats.messages), (5, 3, 2))
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".nmea")
+        os.close(fd)
+        self.chunk = ais.READ_CHUNK
+
+    def tearDown(self):
+        ais.READ_CHUNK = self.chunk
+        os.remove(self.path)
+
+    def write(self, lines, newline=b"\r\n"):
+        with open(self.path, "wb") as f:
+            f.write(newline.join(lines))
+
+    def test_read_lines_across_chunks(self):
+        lines = [CLASS_A, CLASS_B] * 5
+        self.write(lines)
+        ais.READ_CHUNK = 17
+
+        self.assertEqual(list(read_lines(self.path)), lines)
+
+    def test_read_lines_chunk_ends_after_newline(self):
+        lines = [CLASS_A] * 4
+        self.write(lines, newline=b"\n")
+        ais.READ_CHUNK = len(CLASS_A) + 1  # Every chunk ends right after a newline
+
+        self.assertEqual(list(read_lines(self.path)), lines)
+
+        with open(self.path, "wb") as f:
+            f.write(b"abcdefg\nhijklmn\nopq\n")
+        ais.READ_CHUNK = 8
+
+        self.assertEqual(list(read_lines(self.path)), [b"abcdefg", b"hijklmn", b"opq"])
+
+    def test_slices_by_time_and_size(self):
+        messages = [
+            (encode_position_report(1, 0.0, 0.0, 1.0, 0.0), t)
+            for t in (0.0, 10.0, 59.0, 60.0, 61.0, 62.0, 63.0)
+        ]
+        messages.insert(2, (b"5" * 70, 20.0))  # Not a position report
+
+        sizes = [len(s) for s in position_slices(messages, slice_seconds=60.0, max_reports=3)]
+
+        self.assertEqual(sizes, [3, 3, 1])
+
+    def test_ingest_file_upserts_by_mmsi(self):
+        lines = []
+        for i, (mmsi, lat, speed, course) in enumerate([
+            (244000001, 52.0, 10.0, 90.0),
+            (244000002, 52.1, 5.0, 180.0),
+            (244000001, 52.0, 12.0, None),  # Keeps course 90
+        ]):
+            payload = encode_position_report(mmsi, lat, 4.0 + i / 600.0, speed, course)
+            lines.extend(nmea_sentences(payload, time=1_600_000_000 + 30 * i))
+        self.write(lines)
+        world = World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [])
+
+        stats = ingest_file(world, self.path, slice_seconds=40.0)
+
+        self.assertEqual((stats.reports, stats.slices, stats.added, stats.updated), (3, 2, 2, 1))
+        first = world.find_targets_by_id("244000001")[0]
+        self.assertAlmostEqual(first.speed_knots, 12.0)
+        self.assertAlmostEqual(first.heading_deg, 90.0)
+        # Centered on the first report; 0.2 min east at 52°N
+        self.assertAlmostEqual(first.position.x, 0.2 * math.cos(math.radians(52.0)), places=4)
+        second = world.find_targets_by_id("244000002")[0]
+        self.assertAlmostEqual(second.position.y, 6.0, places=4)
+
+
+class TestLocalProjection(unittest.TestCase):
+
+    def test_wraps_date_line(self):
+        x, y = LocalProjection(0.0, 179.5).to_xy(np.array([0.5]), np.array([-179.5]))
+
+        self.assertAlmostEqual(x[0], 60.0)
+        self.assertAlmostEqual(y[0], 30.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import asyncio
+import socket
+import unittest
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from ais import encode_position_report, nmea_sentences
+from ais_feed import AisFeed, listen
+from broadcast import Broadcaster
+from metrics import METRICS
+from simulation import Simulation
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+def report(mmsi, lat=52.0, lon=4.0, speed=10.0, course=90.0, message_type=1):
+    return encode_position_report(mmsi, lat, lon, speed, course, message_type=message_type)
+
+
+def datagram(*payloads):
+    lines = []
+    for payload in payloads:
+        lines.extend(nmea_sentences(payload))
+    return b"\r\n".join(lines) + b"\r\n"
+
+
+def make_world():
+    return World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [])
+
+
+class TestAisFeed(unittest.TestCase):
+
+    def test_reports_are_applied_once_per_apply(self):
+        feed = AisFeed()
+        world = make_world()
+        feed.datagram_received(datagram(report(244000001), report(244000002, lat=52.1)), None)
+        feed.datagram_received(datagram(report(244000001, speed=12.0)), None)
+
+        self.assertEqual(feed.queue_depth, 3)
+        self.assertEqual(len(world.targets), 0)  # Nothing applied until the tick
+
+        # One upsert: the later report for 244000001 wins
+        self.assertEqual(feed.apply(world), (2, 0))
+
+        self.assertEqual(feed.queue_depth, 0)
+        self.assertEqual(feed.stats.reports, 3)
+        self.assertEqual(feed.stats.slices, 1)
+        first = world.find_targets_by_id("244000001")[0]
+        self.assertAlmostEqual(first.speed_knots, 12.0)
+        second = world.find_targets_by_id("244000002")[0]
+        self.assertAlmostEqual(second.position.y, 6.0, places=4)
+        self.assertEqual(feed.apply(world), (0, 0))
+        feed.datagram_received(datagram(report(244000002, speed=3.0)), None)
+        self.assertEqual(feed.apply(world), (0, 1))
+
+    def test_fragments_are_reassembled_across_datagrams(self):
+        feed = AisFeed()
+        payload = report(244000001, message_type=18)
+        first, second = nmea_sentences(payload, seq_id=3, max_chars=15)
+
+        feed.datagram_received(first, None)
+        self.assertEqual(feed.queue_depth, 0)
+        feed.datagram_received(second, None)
+
+        self.assertEqual(feed.queue_depth, 1)
+        self.assertEqual((feed.stats.datagrams, feed.stats.sentences, feed.stats.messages), (2, 2, 1))
+
+    def test_invalid_and_other_messages_are_not_queued(self):
+        feed = AisFeed()
+        bad = nmea_sentences(report(244000001))[0][:-2] + b"00"  # Wrong checksum
+        static = nmea_sentences(b"5" + b"0" * 60)  # Static data, not a position
+
+        feed.datagram_received(b"\r\n".join([bad, b"garbage", *static]), None)
+
+        self.assertEqual(feed.queue_depth, 0)
+        self.assertEqual((feed.stats.invalid, feed.stats.messages), (2, 1))
+
+    def test_full_queue_drops_and_counts(self):
+        feed = AisFeed(max_queue=2)
+        feed.datagram_received(datagram(*(report(244000000 + i) for i in range(5))), None)
+
+        self.assertEqual(feed.queue_depth, 2)
+        self.assertEqual(feed.stats.dropped, 3)
+
+        feed.apply(make_world())
+        feed.datagram_received(datagram(report(244000009)), None)
+        self.assertEqual(feed.queue_depth, 1)
+
+    def test_metrics(self):
+        METRICS.reset()
+        METRICS.enable()
+        try:
+            feed = AisFeed(max_queue=1)
+            feed.datagram_received(datagram(report(244000001), report(244000002)), None)
+            feed.apply(make_world())
+            feed.datagram_received(datagram(report(244000003)), None)
+            feed.apply(make_world())
+
+            stats = METRICS.stats()
+        finally:
+            METRICS.enable(False)
+            METRICS.reset()
+        self.assertEqual(stats["counters"]["ais.messages"], 3)
+        self.assertEqual(stats["counters"]["ais.dropped"], 1)
+        self.assertEqual(stats["counters"]["ais.reports"], 2)
+        self.assertEqual(stats["gauges"]["ais.queue_depth"], 1)
+
+
+class TestAisFeedUdp(unittest.TestCase):
+
+    def test_datagrams_over_loopback(self):
+        async def run():
+            feed = AisFeed()
+            transport = await listen(feed, "127.0.0.1", 0)
+            port = transport.get_extra_info("sockname")[1]
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                for i in range(20):
+                    sender.sendto(datagram(report(244000000 + i % 5)), ("127.0.0.1", port))
+                for _ in range(100):
+                    if feed.stats.datagrams == 20:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                sender.close()
+                transport.close()
+            world = make_world()
+            return feed.apply(world), feed.stats, world
+
+        (added, updated), stats, world = asyncio.run(run())
+
+        self.assertEqual((added, updated), (5, 0))
+        self.assertEqual(stats.reports, 20)
+        self.assertEqual(len(world.targets), 5)
+
+
+class TestServerAisFeed(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        server.world = make_world()
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+        server.world_changed = False
+        server.ais_feed = AisFeed()
+
+    def test_ticker_applies_feed_and_broadcasts(self):
+        websocket = ScriptedWebSocket()
+
+        async def run():
+            server.broadcaster.subscribe(websocket)
+            task = asyncio.ensure_future(server.ticker(50.0))
+            await asyncio.sleep(0.05)
+            server.ais_feed.datagram_received(datagram(report(244000001)), None)
+            await asyncio.sleep(0.1)
+            task.cancel()
+
+        asyncio.run(run())
+
+        # Paused: the only frame is the one for the AIS update
+        self.assertEqual(len(websocket.sent), 1)
+        self.assertEqual(len(server.world.find_targets_by_id("244000001")), 1)
+        self.assertEqual(server.ais_feed.queue_depth, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from alert import generate_alerts
+from alert_cache import CachedAlertEvaluator
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestCachedAlertEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.cache = CachedAlertEvaluator()
+        self.world = World(self.own, [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+            Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
+            Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
+            Vessel("STILL", Position(0.0, 9.0), 10.0, 0.0),  # Same velocity as own
+        ], evaluator=self.cache)
+
+    def assertMatchesFresh(self):
+        cached = self.world.evaluate()
+        fresh = generate_alerts(self.own, list(self.world.targets), include_safe=True)
+
+        self.assertEqual(len(cached), len(fresh))
+        for a, b in zip(cached, fresh):
+            self.assertEqual(a.target_id, b.target_id)
+            self.assertEqual(a.risk_level, b.risk_level)
+            self.assertAlmostEqual(a.cpa_nm, b.cpa_nm, places=9)
+            if b.tcpa_hours is None:
+                self.assertIsNone(a.tcpa_hours)
+            else:
+                self.assertAlmostEqual(a.tcpa_hours, b.tcpa_hours, places=9)
+
+    def test_straight_line_ticks_reuse_cpa(self):
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 4)
+
+        for _ in range(20):
+            self.world.step(0.01)
+            self.assertMatchesFresh()
+            self.assertEqual(self.cache.recomputed, 0)
+
+    def test_step_backwards_reclassifies(self):
+        self.world.step(0.3)
+        self.assertMatchesFresh()  # DANGER1 is past CPA
+
+        self.world.step(-0.25)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.scheduler.reclassified, 4)
+
+    def test_target_course_change_recomputes_that_target(self):
+        self.world.evaluate()
+        self.world.step(0.05)
+
+        self.world.update_target_heading("T2", 45.0)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 1)
+
+        self.world.update_target_speed("T1", 3.0)
+        self.world.step(0.05)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 1)
+
+    def test_own_update_recomputes_everything(self):
+        self.world.evaluate()
+
+        self.world.update_own_heading(30.0)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 4)
+
+        self.world.step(0.1)
+        self.world.update_own_speed(4.0)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 4)
+
+    def test_own_moved_outside_world_step(self):
+        self.world.evaluate()
+
+        self.own.step(0.2)  # Own ship advanced without the targets
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 4)
+
+    def test_add_and_remove_targets(self):
+        self.world.evaluate()
+
+        self.world.add_target(Vessel("T3", Position(1.0, 1.0), 5.0, 270.0))
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 1)
+
+        self.world.remove_target("T1")  # Last row moves into row 0
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 1)
+
+    def test_target_repositioned(self):
+        self.world.evaluate()
+
+        self.world.find_targets_by_id("T1")[0].position = Position(0.0, 2.0)
+        self.assertMatchesFresh()
+        self.assertEqual(self.cache.recomputed, 1)
+
+
+class TestKinematicVersion(unittest.TestCase):
+
+    def test_course_changes_bump_version_steps_do_not(self):
+        vessel = Vessel("V", Position(0.0, 0.0), 10.0, 0.0)
+        version = vessel.kinematic_version
+
+        vessel.step(0.5)
+        self.assertEqual(vessel.kinematic_version, version)
+
+        vessel.change_heading(90.0)
+        self.assertNotEqual(vessel.kinematic_version, version)
+
+        version = vessel.kinematic_version
+        vessel.change_speed(5.0)
+        self.assertNotEqual(vessel.kinematic_version, version)
+
+    def test_table_rows_keep_version_when_stepped(self):
+        target = Vessel("T", Position(0.0, 0.0), 10.0, 0.0)
+        world = World(Vessel("OWN", Position(1.0, 1.0), 0.0, 0.0), [target])
+        version = target.kinematic_version
+
+        world.step(1.0)
+        self.assertEqual(target.kinematic_version, version)
+        self.assertEqual(world.targets.time_hours, 1.0)
+
+        target.change_heading(10.0)
+        self.assertNotEqual(target.kinematic_version, version)
+
+
+if __name__ == "__main__":
+    unittest.main()
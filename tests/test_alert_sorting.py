@@ -46,6 +46,42 @@ class TestAlertSorting(unittest.TestCase):
     def test_empty_list(self):
         self.assertEqual(sort_alerts([]), [])
 
+    def test_equal_alerts_keep_input_order(self):
+        alerts = [
+            Alert("T1", RiskLevel.WARNING, None, None),
+            Alert("T2", RiskLevel.DANGER, 0.3, 0.1),
+            Alert("T3", RiskLevel.WARNING, None, None),
+            Alert("T4", RiskLevel.DANGER, 0.3, 0.2),
+        ]
+
+        sorted_alerts = sort_alerts(alerts)
+
+        self.assertEqual(
+            [a.target_id for a in sorted_alerts],
+            ["T2", "T4", "T1", "T3"],
+        )
+
+    def test_top_k_matches_full_sort_prefix(self):
+        alerts = [
+            Alert(f"T{i}", level, cpa, None)
+            for i, (level, cpa) in enumerate([
+                (RiskLevel.SAFE, 4.0),
+                (RiskLevel.WARNING, None),
+                (RiskLevel.DANGER, 0.4),
+                (RiskLevel.WARNING, 1.2),
+                (RiskLevel.DANGER, 0.1),
+                (RiskLevel.WARNING, 1.2),
+            ])
+        ]
+
+        for k in range(len(alerts) + 2):
+            self.assertEqual(sort_alerts(alerts, top_k=k), sort_alerts(alerts)[:k])
+
+    def test_top_k_zero(self):
+        alerts = [Alert("T1", RiskLevel.DANGER, 0.1, 0.1)]
+
+        self.assertEqual(sort_alerts(alerts, top_k=0), [])
+
 
 if __name__ == "__main__":
     unittest.main()
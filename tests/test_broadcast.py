@@ -0,0 +1,126 @@
+import asyncio
+import json
+import unittest
+import broadcast
+from broadcast import Broadcaster, dumps
+
+
+def snapshot(y):
+    return {
+        "own": {"id": "OWN", "position": {"x": 0.0, "y": y}},
+        "targets": [{"id": "T1", "position": {"x": 1.0, "y": 2.0}}],
+        "alerts": [],
+    }
+
+
+class RecordingWebSocket:
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+
+    async def send(self, payload):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(payload)
+
+
+class TestBroadcaster(unittest.TestCase):
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_same_payload_for_all_full_subscribers(self):
+        async def scenario():
+            broadcaster = Broadcaster()
+            a, b = RecordingWebSocket(), RecordingWebSocket()
+            broadcaster.subscribe(a)
+            broadcaster.subscribe(b)
+            broadcaster.publish(snapshot(0.0))
+            await asyncio.sleep(0.01)
+            return a, b
+
+        a, b = self.run_async(scenario())
+
+        self.assertEqual(len(a.sent), 1)
+        self.assertIs(a.sent[0], b.sent[0])
+
+    def test_slow_subscriber_drops_stale_frames(self):
+        async def scenario():
+            broadcaster = Broadcaster()
+            fast = RecordingWebSocket()
+            slow = RecordingWebSocket(delay=0.05)
+            broadcaster.subscribe(fast)
+            slow_sub = broadcaster.subscribe(slow)
+            for i in range(10):
+                broadcaster.publish(snapshot(float(i)))
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.15)
+            return fast, slow, slow_sub
+
+        fast, slow, slow_sub = self.run_async(scenario())
+
+        self.assertEqual(len(fast.sent), 10)
+        self.assertLess(len(slow.sent), 10)
+        self.assertEqual(slow_sub.frames_sent + slow_sub.frames_dropped, 10)
+        # The latest frame always gets through
+        self.assertEqual(json.loads(slow.sent[-1])["own"]["position"]["y"], 9.0)
+
+    def test_delta_subscriber_resyncs_after_drop(self):
+        async def scenario():
+            broadcaster = Broadcaster()
+            slow = RecordingWebSocket(delay=0.03)
+            broadcaster.subscribe(slow, delta=True)
+            for i in range(6):
+                broadcaster.publish(snapshot(float(i)))
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.1)
+            return slow
+
+        slow = self.run_async(scenario())
+        messages = [json.loads(p) for p in slow.sent]
+
+        self.assertEqual(messages[0]["type"], "keyframe")
+        # Every delivered delta directly follows the previous frame
+        for prev, msg in zip(messages, messages[1:]):
+            if msg["type"] == "delta":
+                self.assertEqual(msg["seq"], prev["seq"] + 1)
+
+    def test_unsubscribe_stops_delivery(self):
+        async def scenario():
+            broadcaster = Broadcaster()
+            ws = RecordingWebSocket()
+            sub = broadcaster.subscribe(ws)
+            broadcaster.unsubscribe(sub)
+            broadcaster.publish(snapshot(0.0))
+            await asyncio.sleep(0.01)
+            return ws, broadcaster
+
+        ws, broadcaster = self.run_async(scenario())
+
+        self.assertEqual(ws.sent, [])
+        self.assertEqual(broadcaster.stats(), [])
+
+
+class TestDumps(unittest.TestCase):
+
+    def test_same_text_as_json_dumps(self):
+        message = {
+            "type": "delta",
+            "own": {"position": {"x": 1.5}},
+            "targets": {
+                "added": [{"id": f"T{i}", "alert": None} for i in range(7)],
+                "removed": ["0:A"],
+                "changed": [],
+            },
+            "alerts": [{"target_id": "T1", "cpa_nm": 0.25}] * 3,
+        }
+        slice_ = broadcast.JSON_SLICE
+        broadcast.JSON_SLICE = 2
+        try:
+            self.assertEqual(dumps(message), json.dumps(message))
+        finally:
+            broadcast.JSON_SLICE = slice_
+
+
+if __name__ == "__main__":
+    unittest.main()
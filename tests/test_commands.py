@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from commands import (
+    CommandError, CommandTable, Schema, array, boolean, integer, number, string,
+)
+
+
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = Schema(
+            string("id"),
+            number("speed", minimum=0.0),
+            number("value", 1.0, minimum=0.0, exclusive_minimum=True),
+            integer("count", 5, maximum=10),
+            string("mode", "full", choices=("full", "delta")),
+            boolean("flag", None),
+        )
+
+    def test_defaults_filled_in(self):
+        args = self.schema.validate({"id": "T1", "speed": 3, "extra": "ignored"})
+
+        self.assertEqual(args, {
+            "id": "T1", "speed": 3, "value": 1.0, "count": 5,
+            "mode": "full", "flag": None,
+        })
+
+    def test_errors(self):
+        cases = [
+            ({"speed": 1.0}, "id"),
+            ({"id": 7, "speed": 1.0}, "id"),
+            ({"id": "T1", "speed": True}, "speed"),
+            ({"id": "T1", "speed": "1"}, "speed"),
+            ({"id": "T1", "speed": -0.5}, "speed"),
+            ({"id": "T1", "speed": float("nan")}, "speed"),
+            ({"id": "T1", "speed": 1.0, "value": 0.0}, "value"),
+            ({"id": "T1", "speed": 1.0, "count": 2.0}, "count"),
+            ({"id": "T1", "speed": 1.0, "count": 11}, "count"),
+            ({"id": "T1", "speed": 1.0, "mode": "zip"}, "mode"),
+        ]
+        for data, field in cases:
+            with self.subTest(data=data):
+                with self.assertRaises(CommandError) as raised:
+                    self.schema.validate(data, "cmd")
+                self.assertEqual(raised.exception.field, field)
+                self.assertEqual(raised.exception.reply()["command"], "cmd")
+
+
+class TestCommandTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = CommandTable()
+        self.calls = []
+
+        @self.table.register("move", number("dt", 0.1), batchable=True)
+        async def move(client, args):
+            self.calls.append(args)
+
+        @self.table.register("info", array("items", []), snapshot=False)
+        async def info(client, args):
+            pass
+
+    def test_parse_and_dispatch(self):
+        command, args = self.table.parse_message('{"command": "move", "dt": 2}')
+        asyncio.run(command.handler(None, args))
+
+        self.assertTrue(command.snapshot)
+        self.assertFalse(self.table.get("info").snapshot)
+        self.assertEqual(self.calls, [{"dt": 2}])
+
+    def test_rejections(self):
+        for message in ("not json", "[1, 2]", '{"command": "nope"}',
+                        '{"command": ["move"]}', '{"command": "move", "dt": "x"}'):
+            with self.subTest(message=message):
+                with self.assertRaises(CommandError):
+                    self.table.parse_message(message)
+
+        with self.assertRaises(CommandError):
+            self.table.parse({"command": "info"}, batch=True)
+
+    def test_duplicate_registration(self):
+        with self.assertRaises(ValueError):
+            self.table.register("move")(lambda client, args: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
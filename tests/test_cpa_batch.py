@@ -0,0 +1,87 @@
+import random
+import unittest
+import numpy as np
+from vessel import Vessel
+from vessel_table import VesselTable
+from position import Position
+from cpa import cpa_distance, cpa_tcpa_batch, tcpa
+from risk import RISK_LEVELS, classify_risk, classify_risk_batch
+from alert import generate_alerts
+
+
+def random_fleet(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        Vessel(
+            f"T{i}",
+            Position(rng.uniform(-20, 20), rng.uniform(-20, 20)),
+            rng.uniform(0, 25),
+            rng.uniform(0, 360),
+        )
+        for i in range(n)
+    ]
+
+
+class TestCPABatch(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.5, -1.0), 12.0, 30.0)
+
+    def test_matches_scalar_functions(self):
+        """
+        Batch CPA/TCPA should match the scalar functions to 1e-12
+        """
+        targets = random_fleet(500)
+        table = VesselTable(targets)
+
+        cpa, t = cpa_tcpa_batch(self.own, table.x, table.y, table.vx, table.vy)
+
+        for i, target in enumerate(targets):
+            self.assertLess(abs(cpa[i] - cpa_distance(self.own, target)), 1e-12)
+            self.assertLess(abs(t[i] - tcpa(self.own, target)), 1e-12)
+
+    def test_zero_relative_velocity_is_nan(self):
+        """
+        Same course and speed → NaN TCPA, CPA is the current distance
+        """
+        target = Vessel("TGT", Position(3.5, 3.0), 12.0, 30.0)
+        vx, vy = target.velocity_vector()
+
+        cpa, t = cpa_tcpa_batch(
+            self.own, np.array([3.5]), np.array([3.0]),
+            np.array([vx]), np.array([vy]),
+        )
+
+        self.assertTrue(np.isnan(t[0]))
+        self.assertIsNone(tcpa(self.own, target))
+        self.assertAlmostEqual(cpa[0], 5.0, places=12)
+
+    def test_classify_risk_batch_matches_scalar(self):
+        targets = random_fleet(2000, seed=11)
+        table = VesselTable(targets)
+
+        cpa, t = cpa_tcpa_batch(self.own, table.x, table.y, table.vx, table.vy)
+        codes = classify_risk_batch(cpa, t)
+
+        for code, target in zip(codes, targets):
+            self.assertEqual(RISK_LEVELS[code], classify_risk(self.own, target))
+
+    def test_generate_alerts_table_matches_list(self):
+        targets = random_fleet(300, seed=3)
+        expected = generate_alerts(self.own, targets, include_safe=True)
+
+        alerts = generate_alerts(self.own, VesselTable(targets), include_safe=True)
+
+        self.assertEqual(len(alerts), len(expected))
+        for a, b in zip(alerts, expected):
+            self.assertEqual(a.target_id, b.target_id)
+            self.assertEqual(a.risk_level, b.risk_level)
+            self.assertAlmostEqual(a.cpa_nm, b.cpa_nm, places=12)
+            if b.tcpa_hours is None:
+                self.assertIsNone(a.tcpa_hours)
+            else:
+                self.assertAlmostEqual(a.tcpa_hours, b.tcpa_hours, places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+from world import World
+from vessel import Vessel
+from position import Position
+from cpa import cpa_tcpa
+from delta import DeltaEncoder, target_keys
+
+
+RISK_ORDER = {"DANGER": 0, "WARNING": 1}
+
+
+def merge(old, patch):
+    merged = dict(old)
+    for name, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(name), dict):
+            value = merge(merged[name], value)
+        merged[name] = value
+    return merged
+
+
+def apply_message(state, message):
+    """
+    Minimal client: rebuild a snapshot from keyframes and deltas.
+    """
+    if message["type"] == "keyframe":
+        return {
+            "own": message["own"],
+            "targets": {t["key"]: t for t in message["targets"]},
+        }
+
+    state["own"] = merge(state["own"], message.get("own", {}))
+    patch = message.get("targets")
+    if patch:
+        for key in patch["removed"]:
+            del state["targets"][key]
+        for fields in patch["changed"]:
+            key = fields["key"]
+            state["targets"][key] = merge(state["targets"][key], fields)
+        for target in patch["added"]:
+            state["targets"][target["key"]] = target
+    return state
+
+
+def vessel(fields):
+    position = Position(fields["position"]["x"], fields["position"]["y"])
+    return Vessel(fields["id"], position, fields["speed_knots"], fields["heading_deg"])
+
+
+def derived_alerts(state):
+    """
+    Alert list as the client derives it: risk from the last transition,
+    CPA from the current kinematics, sorted as sort_alerts.
+    """
+    own = vessel(state["own"])
+    alerts = []
+    for target in state["targets"].values():
+        risk = target["alert"]["risk"]
+        if risk in RISK_ORDER:
+            cpa, _ = cpa_tcpa(own, vessel(target))
+            alerts.append((RISK_ORDER[risk], cpa, target["id"], risk))
+    return [(target_id, risk) for _, _, target_id, risk in sorted(alerts, key=lambda a: a[:2])]
+
+
+def strip_keys(state):
+    # Kinematics and risk; CPA, TCPA and text are derived by the client
+    return {
+        "own": state["own"],
+        "targets": [
+            {k: v for k, v in t.items() if k not in ("key", "alert")}
+            for t in state["targets"].values()
+        ],
+        "risks": [t["alert"]["risk"] for t in state["targets"].values()],
+        "alerts": derived_alerts(state),
+    }
+
+
+def expected(snapshot):
+    return {
+        "own": snapshot["own"],
+        "targets": [
+            {k: v for k, v in t.items() if k != "alert"} for t in snapshot["targets"]
+        ],
+        "risks": [t["alert"]["risk"] for t in snapshot["targets"]],
+        "alerts": [(a["target_id"], a["risk"]) for a in snapshot["alerts"]],
+    }
+
+
+class TestDeltaEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.world = World(self.own, [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+            Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
+        ])
+        self.encoder = DeltaEncoder(keyframe_interval=10)
+
+    def test_first_frame_is_keyframe(self):
+        message = self.encoder.encode(self.world.snapshot())
+
+        self.assertEqual(message["type"], "keyframe")
+        self.assertEqual(message["seq"], 1)
+        self.assertEqual([t["key"] for t in message["targets"]], ["0:T1", "0:T2"])
+
+    def test_unchanged_world_gives_empty_delta(self):
+        self.encoder.encode(self.world.snapshot())
+        message = self.encoder.encode(self.world.snapshot())
+
+        self.assertEqual(message, {"type": "delta", "seq": 2})
+
+    def test_delta_contains_only_changed_fields(self):
+        self.encoder.encode(self.world.snapshot())
+        self.world.update_target_speed("T2", 6.0)
+        message = self.encoder.encode(self.world.snapshot())
+
+        changed = message["targets"]["changed"]
+        self.assertNotIn("own", message)
+        self.assertEqual(len(changed), 1)
+        self.assertEqual(changed[0]["key"], "0:T2")
+        self.assertEqual(changed[0]["speed_knots"], 6.0)
+        self.assertNotIn("position", changed[0])
+
+    def test_moving_targets_send_positions_only(self):
+        self.encoder.encode(self.world.snapshot())
+        self.world.step(0.01)
+        message = self.encoder.encode(self.world.snapshot())
+
+        changed = {c["key"]: c for c in message["targets"]["changed"]}
+        # T1 heads south (y only), T2 east (x only); CPA/TCPA drift is not sent
+        self.assertEqual(set(changed["0:T1"]), {"key", "position"})
+        self.assertEqual(set(changed["0:T1"]["position"]), {"y"})
+        self.assertEqual(set(changed["0:T2"]["position"]), {"x"})
+        self.assertEqual(set(message["own"]), {"position"})
+        self.assertNotIn("alerts", message)
+
+    def test_risk_transition_sends_alert(self):
+        first = self.encoder.encode(self.world.snapshot())
+        before = {t["id"]: t["alert"]["risk"] for t in first["targets"]}
+        self.world.update_target_heading("T1", 200.0)  # Now crosses ahead
+        message = self.encoder.encode(self.world.snapshot())
+
+        (change,) = message["targets"]["changed"]
+        self.assertEqual((before["T1"], change["alert"]["risk"]), ("SAFE", "WARNING"))
+        self.assertIn("tcpa_hours", change["alert"])
+
+    def test_added_and_removed_targets(self):
+        self.encoder.encode(self.world.snapshot())
+        self.world.remove_target("T1")
+        self.world.add_target(Vessel("T3", Position(1.0, 1.0), 5.0, 0.0))
+        message = self.encoder.encode(self.world.snapshot())
+
+        self.assertEqual(message["targets"]["removed"], ["0:T1"])
+        self.assertEqual([t["key"] for t in message["targets"]["added"]], ["0:T3"])
+
+    def test_periodic_keyframe(self):
+        types = [
+            self.encoder.encode(self.world.snapshot())["type"]
+            for _ in range(21)
+        ]
+
+        self.assertEqual(types.count("keyframe"), 3)
+        self.assertEqual(types[10], "keyframe")
+
+    def test_request_keyframe(self):
+        self.encoder.encode(self.world.snapshot())
+        self.encoder.request_keyframe()
+
+        self.assertEqual(self.encoder.encode(self.world.snapshot())["type"], "keyframe")
+
+    def test_patches_rebuild_snapshot(self):
+        state = None
+        for i in range(15):
+            self.world.step(0.05)
+            if i == 4:
+                self.world.add_target(Vessel("T1", Position(0.0, 3.0), 15.0, 190.0))
+            if i == 9:
+                self.world.remove_target("T2")
+            snapshot = self.world.snapshot()
+            state = apply_message(state, self.encoder.encode(snapshot))
+
+            self.assertEqual(strip_keys(state), expected(snapshot))
+
+    def test_duplicate_ids_get_distinct_keys(self):
+        keys = target_keys([{"id": "A"}, {"id": "B"}, {"id": "A"}])
+
+        self.assertEqual(keys, ["0:A", "0:B", "1:A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
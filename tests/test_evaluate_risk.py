@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+from vessel import Vessel
+from position import Position
+from cpa import cpa_distance, cpa_tcpa, tcpa
+from risk import RiskLevel, classify_risk, evaluate_risk, risk_from_cpa_tcpa
+from alert import generate_alert
+
+
+class TestEvaluateRisk(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.targets = [
+            Vessel("HEAD_ON", Position(0.0, 5.0), 10.0, 180.0),
+            Vessel("CROSSING", Position(-5.0, 5.0), 12.0, 90.0),
+            Vessel("OPENING", Position(0.0, -3.0), 5.0, 180.0),
+            Vessel("PARALLEL", Position(1.0, 0.0), 10.0, 0.0),
+        ]
+
+    def test_matches_individual_functions(self):
+        for target in self.targets:
+            cpa, t, risk = evaluate_risk(self.own, target)
+
+            self.assertEqual(cpa, cpa_distance(self.own, target))
+            self.assertEqual(t, tcpa(self.own, target))
+            self.assertEqual(risk, classify_risk(self.own, target))
+
+    def test_parallel_has_no_tcpa(self):
+        cpa, t = cpa_tcpa(self.own, self.targets[3])
+
+        self.assertIsNone(t)
+        self.assertAlmostEqual(cpa, 1.0, places=6)
+
+    def test_generate_alert_computes_velocity_once_per_vessel(self):
+        """
+        A fused evaluation needs one velocity vector per vessel
+        """
+        with mock.patch.object(
+            Vessel, "velocity_vector", autospec=True,
+            side_effect=lambda v: (0.0, v.speed_knots),
+        ) as velocity:
+            generate_alert(self.own, self.targets[0])
+
+        self.assertEqual(velocity.call_count, 2)
+
+    def test_risk_from_cpa_tcpa(self):
+        self.assertEqual(risk_from_cpa_tcpa(0.2, 0.3), RiskLevel.DANGER)
+        self.assertEqual(risk_from_cpa_tcpa(0.2, 0.8), RiskLevel.WARNING)
+        self.assertEqual(risk_from_cpa_tcpa(0.2, -0.1), RiskLevel.SAFE)
+        self.assertEqual(risk_from_cpa_tcpa(1.0, None), RiskLevel.WARNING)
+        self.assertEqual(risk_from_cpa_tcpa(None, None), RiskLevel.SAFE)
+
+
+if __name__ == "__main__":
+    unittest.main()
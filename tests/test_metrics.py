@@ -0,0 +1,124 @@
+import asyncio
+import json
+import unittest
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from broadcast import Broadcaster
+from metrics import METRICS, Histogram, Metrics
+from world import World
+from simulation import Simulation
+from vessel import Vessel
+from position import Position
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_summary_reports_milliseconds(self):
+        histogram = Histogram()
+        for value in (0.001, 0.002, 0.003):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+
+        self.assertEqual(summary["count"], 3)
+        self.assertAlmostEqual(summary["sum_ms"], 6.0)
+        self.assertAlmostEqual(summary["p50_ms"], 2.0)
+        self.assertAlmostEqual(summary["max_ms"], 3.0)
+
+    def test_window_is_rolling(self):
+        histogram = Histogram(window=2)
+        for value in (1.0, 0.001, 0.001):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 3)
+        self.assertAlmostEqual(histogram.summary()["max_ms"], 1.0)
+        self.assertEqual(histogram.bucket_counts[-1], 0)
+        self.assertEqual(sum(histogram.bucket_counts), 3)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics()
+        with metrics.span("work"):
+            pass
+        metrics.count("things", 5)
+        metrics.stop("manual", metrics.start())
+
+        self.assertEqual(metrics.stats()["histograms"], {})
+        self.assertEqual(metrics.stats()["counters"], {})
+
+    def test_enabled_records_spans_and_counters(self):
+        metrics = Metrics(enabled=True)
+        with metrics.span("work"):
+            pass
+        metrics.count("things", 5)
+        metrics.count("things")
+
+        stats = metrics.stats()
+        self.assertEqual(stats["histograms"]["work"]["count"], 1)
+        self.assertEqual(stats["counters"]["things"], 6)
+
+
+class TestInstrumentedHotPath(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        METRICS.reset()
+        METRICS.enable()
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        server.world = World(self.own, [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+            Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
+        ])
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+
+    def tearDown(self):
+        METRICS.enable(False)
+        METRICS.reset()
+
+    def test_snapshot_stages_and_counters(self):
+        server.world.snapshot()
+
+        stats = METRICS.stats()
+        for stage in ("snapshot.evaluate", "snapshot.sort_alerts", "snapshot.build"):
+            self.assertEqual(stats["histograms"][stage]["count"], 1)
+        self.assertEqual(stats["counters"]["targets_evaluated"], 2)
+        self.assertGreaterEqual(stats["counters"]["alerts_produced"], 1)
+
+    def test_stats_command(self):
+        websocket = ScriptedWebSocket([
+            {"command": "step", "dt": 0.01},
+            {"command": "bogus"},
+            {"command": "stats"},
+        ])
+
+        asyncio.run(server.handler(websocket))
+
+        self.assertEqual(len(websocket.sent), 3)
+        reply = json.loads(websocket.sent[-1])
+        self.assertEqual(reply["type"], "stats")
+        self.assertTrue(reply["enabled"])
+        self.assertEqual(reply["histograms"]["command.step"]["count"], 1)
+        self.assertEqual(reply["histograms"]["simulation.step"]["count"], 1)
+        self.assertNotIn("command.bogus", reply["histograms"])
+        self.assertEqual(json.loads(websocket.sent[1])["type"], "error")
+        self.assertEqual(reply["counters"]["bytes_sent"], len(websocket.sent[0]))
+
+    def test_stats_command_toggles_collection(self):
+        websocket = ScriptedWebSocket([
+            {"command": "stats", "enable": False, "reset": True},
+            {"command": "step", "dt": 0.01},
+            {"command": "stats"},
+        ])
+
+        asyncio.run(server.handler(websocket))
+
+        reply = json.loads(websocket.sent[-1])
+        self.assertFalse(reply["enabled"])
+        self.assertEqual(reply["histograms"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from metrics import Metrics
+from metrics_http import MetricsServer, render
+
+
+class TestRender(unittest.TestCase):
+
+    def test_histogram_families_and_labels(self):
+        metrics = Metrics(enabled=True)
+        metrics.histogram("snapshot.evaluate").observe(0.002)
+        metrics.histogram("command.step").observe(0.0004)
+        metrics.histogram("command.add_target").observe(0.003)
+
+        text = render(metrics)
+
+        self.assertIn("# TYPE sas_snapshot_evaluate_seconds histogram", text)
+        self.assertIn('sas_snapshot_evaluate_seconds_bucket{le="0.0025"} 1', text)
+        self.assertIn('sas_snapshot_evaluate_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("sas_snapshot_evaluate_seconds_count 1", text)
+        self.assertEqual(text.count("# TYPE sas_command_seconds histogram"), 1)
+        self.assertIn(
+            'sas_command_seconds_bucket{command="step",le="0.0005"} 1', text
+        )
+        self.assertIn('sas_command_seconds_count{command="add_target"} 1', text)
+
+    def test_counters_and_gauges(self):
+        metrics = Metrics(enabled=True)
+        metrics.count("bytes_sent", 120)
+        metrics.set_gauge("alerts.DANGER", 2)
+
+        text = render(metrics, {"connected_clients": 3})
+
+        self.assertIn("# TYPE sas_bytes_sent_total counter", text)
+        self.assertIn("sas_bytes_sent_total 120", text)
+        self.assertIn('sas_alerts{risk="DANGER"} 2.0', text)
+        self.assertIn("sas_connected_clients 3.0", text)
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    def fetch(self, path):
+        async def run():
+            metrics = Metrics()
+            server = MetricsServer("127.0.0.1", 0, metrics,
+                                   collect=lambda: {"targets": 7})
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                response = await reader.read()
+                writer.close()
+                return metrics, response.decode()
+            finally:
+                await server.stop()
+
+        return asyncio.run(run())
+
+    def test_serves_metrics_and_enables_collection(self):
+        metrics, response = self.fetch("/metrics")
+
+        self.assertTrue(metrics.enabled)
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK"))
+        self.assertIn("sas_targets 7.0", response)
+
+    def test_unknown_path(self):
+        _, response = self.fetch("/")
+
+        self.assertTrue(response.startswith("HTTP/1.1 404"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import math
+import random
+import unittest
+import numpy as np
+from alert_cache import CachedAlertEvaluator
+from risk import classify_risk_batch
+from risk_schedule import RiskScheduler, next_risk_transition
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestNextRiskTransition(unittest.TestCase):
+
+    def test_transition_times(self):
+        cpa = np.array([0.2, 1.0, 3.0, 0.2, 0.2])
+        cpa_time = np.array([2.0, 2.0, 2.0, np.nan, 0.7])
+
+        result = next_risk_transition(cpa, cpa_time, now=0.0)
+
+        self.assertEqual(result[0], 1.0)  # Enters WARNING at TCPA 1 h
+        self.assertEqual(result[1], 1.0)
+        self.assertTrue(math.isinf(result[2]))  # Never close enough
+        self.assertTrue(math.isinf(result[3]))  # No relative motion
+        self.assertAlmostEqual(result[4], 0.2)  # Already WARNING, DANGER at TCPA 0.5 h
+
+    def test_after_last_threshold(self):
+        cpa = np.array([0.2, 0.2])
+        cpa_time = np.array([1.0, 0.5])
+
+        result = next_risk_transition(cpa, cpa_time, now=0.8)
+
+        self.assertEqual(result[0], 1.0)  # Drops to SAFE after CPA
+        self.assertTrue(math.isinf(result[1]))  # CPA already passed
+
+
+class TestRiskScheduler(unittest.TestCase):
+
+    def test_codes_match_full_classification(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        cpa = rng.uniform(0.0, 3.0, n)
+        cpa_time = rng.uniform(-0.5, 3.0, n)
+        cpa_time[::17] = np.nan
+        versions = np.arange(1, n + 1, dtype=np.int64)
+
+        scheduler = RiskScheduler()
+        scheduler.reset(cpa, cpa_time, versions, 0.0)
+        reclassified = 0
+        for step in range(1, 400):
+            now = step * 0.01
+            scheduler.advance(cpa, cpa_time, versions, now)
+            reclassified += scheduler.reclassified
+            np.testing.assert_array_equal(
+                scheduler.codes, classify_risk_batch(cpa, cpa_time - now)
+            )
+
+        # Work tracks transitions (at most three per row), not n per tick
+        self.assertLess(reclassified, 4 * n)
+
+    def test_invalidated_rows_are_rescheduled(self):
+        cpa = np.array([0.2, 0.2])
+        cpa_time = np.array([1.5, 1.5])
+        versions = np.array([1, 2], dtype=np.int64)
+        scheduler = RiskScheduler()
+        scheduler.reset(cpa, cpa_time, versions, 0.0)
+
+        # Row 0 changes course: now far from any threshold
+        cpa[0], cpa_time[0], versions[0] = 5.0, 1.0, 3
+        scheduler.update(np.array([0]), cpa, cpa_time, versions, 0.1)
+        changed = scheduler.advance(cpa, cpa_time, versions, 0.6)
+
+        self.assertEqual(changed, [1])
+        self.assertEqual(scheduler.codes.tolist(), [0, 1])
+
+
+class TestCachedEvaluatorRisk(unittest.TestCase):
+
+    def test_long_run_with_course_changes(self):
+        rng = random.Random(3)
+        own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        targets = [
+            Vessel(f"T{i}", Position(rng.uniform(-8, 8), rng.uniform(-8, 8)),
+                   rng.uniform(0, 20), rng.uniform(0, 360))
+            for i in range(200)
+        ]
+        world = World(own, targets, evaluator=CachedAlertEvaluator())
+        reference = World(
+            Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0),
+            [Vessel(t.vessel_id, t.position, t.speed_knots, t.heading_deg)
+             for t in targets],
+        )
+
+        for tick in range(200):
+            if tick % 25 == 0:
+                vessel_id = f"T{rng.randrange(200)}"
+                heading = rng.uniform(0, 360)
+                world.update_target_heading(vessel_id, heading)
+                reference.update_target_heading(vessel_id, heading)
+            world.step(0.01)
+            reference.step(0.01)
+
+            cached = [a.risk_level for a in world.evaluate()]
+            fresh = [a.risk_level for a in reference.evaluate()]
+            self.assertEqual(cached, fresh)
+
+
+if __name__ == "__main__":
+    unittest.main()
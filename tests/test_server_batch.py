@@ -0,0 +1,114 @@
+import asyncio
+import json
+import unittest
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from broadcast import Broadcaster
+from world import World
+from simulation import Simulation
+from vessel import Vessel
+from position import Position
+
+
+class TestServerBatch(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        server.world = World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [])
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+
+    def run_handler(self, messages):
+        websocket = ScriptedWebSocket(messages)
+        asyncio.run(server.handler(websocket))
+        return [json.loads(p) for p in websocket.sent]
+
+    def test_batch_single_snapshot(self):
+        commands = [
+            {"command": "add_target", "id": f"S{i}", "x": float(i), "y": 5.0,
+             "speed": 4.0, "heading": 180.0}
+            for i in range(50)
+        ]
+        commands += [
+            {"command": "update_target_heading", "id": "S3", "heading_deg": 90.0},
+            {"command": "update_target_speed", "id": "S3", "speed_knots": 1.0},
+            {"command": "remove_target", "id": "S0"},
+            {"command": "update_own_speed", "speed_knots": 12.0},
+        ]
+
+        replies = self.run_handler([{"command": "batch", "commands": commands}])
+
+        self.assertEqual(len(replies), 1)
+        snapshot = replies[0]
+        self.assertEqual(len(snapshot["targets"]), 49)
+        s3 = next(t for t in snapshot["targets"] if t["id"] == "S3")
+        self.assertEqual((s3["heading_deg"], s3["speed_knots"]), (90.0, 1.0))
+        self.assertEqual(snapshot["own"]["speed_knots"], 12.0)
+
+    def test_invalid_batch_changes_nothing(self):
+        replies = self.run_handler([
+            {"command": "batch", "commands": [
+                {"command": "add_target", "id": "S1", "x": 0.0, "y": 1.0,
+                 "speed": 4.0, "heading": 0.0},
+                {"command": "update_target_speed", "id": "S1"},
+            ]},
+            {"command": "batch", "commands": [{"command": "subscribe"}]},
+            {"command": "batch", "commands": [
+                {"command": "update_own_speed", "speed_knots": -1.0},
+            ]},
+        ])
+
+        self.assertEqual([r["type"] for r in replies], ["error"] * 3)
+        self.assertIn("speed_knots", replies[0]["error"])
+        self.assertEqual(len(server.world.targets), 0)
+        self.assertEqual(server.world.own.speed_knots, 10.0)
+
+
+class TestServerCommandErrors(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        server.world = World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [])
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+
+    def test_malformed_messages_get_error_replies(self):
+        websocket = ScriptedWebSocket([
+            {"command": "add_target", "id": "S1", "x": 0.0},
+            {"command": "speed", "value": 0},
+            {"command": "nope"},
+            {"command": "update_own_speed", "speed_knots": 4.0},
+        ])
+        websocket.messages.insert(0, "{broken")
+
+        asyncio.run(server.handler(websocket))
+
+        replies = [json.loads(p) for p in websocket.sent]
+        self.assertEqual([r.get("type") for r in replies[:4]], ["error"] * 4)
+        self.assertEqual(replies[1]["command"], "add_target")
+        self.assertEqual(replies[1]["field"], "y")
+        self.assertEqual(replies[2]["field"], "value")
+        # The connection survived and the last command was applied
+        self.assertEqual(replies[4]["own"]["speed_knots"], 4.0)
+
+    def test_negative_step_is_rejected(self):
+        websocket = ScriptedWebSocket([
+            {"command": "step", "dt": 0.3},
+            {"command": "step", "dt": -0.25},
+            {"command": "batch", "commands": [
+                {"command": "step", "dt": 0.3},
+                {"command": "step", "dt": -0.25},
+            ]},
+        ])
+
+        asyncio.run(server.handler(websocket))
+
+        replies = [json.loads(p) for p in websocket.sent]
+        # One snapshot for the valid step; the batch is rejected whole
+        self.assertEqual([r.get("type") for r in replies], [None, "error", "error"])
+        self.assertEqual([r["field"] for r in replies[1:]], ["dt", "dt"])
+        self.assertAlmostEqual(server.world.time_hours, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import unittest
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from broadcast import Broadcaster
+from metrics import METRICS
+from world import World
+from simulation import Simulation
+from vessel import Vessel
+from position import Position
+
+
+class TestStepCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        METRICS.reset()
+        METRICS.enable()
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        server.world = World(self.own, [Vessel("T1", Position(2.0, 8.0), 8.0, 180.0)])
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+
+    def tearDown(self):
+        METRICS.enable(False)
+        METRICS.reset()
+
+    def test_burst_gets_one_snapshot(self):
+        websocket = ScriptedWebSocket(
+            [{"command": "step", "dt": 0.1}] * 5
+            + [{"command": "update_own_heading", "heading_deg": 90.0}]
+            + [{"command": "step", "dt": 0.1}] * 2
+        )
+
+        asyncio.run(server.handler(websocket))
+
+        self.assertEqual(len(websocket.sent), 1)
+        own = json.loads(websocket.sent[0])["own"]
+        # Heading change applied between the two runs of steps
+        self.assertAlmostEqual(own["position"]["y"], 5.0)
+        self.assertAlmostEqual(own["position"]["x"], 2.0)
+        self.assertAlmostEqual(server.world.time_hours, 0.7)
+
+        stats = METRICS.stats()
+        self.assertEqual(stats["counters"]["commands_coalesced"], 7)
+        self.assertEqual(stats["counters"]["steps_coalesced"], 5)
+        self.assertEqual(stats["gauges"]["commands_per_snapshot"], 8)
+        self.assertEqual(stats["histograms"]["simulation.step"]["count"], 2)
+
+    def test_replies_stay_in_order(self):
+        websocket = ScriptedWebSocket([
+            {"command": "step", "dt": 0.1},
+            {"command": "step", "dt": "x"},
+            {"command": "step", "dt": 0.1},
+            {"command": "stats"},
+        ])
+
+        asyncio.run(server.handler(websocket))
+
+        replies = [json.loads(p) for p in websocket.sent]
+        self.assertEqual(
+            [r.get("type", "snapshot") for r in replies],
+            ["snapshot", "error", "snapshot", "stats"],
+        )
+        self.assertAlmostEqual(replies[0]["own"]["position"]["y"], 1.0)
+        self.assertAlmostEqual(replies[2]["own"]["position"]["y"], 2.0)
+
+    def test_coalesce_steps(self):
+        commands = [
+            server.COMMANDS.parse(data)
+            for data in (
+                {"command": "step", "dt": 0.1},
+                {"command": "step", "dt": 0.2},
+                {"command": "pause"},
+                {"command": "step", "dt": 0.5},
+            )
+        ]
+
+        merged = server.coalesce_steps(commands)
+
+        self.assertEqual(
+            [(command.name, args.get("dt"), count) for command, args, count in merged],
+            [("step", 0.1 + 0.2, 2), ("pause", None, 1), ("step", 0.5, 1)],
+        )
+
+    def test_batch_merges_steps(self):
+        websocket = ScriptedWebSocket([{"command": "batch", "commands": [
+            {"command": "step", "dt": 0.2},
+            {"command": "step", "dt": 0.3},
+        ]}])
+
+        asyncio.run(server.handler(websocket))
+
+        self.assertAlmostEqual(server.world.time_hours, 0.5)
+        self.assertEqual(
+            METRICS.stats()["histograms"]["simulation.step"]["count"], 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from broadcast import Broadcaster
+from world import World
+from simulation import Simulation
+from vessel import Vessel
+from position import Position
+
+
+class TestServerTicker(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        server.world = World(self.own, [Vessel("T1", Position(2.0, 8.0), 8.0, 180.0)])
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+
+    def run_ticker(self, rate_hz, seconds, websocket):
+        async def run():
+            server.broadcaster.subscribe(websocket)
+            task = asyncio.ensure_future(server.ticker(rate_hz))
+            await asyncio.sleep(seconds)
+            task.cancel()
+
+        asyncio.run(run())
+
+    def test_ticker_advances_running_simulation(self):
+        websocket = ScriptedWebSocket()
+        server.simulation.start()
+        server.simulation.set_speed(3600.0)  # 1 s of real time = 1 h
+
+        self.run_ticker(rate_hz=50.0, seconds=0.2, websocket=websocket)
+
+        # Roughly 0.2 h at 10 knots, independent of the number of clients
+        self.assertGreater(self.own.position.y, 1.0)
+        self.assertLess(self.own.position.y, 3.0)
+        self.assertGreater(len(websocket.sent), 3)
+        self.assertIn("own", json.loads(websocket.sent[-1]))
+
+    def test_ticker_idle_when_paused(self):
+        websocket = ScriptedWebSocket()
+        server.world_changed = True
+
+        self.run_ticker(rate_hz=50.0, seconds=0.1, websocket=websocket)
+
+        # One frame for the pending change, then nothing while paused
+        self.assertEqual(self.own.position, Position(0.0, 0.0))
+        self.assertEqual(len(websocket.sent), 1)
+
+    def test_failed_tick_does_not_stop_ticker(self):
+        websocket = ScriptedWebSocket()
+        step = server.simulation.step
+        calls = []
+
+        def failing_step(dt_hours):
+            calls.append(dt_hours)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            step(dt_hours)
+
+        server.simulation.step = failing_step
+        server.simulation.start()
+        with self.assertLogs("server", "ERROR"):
+            self.run_ticker(rate_hz=50.0, seconds=0.1, websocket=websocket)
+
+        self.assertGreater(len(calls), 2)
+        self.assertGreater(len(websocket.sent), 0)
+
+    def test_slow_tick_is_not_made_up(self):
+        # Fake clock: the slow tick and each sleep advance it exactly
+        clock = [100.0]
+        delays = []
+        step = server.simulation.step
+        real_sleep = asyncio.sleep
+
+        def slow_step(dt_hours):
+            if not delays:
+                clock[0] += 0.2  # Ten tick slots
+            step(dt_hours)
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+            clock[0] += delay
+            if len(delays) == 5:
+                raise asyncio.CancelledError
+            await real_sleep(0)
+
+        async def run():
+            asyncio.get_running_loop().time = lambda: clock[0]
+            with mock.patch("asyncio.sleep", fake_sleep):
+                with self.assertRaises(asyncio.CancelledError):
+                    await server.ticker(50.0)
+
+        server.simulation.step = slow_step
+        asyncio.run(run())
+
+        # No back-to-back catch-up ticks: the schedule restarts after the slow one
+        self.assertEqual(len(delays), 5)
+        self.assertAlmostEqual(delays[0], 0.0)
+        for delay in delays[1:]:
+            self.assertAlmostEqual(delay, 0.02)
+
+    def test_manual_step_works_while_paused(self):
+        server.simulation.manual_step(0.5)
+
+        self.assertAlmostEqual(self.own.position.y, 5.0, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
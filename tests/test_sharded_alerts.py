@@ -0,0 +1,68 @@
+import random
+import unittest
+from alert import generate_alerts, sort_alerts
+from risk import RiskLevel
+from sharded_alerts import ShardedAlertGenerator
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+def make_targets(n, seed):
+    rng = random.Random(seed)
+    return [
+        Vessel(f"T{i}", Position(rng.uniform(-4, 4), rng.uniform(-4, 4)),
+               rng.uniform(0, 20), rng.uniform(0, 360))
+        for i in range(n)
+    ]
+
+
+class TestShardedAlertGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0),
+                           make_targets(600, seed=1))
+        self.generator = ShardedAlertGenerator(processes=3, min_shard_rows=100)
+
+    def tearDown(self):
+        self.generator.close()
+
+    def expected(self, top_k=None):
+        alerts = generate_alerts(self.world.own, self.world.targets)
+        return sort_alerts(alerts, top_k)
+
+    def test_matches_sorted_alerts(self):
+        alerts = self.generator.generate(self.world.own, self.world.targets)
+
+        self.assertEqual(self.generator.shards, 3)
+        self.assertGreater(len(alerts), 0)
+        self.assertNotIn(RiskLevel.SAFE, {a.risk_level for a in alerts})
+        self.assertEqual(alerts, self.expected())
+
+    def test_top_k(self):
+        alerts = self.generator.generate(self.world.own, self.world.targets, top_k=5)
+
+        self.assertEqual(alerts, self.expected(top_k=5))
+
+    def test_follows_changes_and_growth(self):
+        self.generator.generate(self.world.own, self.world.targets)
+
+        self.world.step(0.05)
+        self.world.update_own_heading(120.0)
+        self.world.add_targets(make_targets(900, seed=2))
+        alerts = self.generator.generate(self.world.own, self.world.targets)
+
+        self.assertEqual(alerts, self.expected())
+
+    def test_small_fleet_runs_inline(self):
+        generator = ShardedAlertGenerator(processes=3, min_shard_rows=1000)
+
+        alerts = generator.generate(self.world.own, self.world.targets)
+
+        self.assertEqual(generator.shards, 1)
+        self.assertIsNone(generator._executor)
+        self.assertEqual(alerts, self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
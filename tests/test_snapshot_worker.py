@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+import unittest
+import server
+from server_fakes import ScriptedWebSocket, save_server_state
+from broadcast import Broadcaster
+from snapshot_worker import SnapshotWorker
+from world import World
+from simulation import Simulation
+from vessel import Vessel
+from position import Position
+
+
+def make_world():
+    return World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [
+        Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+        Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
+    ])
+
+
+class TestSnapshotWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = SnapshotWorker()
+
+    def tearDown(self):
+        self.worker.close()
+
+    def test_snapshot_matches_world(self):
+        world = make_world()
+        world.step(0.2)
+
+        snapshot = asyncio.run(self.worker.snapshot(world))
+
+        self.assertEqual(snapshot, make_world().at(0.2).snapshot())
+
+    def test_changes_during_build_go_to_next_snapshot(self):
+        world = make_world()
+        building = threading.Event()
+        release = threading.Event()
+
+        def build(frozen):
+            building.set()
+            release.wait(5.0)
+            return frozen.snapshot()
+
+        async def run():
+            pending = asyncio.ensure_future(self.worker.run(world, build))
+            await asyncio.get_running_loop().run_in_executor(None, building.wait)
+            # The loop is free while the worker builds
+            world.step(1.0)
+            world.update_own_speed(0.0)
+            release.set()
+            first = await pending
+            return first, await self.worker.snapshot(world)
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual(first["own"]["position"]["y"], 0.0)
+        self.assertEqual(first["own"]["speed_knots"], 10.0)
+        self.assertAlmostEqual(second["own"]["position"]["y"], 10.0)
+        self.assertEqual(second["own"]["speed_knots"], 0.0)
+
+
+class TestServerWithWorker(unittest.TestCase):
+
+    def setUp(self):
+        save_server_state(self)
+        server.world = make_world()
+        server.simulation = Simulation(server.world)
+        server.broadcaster = Broadcaster()
+        server.snapshot_worker = SnapshotWorker()
+
+    def tearDown(self):
+        server.snapshot_worker.close()
+
+    def test_replies_built_by_worker(self):
+        websocket = ScriptedWebSocket([
+            {"command": "step", "dt": 0.1},
+            {"command": "stats"},
+            {"command": "update_own_heading", "heading_deg": 90.0},
+        ])
+
+        asyncio.run(server.handler(websocket))
+
+        replies = [json.loads(p) for p in websocket.sent]
+        self.assertEqual(replies[1]["type"], "stats")
+        expected = make_world().at(0.1).snapshot()
+        self.assertEqual(replies[0]["own"], expected["own"])
+        self.assertEqual(
+            [a["risk"] for a in replies[0]["alerts"]],
+            [a["risk"] for a in expected["alerts"]],
+        )
+        self.assertEqual(replies[2]["own"]["heading_deg"], 90.0)
+
+    def test_broadcast_frames_encoded_by_worker(self):
+        broadcaster = server.broadcaster
+        threads = []
+        offered = []
+        encode, offer = broadcaster.encode, broadcaster.offer
+        broadcaster.encode = lambda *args: threads.append(
+            threading.current_thread().name
+        ) or encode(*args)
+        broadcaster.offer = lambda frame: offered.append(frame) or offer(frame)
+
+        async def run():
+            websocket = ScriptedWebSocket([])
+            subscriber = broadcaster.subscribe(websocket, delta=True)
+            await server.publish_snapshot()
+            server.world.step(0.1)
+            await server.publish_snapshot()
+            await asyncio.sleep(0.01)
+            broadcaster.unsubscribe(subscriber)
+            return websocket.sent
+
+        sent = asyncio.run(run())
+
+        self.assertTrue(all(name.startswith("snapshot") for name in threads))
+        self.assertEqual(len(threads), 2)
+        # Delta payloads were serialized on the worker, before the offer
+        self.assertEqual([f.message["type"] for f in offered], ["keyframe", "delta"])
+        self.assertTrue(all(f._stream is not None and f._full is None for f in offered))
+        self.assertEqual(json.loads(sent[-1])["type"], "delta")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import random
+import unittest
+from world import World
+from vessel import Vessel
+from vessel_table import VesselTable
+from position import Position
+from spatial import SpatialGrid, reach_radius
+from alert import generate_alerts
+
+
+def random_fleet(n, extent, seed):
+    rng = random.Random(seed)
+    return [
+        Vessel(
+            f"T{i}",
+            Position(rng.uniform(-extent, extent), rng.uniform(-extent, extent)),
+            rng.uniform(0, 20),
+            rng.uniform(0, 360),
+        )
+        for i in range(n)
+    ]
+
+
+class TestSpatialGrid(unittest.TestCase):
+
+    def test_query_returns_nearby_rows(self):
+        table = VesselTable([
+            Vessel("NEAR", Position(1.0, 1.0), 5.0, 0.0),
+            Vessel("FAR", Position(200.0, 200.0), 5.0, 0.0),
+        ])
+        grid = SpatialGrid(table, cell_size_nm=5.0)
+
+        self.assertEqual(grid.query(0.0, 0.0, 10.0).tolist(), [0])
+
+    def test_update_follows_moving_vessels(self):
+        vessel = Vessel("T1", Position(0.0, 0.0), 20.0, 90.0)
+        table = VesselTable([vessel])
+        grid = SpatialGrid(table, cell_size_nm=5.0)
+
+        table.step(5.0)  # 100 nm east
+        grid.update()
+
+        self.assertEqual(grid.query(0.0, 0.0, 10.0).tolist(), [])
+        self.assertEqual(grid.query(100.0, 0.0, 1.0).tolist(), [0])
+
+    def test_update_after_add_and_remove(self):
+        table = VesselTable([Vessel("A", Position(0.0, 0.0), 1.0, 0.0)])
+        grid = SpatialGrid(table, cell_size_nm=5.0)
+
+        table.append(Vessel("B", Position(50.0, 50.0), 1.0, 0.0))
+        grid.update()
+        self.assertEqual(grid.query(50.0, 50.0, 1.0).tolist(), [1])
+
+        table.remove("A")
+        grid.update()
+        self.assertEqual(grid.query(50.0, 50.0, 1.0).tolist(), [0])
+        self.assertEqual(grid.query(0.0, 0.0, 1.0).tolist(), [])
+
+
+class TestBroadPhaseWorld(unittest.TestCase):
+
+    def test_same_risks_as_full_evaluation(self):
+        """
+        Skipping unreachable targets must not change any risk level
+        """
+        own = Vessel("OWN", Position(0.0, 0.0), 12.0, 45.0)
+        fleet = random_fleet(3000, extent=150.0, seed=5)
+        world = World(own, fleet, grid_cell_nm=5.0)
+
+        for _ in range(5):
+            world.step(0.1)
+            expected = generate_alerts(own, list(world.targets), include_safe=True)
+            alerts = world.evaluate()
+
+            self.assertEqual(
+                [a.risk_level for a in alerts],
+                [a.risk_level for a in expected],
+            )
+
+        self.assertLess(world.evaluator.candidates, len(fleet) // 2)
+
+    def test_far_targets_reported_safe_without_cpa(self):
+        own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        world = World(own, [
+            Vessel("CLOSE", Position(0.0, 5.0), 10.0, 180.0),
+            Vessel("FAR", Position(500.0, 0.0), 10.0, 270.0),
+        ], grid_cell_nm=5.0)
+
+        close, far = world.evaluate()
+
+        self.assertIsNotNone(close.cpa_nm)
+        self.assertEqual(far.risk_level.value, "SAFE")
+        self.assertIsNone(far.cpa_nm)
+
+    def test_evaluator_and_grid_are_exclusive(self):
+        own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+
+        with self.assertRaises(ValueError):
+            World(own, [], evaluator=generate_alerts, grid_cell_nm=5.0)
+
+    def test_reach_radius(self):
+        own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        table = VesselTable([Vessel("T", Position(0.0, 0.0), 15.0, 0.0)])
+
+        self.assertAlmostEqual(reach_radius(own, table), 26.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -62,6 +62,23 @@ class TestVessel(unittest.TestCase):
         self.assertAlmostEqual(vx, 7.0710678, places=6)
         self.assertAlmostEqual(vy, 7.0710678, places=6)
 
+    def test_compact_instances(self):
+        vessel = Vessel("C", Position(1.0, 2.0), 5.0, 90.0)
+
+        self.assertFalse(hasattr(vessel, "__dict__"))
+        self.assertFalse(hasattr(vessel.position, "__dict__"))
+        with self.assertRaises(AttributeError):
+            vessel.extra = 1
+
+    def test_position_snapshots_do_not_change_on_step(self):
+        vessel = Vessel("D", Position(1.0, 2.0), 6.0, 90.0)
+        before = vessel.position
+
+        vessel.step(0.5)
+
+        self.assertEqual(before, Position(1.0, 2.0))
+        self.assertAlmostEqual(vessel.position.x, 4.0)
+
 
 if __name__ == "__main__":
     unittest.main()
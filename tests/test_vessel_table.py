@@ -0,0 +1,68 @@
+import unittest
+from vessel import Vessel
+from vessel_table import VesselTable
+from position import Position
+
+
+class TestVesselTable(unittest.TestCase):
+
+    def setUp(self):
+        self.t1 = Vessel("T1", Position(0.0, 0.0), 10.0, 90.0)
+        self.t2 = Vessel("T2", Position(1.0, 1.0), 5.0, 180.0)
+        self.table = VesselTable([self.t1, self.t2])
+
+    def test_columns_match_vessels(self):
+        self.assertEqual(list(self.table.ids), ["T1", "T2"])
+        self.assertEqual(list(self.table.x), [0.0, 1.0])
+        self.assertEqual(list(self.table.speed), [10.0, 5.0])
+        self.assertAlmostEqual(self.table.vx[0], 10.0, places=6)
+        self.assertAlmostEqual(self.table.vy[1], -5.0, places=6)
+
+    def test_step_matches_vessel_step(self):
+        """
+        Vectorized step should give the same positions as Vessel.step
+        """
+        loose = Vessel("T3", Position(2.0, -3.0), 12.0, 33.0)
+        bound = Vessel("T3", Position(2.0, -3.0), 12.0, 33.0)
+        table = VesselTable([bound])
+
+        loose.step(0.25)
+        table.step(0.25)
+
+        self.assertEqual(bound.position, loose.position)
+
+    def test_vessel_is_view_onto_row(self):
+        self.table.step(1.0)
+        self.assertAlmostEqual(self.t1.position.x, 10.0, places=6)
+
+        self.t2.change_heading(90.0)
+        self.assertAlmostEqual(self.table.vx[1], 5.0, places=6)
+        self.assertAlmostEqual(self.table.vy[1], 0.0, places=6)
+
+    def test_growth_beyond_capacity(self):
+        table = VesselTable(capacity=1)
+        for i in range(5):
+            table.append(Vessel(f"T{i}", Position(i, 0.0), 1.0, 0.0))
+
+        self.assertEqual(len(table), 5)
+        self.assertEqual(list(table.x), [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_remove_unbinds_vessel(self):
+        removed = self.table.remove("T1")
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(list(self.table.ids), ["T2"])
+        self.assertIs(self.table[0], self.t2)
+
+        # Removed vessel keeps its state and moves on its own again
+        self.table.step(1.0)
+        self.assertEqual(self.t1.position, Position(0.0, 0.0))
+        self.assertAlmostEqual(self.t2.position.y, -4.0, places=6)
+
+    def test_vessel_cannot_join_two_tables(self):
+        with self.assertRaises(ValueError):
+            VesselTable([self.t1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestWorldAt(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.world = World(self.own, [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+            Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
+        ])
+
+    def test_at_predicts_without_modifying(self):
+        future = self.world.at(0.5)
+
+        self.assertEqual(future.time_hours, 0.5)
+        self.assertAlmostEqual(future.own.position.y, 5.0)
+        t1, t2 = future.targets
+        self.assertAlmostEqual(t1.position.y, 4.0)
+        self.assertAlmostEqual(t2.position.x, 1.0)
+
+        self.assertEqual(self.world.time_hours, 0.0)
+        self.assertEqual(self.own.position, Position(0.0, 0.0))
+
+    def test_at_matches_stepping(self):
+        future = self.world.at(1.25)
+        self.world.step(1.0)
+        self.world.step(0.25)
+
+        for a, b in zip(future.targets, self.world.targets):
+            self.assertAlmostEqual(a.position.x, b.position.x, places=12)
+            self.assertAlmostEqual(a.position.y, b.position.y, places=12)
+        self.assertAlmostEqual(future.own.position.y, self.own.position.y, places=12)
+
+    def test_copy_keeps_stepping_from_its_time(self):
+        future = self.world.at(2.0)
+        future.step(0.5)
+
+        self.assertAlmostEqual(future.targets[0].position.y, 8.0 - 8.0 * 2.5)
+
+    def test_projected_rows_are_reanchored(self):
+        t1 = self.world.targets[0]
+        self.world.step(0.25)
+        future = self.world.at(0.5)
+        future.update_target_heading("T2", 0.0)
+
+        (f1,) = future.find_targets_by_id("T1")
+        self.assertAlmostEqual(f1.position.y, 4.0)
+        self.assertNotEqual(f1.kinematic_version, t1.kinematic_version)
+        future.add_target(Vessel("T3", Position(0.0, 0.0), 1.0, 0.0))
+        self.assertEqual([v.vessel_id for v in future.targets], ["T1", "T2", "T3"])
+        self.assertAlmostEqual(self.world.targets[1].position.x, -2.0)
+        self.assertEqual(self.world.targets[1].heading_deg, 90.0)
+
+    def test_grid_follows_projected_table(self):
+        world = World(self.own, list(self.world.targets), grid_cell_nm=2.0)
+
+        future = world.at(0.5)
+
+        self.assertIs(future.grid.table, future.targets)
+        self.assertEqual(future.snapshot(), self.world.at(0.5).snapshot())
+
+    def test_many_small_steps_do_not_drift(self):
+        for _ in range(10000):
+            self.world.step(0.0001)
+
+        self.assertAlmostEqual(self.own.position.y, 10.0, places=10)
+        self.assertAlmostEqual(self.world.targets[1].position.x, 7.0, places=10)
+
+    def test_course_change_reanchors(self):
+        self.world.step(0.5)
+        self.world.update_target_heading("T1", 90.0)
+        self.world.update_own_speed(20.0)
+        self.world.step(0.5)
+
+        t1 = self.world.targets[0]
+        self.assertAlmostEqual(t1.position.x, 2.0 + 4.0)
+        self.assertAlmostEqual(t1.position.y, 8.0 - 4.0)
+        self.assertAlmostEqual(self.own.position.y, 5.0 + 10.0)
+
+    def test_vessel_predict(self):
+        vessel = Vessel("V", Position(1.0, 1.0), 6.0, 90.0)
+        vessel.step(0.5)
+
+        self.assertEqual(vessel.predict(0.0), vessel.position)
+        self.assertAlmostEqual(vessel.predict(1.0).x, 10.0)
+        self.assertAlmostEqual(vessel.predict(-0.5).x, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
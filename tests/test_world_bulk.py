@@ -0,0 +1,102 @@
+import unittest
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestWorldBulkUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.world = World(Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0), [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+        ])
+
+    def test_add_targets(self):
+        added = self.world.add_targets(
+            Vessel(f"B{i}", Position(float(i), 1.0), 5.0, 90.0) for i in range(40)
+        )
+
+        self.assertEqual(added, 40)
+        self.assertEqual(len(self.world.targets), 41)
+        b7 = self.world.find_targets_by_id("B7")[0]
+        self.assertEqual(b7.position, Position(7.0, 1.0))
+        self.assertAlmostEqual(b7.velocity_vector()[0], 5.0)
+
+        self.world.step(1.0)
+        self.assertAlmostEqual(b7.position.x, 12.0)
+
+    def test_add_targets_rejects_bound_vessel_without_changes(self):
+        bound = self.world.targets[0]
+
+        with self.assertRaises(ValueError):
+            self.world.add_targets([Vessel("B1", Position(0.0, 0.0), 1.0, 0.0), bound])
+        self.assertEqual(len(self.world.targets), 1)
+
+    def test_update_targets(self):
+        self.world.add_targets([
+            Vessel("T2", Position(0.0, 0.0), 5.0, 0.0),
+            Vessel("T2", Position(1.0, 0.0), 5.0, 0.0),
+        ])
+        t1 = self.world.find_targets_by_id("T1")[0]
+        version = t1.kinematic_version
+
+        updated = self.world.update_targets(
+            ["T1", "T2", "MISSING", "T1"],
+            headings_deg=[10.0, 450.0, 0.0, 270.0],
+        )
+
+        self.assertEqual(updated, 4)  # Matches per entry, repeats included
+        self.assertEqual(t1.heading_deg, 270.0)  # Last entry wins
+        self.assertEqual(t1.speed_knots, 8.0)
+        self.assertNotEqual(t1.kinematic_version, version)
+        for t2 in self.world.find_targets_by_id("T2"):
+            self.assertEqual(t2.heading_deg, 90.0)
+
+        self.world.update_targets(["T2"], speeds_knots=[2.0])
+        self.world.step(1.0)
+        for t2 in self.world.find_targets_by_id("T2"):
+            self.assertAlmostEqual(t2.velocity_vector()[0], 2.0)
+        self.assertAlmostEqual(self.world.targets[1].position.x, 2.0)
+
+    def test_update_targets_negative_speed_changes_nothing(self):
+        with self.assertRaises(ValueError):
+            self.world.update_targets(["T1", "T1"], speeds_knots=[3.0, -1.0])
+        self.assertEqual(self.world.targets[0].speed_knots, 8.0)
+
+
+    def test_upsert_targets(self):
+        t1 = self.world.find_targets_by_id("T1")[0]
+        version = t1.kinematic_version
+        nan = float("nan")
+
+        added, updated = self.world.upsert_targets(
+            ["T1", "N1", "T1", "N2"],
+            [0.0, 3.0, 1.0, 4.0],
+            [0.0, 3.0, 1.0, 4.0],
+            [5.0, nan, nan, 2.0],
+            [10.0, 45.0, 370.0, nan],
+        )
+
+        self.assertEqual((added, updated), (2, 1))
+        # Last entry wins; NaN speed keeps the current one
+        self.assertEqual(t1.position, Position(1.0, 1.0))
+        self.assertEqual(t1.speed_knots, 8.0)
+        self.assertAlmostEqual(t1.heading_deg, 10.0)
+        self.assertNotEqual(t1.kinematic_version, version)
+        n1, n2 = self.world.targets[1:]
+        self.assertEqual((n1.vessel_id, n1.speed_knots, n1.heading_deg), ("N1", 0.0, 45.0))
+        self.assertEqual((n2.vessel_id, n2.speed_knots, n2.heading_deg), ("N2", 2.0, 0.0))
+
+        self.world.step(1.0)
+        self.assertAlmostEqual(t1.position.y, 1.0 + 8.0 * 0.984807753, places=6)
+
+    def test_upsert_targets_rejects_negative_speed(self):
+        with self.assertRaises(ValueError):
+            self.world.upsert_targets(["T1", "N1"], [0.0, 0.0], [0.0, 0.0], [1.0, -1.0], [0.0, 0.0])
+
+        self.assertEqual(len(self.world.targets), 1)
+        self.assertEqual(self.world.targets[0].speed_knots, 8.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from alert_cache import CachedAlertEvaluator
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestWorldCopy(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.world = World(self.own, [
+            Vessel("T1", Position(2.0, 8.0), 8.0, 180.0),
+            Vessel("T2", Position(-5.0, 5.0), 12.0, 90.0),
+            Vessel("DANGER1", Position(0.5, 3.0), 15.0, 190.0),
+        ])
+        self.world.step(0.1)
+
+    def test_copy_matches_and_keeps_versions(self):
+        frozen = self.world.copy()
+
+        self.assertEqual(frozen.snapshot(), self.world.snapshot())
+        self.assertEqual(frozen.time_hours, self.world.time_hours)
+        self.assertEqual(frozen.own.kinematic_version, self.own.kinematic_version)
+        self.assertEqual(
+            frozen.targets.versions.tolist(), self.world.targets.versions.tolist()
+        )
+        # Id index and vessel views are built on first use
+        t1 = frozen.find_targets_by_id("T1")[0]
+        self.assertEqual(t1.position, self.world.find_targets_by_id("T1")[0].position)
+        self.assertEqual([t.vessel_id for t in frozen.targets], ["T1", "T2", "DANGER1"])
+
+    def test_copy_is_independent(self):
+        frozen = self.world.copy()
+        expected = frozen.snapshot()
+
+        self.world.step(0.5)
+        self.world.update_own_heading(90.0)
+        self.world.update_target_speed("T1", 0.0)
+        self.world.remove_target("T2")
+        self.world.add_target(Vessel("T3", Position(1.0, 1.0), 5.0, 0.0))
+
+        self.assertEqual(frozen.snapshot(), expected)
+
+        frozen.step(1.0)
+        frozen.remove_target("DANGER1")
+        self.assertEqual(len(self.world.targets), 3)
+        self.assertEqual(self.world.find_targets_by_id("DANGER1")[0].speed_knots, 15.0)
+
+    def test_cached_evaluator_follows_copies(self):
+        evaluator = CachedAlertEvaluator()
+        self.world.copy(evaluator).evaluate()
+
+        self.world.step(0.1)
+        self.world.copy(evaluator).evaluate()
+        self.assertEqual(evaluator.recomputed, 0)
+
+        self.world.update_target_heading("T2", 45.0)
+        alerts = self.world.copy(evaluator).evaluate()
+        self.assertEqual(evaluator.recomputed, 1)
+        self.assertEqual(
+            [a.risk_level for a in alerts],
+            [a.risk_level for a in self.world.at(self.world.time_hours).evaluate()],
+        )
+
+    def test_grid_is_rebuilt(self):
+        world = World(self.own, [Vessel("T1", Position(2.0, 8.0), 8.0, 180.0)],
+                      grid_cell_nm=2.0)
+
+        frozen = world.copy()
+
+        self.assertIsNot(frozen.grid, world.grid)
+        self.assertIs(frozen.grid.table, frozen.targets)
+        self.assertEqual(frozen.snapshot(), world.snapshot())
+
+    def test_given_evaluator_is_kept(self):
+        world = World(self.own, [Vessel("T1", Position(2.0, 8.0), 8.0, 180.0)],
+                      grid_cell_nm=2.0)
+        evaluator = CachedAlertEvaluator()
+
+        frozen = world.copy(evaluator)
+
+        self.assertIs(frozen.evaluator, evaluator)
+        self.assertIsNone(frozen.grid)
+        self.assertEqual(frozen.snapshot(), world.snapshot())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from world import World, evaluate_targets
+from vessel import Vessel
+from position import Position
+from alert import Alert
+from risk import RiskLevel
+
+
+class TestWorldEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0.0, 0.0), 10.0, 0.0)
+        self.targets = [
+            Vessel("DANGER1", Position(0.0, 5.0), 10.0, 180.0),
+            Vessel("FAR", Position(50.0, 50.0), 5.0, 90.0),
+            Vessel("WARN1", Position(1.2, 8.0), 5.0, 180.0),
+        ]
+
+    def test_evaluator_called_once_per_snapshot(self):
+        calls = []
+
+        def counting(own, targets):
+            calls.append(len(targets))
+            return evaluate_targets(own, targets)
+
+        world = World(self.own, self.targets, evaluator=counting)
+        world.snapshot()
+
+        self.assertEqual(calls, [3])
+
+    def test_alerts_and_details_share_results(self):
+        world = World(self.own, self.targets)
+        snap = world.snapshot()
+
+        details = {t["id"]: t["alert"] for t in snap["targets"]}
+        self.assertEqual(
+            [a["target_id"] for a in snap["alerts"]], ["DANGER1", "WARN1"]
+        )
+        for alert in snap["alerts"]:
+            detail = details[alert["target_id"]]
+            self.assertEqual(detail["risk"], alert["risk"])
+            self.assertEqual(detail["cpa_nm"], alert["cpa_nm"])
+            self.assertEqual(detail["tcpa_hours"], alert["tcpa_hours"])
+
+        self.assertEqual(details["FAR"]["risk"], RiskLevel.SAFE.value)
+
+    def test_custom_evaluator_backend(self):
+        def all_danger(own, targets):
+            return [
+                Alert(t.vessel_id, RiskLevel.DANGER, 0.0, 0.1) for t in targets
+            ]
+
+        world = World(self.own, self.targets, evaluator=all_danger)
+        snap = world.snapshot()
+
+        self.assertEqual(len(snap["alerts"]), 3)
+        self.assertTrue(
+            all(t["alert"]["risk"] == "DANGER" for t in snap["targets"])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from world import World
+from vessel import Vessel
+from position import Position
+
+
+class TestWorldIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.own = Vessel("OWN", Position(0, 0), 10, 0)
+        self.vessels = [
+            Vessel("A", Position(1, 0), 5, 0),
+            Vessel("B", Position(2, 0), 6, 0),
+            Vessel("A", Position(3, 0), 7, 0),
+            Vessel("C", Position(4, 0), 8, 0),
+            Vessel("D", Position(5, 0), 9, 0),
+        ]
+        self.world = World(self.own, self.vessels)
+
+    def assert_consistent(self):
+        """
+        Every row's vessel, id column and index entry must agree
+        """
+        table = self.world.targets
+        for row, vessel in enumerate(table):
+            self.assertEqual(vessel._row, row)
+            self.assertEqual(table.ids[row], vessel.vessel_id)
+            self.assertIn(row, table.rows_for(vessel.vessel_id))
+            self.assertEqual(table.x[row], vessel.position.x)
+
+    def test_remove_fills_hole_with_last_row(self):
+        removed = self.world.remove_target("B")
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(
+            [t.vessel_id for t in self.world.targets], ["A", "D", "A", "C"]
+        )
+        self.assert_consistent()
+
+    def test_remove_duplicates(self):
+        removed = self.world.remove_target("A")
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(
+            sorted(t.vessel_id for t in self.world.targets), ["B", "C", "D"]
+        )
+        self.assertEqual(self.world.find_targets_by_id("A"), [])
+        self.assert_consistent()
+
+    def test_updates_after_removal_hit_right_rows(self):
+        self.world.remove_target("B")
+        updated = self.world.update_target_speed("D", 20)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.vessels[4].speed_knots, 20)
+        self.assertEqual(self.vessels[3].speed_knots, 8)
+
+    def test_remove_all_then_add(self):
+        for vessel_id in ["A", "B", "C", "D"]:
+            self.world.remove_target(vessel_id)
+        self.assertEqual(len(self.world.targets), 0)
+
+        self.world.add_target(Vessel("E", Position(0, 1), 1, 0))
+        self.assertEqual(self.world.update_target_heading("E", 90), 1)
+        self.assert_consistent()
+
+    def test_renaming_bound_vessel_updates_index(self):
+        self.vessels[1].vessel_id = "Z"
+
+        self.assertEqual(self.world.find_targets_by_id("B"), [])
+        self.assertEqual(self.world.find_targets_by_id("Z"), [self.vessels[1]])
+        self.assert_consistent()
+
+
+if __name__ == "__main__":
+    unittest.main()
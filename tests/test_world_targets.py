@@ -57,6 +57,22 @@ class TestWorldTargets(unittest.TestCase):
 
         self.assertFalse(removed)
 
+    def test_worlds_from_same_targets_are_independent(self):
+        """
+        A target already in one world is copied into the next
+        """
+        targets = [Vessel("TGT1", Position(5.0, 5.0), 6.0, 180.0)]
+        first = World(self.own, targets)
+        second = World(self.own, targets)
+        self.world.add_target(targets[0])
+
+        first.step(1.0)
+
+        self.assertIs(first.targets[0], targets[0])
+        self.assertEqual(second.targets[0].position, Position(5.0, 5.0))
+        self.assertEqual(self.world.targets[0].position, Position(5.0, 5.0))
+        self.assertAlmostEqual(targets[0].position.y, -1.0)
+
    
 if __name__ == "__main__":
     unittest.main()